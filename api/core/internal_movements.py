@@ -0,0 +1,41 @@
+import re
+from typing import List, Optional, Pattern
+
+# =========================
+# Internal Movement Rules
+# =========================
+# A transaction is an internal movement (card payment, transfer between own
+# accounts) rather than spending when its raw or normalized vendor matches
+# any of these patterns. Matching is case-insensitive.
+#
+# This is the single definition used at ingest to set transactions.is_internal.
+# After changing it, re-apply it to stored rows with:
+#     python -m db reclassify-internal
+
+INTERNAL_MOVEMENT_PATTERNS: List[str] = [
+    r"payment",
+    r"paiement",
+    r"transfer",
+    r"credit[\s\-]card",
+]
+
+_compiled: List[Pattern] = [re.compile(p, re.IGNORECASE) for p in INTERNAL_MOVEMENT_PATTERNS]
+
+
+def set_internal_movement_patterns(patterns: List[str]):
+    """
+    Replace the active rule set.
+    """
+    global _compiled
+    INTERNAL_MOVEMENT_PATTERNS[:] = patterns
+    _compiled = [re.compile(p, re.IGNORECASE) for p in patterns]
+
+
+def is_internal_movement(vendor_raw: Optional[str], vendor_normalized: Optional[str] = None) -> bool:
+    """
+    True if the vendor strings describe a payment or transfer, not spending.
+    """
+    for text in (vendor_raw, vendor_normalized):
+        if text and any(p.search(text) for p in _compiled):
+            return True
+    return False
@@ -0,0 +1,62 @@
+import base64
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# =========================
+# Keyset Pagination
+# =========================
+# List queries are ordered by (date, id) and resume strictly after the last
+# row of the previous page, so page cost does not grow with depth and rows
+# inserted meanwhile don't shift later pages. Clients only see an opaque
+# cursor string encoding that (date, id) key.
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+Key = Tuple[str, int]
+
+
+def encode_cursor(key: Key) -> str:
+    """
+    Opaque, URL-safe cursor for a (date, id) key.
+    """
+    payload = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Key:
+    """
+    Inverse of encode_cursor. Raises ValueError for malformed cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(date, str) or not isinstance(row_id, int):
+        raise ValueError("Invalid cursor")
+    return date, row_id
+
+
+def paginate(
+    fetch: Callable[..., List[Dict[str, Any]]],
+    cursor: Optional[str],
+    page_size: int,
+    date_field: str,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page through `fetch(after=key, limit=n)`.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    after = decode_cursor(cursor) if cursor else None
+
+    # One extra row tells whether another page exists
+    rows = fetch(after=after, limit=size + 1)
+    if len(rows) <= size:
+        return rows, None
+
+    rows = rows[:size]
+    last = rows[-1]
+    return rows, encode_cursor((last[date_field], last["id"]))
@@ -0,0 +1,72 @@
+import hashlib
+from collections import Counter
+from typing import Any, Optional, Tuple
+
+# =========================
+# Transaction Natural Key
+# =========================
+# Imported transactions are identified by what the statement says about them,
+# not by when they were inserted, so re-importing a statement or importing
+# one whose period overlaps another yields the same keys and the duplicates
+# are skipped by the unique index on transactions.natural_key.
+#
+# Identical purchases on the same day (two coffees at the same shop) are kept
+# apart by their occurrence ordinal within the import, and the same purchase
+# on two cards by the account part of the key (see statement_account).
+
+_SEPARATOR = "\x1f"
+
+
+def normalize_raw_vendor(vendor_raw: str) -> str:
+    """
+    Case and whitespace-insensitive form of a raw vendor string.
+    """
+    return " ".join(vendor_raw.upper().split())
+
+
+def statement_account(
+    statement_id: int,
+    issuer: Optional[str],
+    account_number: Optional[str],
+) -> str:
+    """
+    Account part of a statement's keys: the card or account number from its
+    header, qualified by the detected issuer (bank profile). Statements with
+    no account number are keyed on their own, since they cannot be told
+    apart from another card's statement.
+    """
+    if not account_number:
+        return f"statement:{statement_id}"
+    return f"{issuer or ''}:{account_number}"
+
+
+def occurrence_key(date: str, amount: Any, vendor_raw: str) -> Tuple[str, str, str]:
+    """
+    What makes two rows of one import the same purchase, minus the ordinal.
+    """
+    return date.strip(), f"{float(amount):.2f}", normalize_raw_vendor(vendor_raw)
+
+
+def transaction_key(source: str, date: str, amount: Any, vendor_raw: str, ordinal: int) -> str:
+    """
+    Deterministic SHA-256 natural key for an imported transaction.
+    """
+    parts = (source, *occurrence_key(date, amount, vendor_raw), str(ordinal))
+    return hashlib.sha256(_SEPARATOR.join(parts).encode()).hexdigest()
+
+
+def next_transaction_key(
+    occurrences: Counter,
+    source: str,
+    date: str,
+    amount: Any,
+    vendor_raw: str,
+) -> str:
+    """
+    Key for the next row of an import, counting repeats in `occurrences`
+    (one Counter per import, shared across its insert batches).
+    """
+    occurrence = occurrence_key(date, amount, vendor_raw)
+    ordinal = occurrences[occurrence]
+    occurrences[occurrence] += 1
+    return transaction_key(source, date, amount, vendor_raw, ordinal)
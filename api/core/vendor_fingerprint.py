@@ -0,0 +1,126 @@
+import re
+
+# =========================
+# Vendor Fingerprint Rules
+# =========================
+# Raw card descriptors for the same merchant differ by store numbers,
+# reference IDs, phone numbers, cities and province codes. The fingerprint
+# strips those so "FRESHCO #9888 BRAMPTON ON" and "FRESHCO #1234 TORONTO ON"
+# share one vendor_cache key.
+#
+# After changing these rules, recompute stored fingerprints with:
+#     python -m db refingerprint-vendors
+
+# Payment processors / wallets that prefix the real merchant: "SQ *MERCHANT".
+# Only stripped when followed by "*", so "LS TOWERS" or "IN N OUT" keep their words.
+PROCESSOR_PREFIXES = [
+    "SQ", "TST", "PAYPAL", "PP", "SP", "SPO", "PY", "DD", "IC", "CKE",
+    "GOOGLE", "APPLE.COM/BILL", "ZTL", "BT", "FS", "LS", "IN",
+]
+
+PROVINCE_CODES = [
+    "AB", "BC", "MB", "NB", "NL", "NS", "NT", "NU", "ON", "PE", "QC", "SK", "YT",
+]
+
+COUNTRY_CODES = ["CA", "CAN", "US", "USA"]
+
+# Cities recognised before a province code. An unlisted word there is only
+# taken for a city when at least two merchant words remain without it, so
+# 'BEST WESTERN ON' and 'TIM HORTONS ON' keep their full names.
+KNOWN_CITIES = [
+    "AJAX", "BARRIE", "BRAMPTON", "BRANTFORD", "BURLINGTON", "BURNABY", "CALGARY",
+    "CAMBRIDGE", "EDMONTON", "ETOBICOKE", "GATINEAU", "GUELPH", "HALIFAX", "HAMILTON",
+    "KANATA", "KELOWNA", "KINGSTON", "KITCHENER", "LAVAL", "LONDON", "LONGUEUIL",
+    "MARKHAM", "MILTON", "MISSISSAUGA", "MONCTON", "MONTREAL", "NEPEAN", "OAKVILLE",
+    "OSHAWA", "OTTAWA", "PICKERING", "QUEBEC", "REGINA", "RICHMOND", "SASKATOON",
+    "SCARBOROUGH", "SUDBURY", "SURREY", "TORONTO", "VANCOUVER", "VAUGHAN", "VICTORIA",
+    "WATERLOO", "WHITBY", "WINDSOR", "WINNIPEG", "WOODBRIDGE",
+    "NORTH YORK", "RICHMOND HILL", "NIAGARA FALLS", "ST CATHARINES", "ST JOHN'S",
+    "THUNDER BAY", "NORTH VANCOUVER", "WEST VANCOUVER", "SAINT JOHN",
+]
+
+_PROCESSOR_RE = re.compile(
+    r"^(?:" + "|".join(re.escape(p) for p in PROCESSOR_PREFIXES) + r")\s*\*\s*"
+)
+# A word after "MERCHANT*" naming the merchant's service ("UBER* EATS");
+# reference IDs contain digits and are dropped
+_SERVICE_WORD_RE = re.compile(r"[A-Z][A-Z&']+")
+_REGION_CODES = set(PROVINCE_CODES) | set(COUNTRY_CODES)
+# Longest first, so "NORTH VANCOUVER" wins over "VANCOUVER"
+_KNOWN_CITIES = sorted((city.split() for city in KNOWN_CITIES), key=len, reverse=True)
+# An unlisted word before a province code is dropped only if this many words precede it
+_MIN_WORDS_BEFORE_CITY = 2
+_PHONE_RE = re.compile(r"\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b")
+_WWW_RE = re.compile(r"^WWW[.\s]+")
+_DOMAIN_RE = re.compile(r"\.(?:COM|CA|NET|ORG|IO|CO)\b")
+_SEPARATOR_RE = re.compile(r"[#/\-_.,()]+")
+_NON_WORD_RE = re.compile(r"[^A-Z&']")
+_SPACE_RE = re.compile(r"\s+")
+
+# Letters left after removing digits from a token like "C07859" or "CA0060"
+# must exceed this to be kept (it is an ID, not a name, otherwise)
+_MIN_ID_REMAINDER = 2
+
+
+def vendor_fingerprint(raw_vendor: str) -> str:
+    """
+    Canonical, deterministic key for a raw vendor string.
+
+    'SQ *POPUPSHOPSCANADA Brampton ON'     -> 'POPUPSHOPSCANADA'
+    'FRESHCO #9888 BRAMPTON ON'            -> 'FRESHCO'
+    'AMAZON.CA*PZ3T61XX3 866-216-1072 ON'  -> 'AMAZON'
+    'UBER* EATS HELP.UBER.COM ON'          -> 'UBER EATS'
+    """
+    text = _SPACE_RE.sub(" ", raw_vendor.upper()).strip()
+    original = text
+
+    # Processor prefix: keep the merchant after it
+    text = _PROCESSOR_RE.sub("", text)
+    # Remaining "MERCHANT*REFERENCE": keep the merchant and a service word
+    # right after the "*", drop the rest
+    if "*" in text:
+        merchant, rest = text.split("*", 1)
+        service = rest.split()[:1]
+        if service and _SERVICE_WORD_RE.fullmatch(service[0]):
+            merchant = f"{merchant} {service[0]}"
+        text = merchant
+
+    had_phone = bool(_PHONE_RE.search(text))
+    text = _PHONE_RE.sub(" ", text)
+    text = _WWW_RE.sub("", text)
+    text = _DOMAIN_RE.sub(" ", text)
+    text = _SEPARATOR_RE.sub(" ", text)
+
+    words = []
+    for token in text.split():
+        cleaned = _NON_WORD_RE.sub("", token)
+        if any(ch.isdigit() for ch in token) and len(cleaned) <= _MIN_ID_REMAINDER:
+            continue  # Store number / reference ID
+        if cleaned:
+            words.append(cleaned)
+
+    # Trailing province/country codes, and the city before a province code
+    # when nothing else (like a phone number) took that position
+    had_province = False
+    while len(words) > 1 and words[-1] in _REGION_CODES:
+        had_province = had_province or words[-1] in PROVINCE_CODES
+        words.pop()
+    if had_province and not had_phone:
+        words = _drop_city(words)
+
+    fingerprint = " ".join(words)
+    return fingerprint or original
+
+
+def _drop_city(words):
+    """
+    Remove the city that ends `words` (the part before a province code).
+    Listed cities are removed whenever a merchant word remains; any other
+    last word only when it leaves at least _MIN_WORDS_BEFORE_CITY words.
+    """
+    for city in _KNOWN_CITIES:
+        if len(words) > len(city) and words[-len(city):] == city:
+            return words[:-len(city)]
+    if len(words) > _MIN_WORDS_BEFORE_CITY:
+        return words[:-1]
+    return words
@@ -13,7 +13,13 @@ CREATE TABLE IF NOT EXISTS statements (
         source_type IN ('pdf', 'manual')
     ),
     error_message TEXT,
-    processed_at DATETIME
+    processed_at DATETIME,
+    -- SHA-256 of the uploaded PDF; re-uploads of the same file are deduplicated
+    content_hash TEXT,
+    -- Bank profile and card/account number read from the statement header;
+    -- together the account part of transaction natural keys
+    issuer TEXT,
+    account_number TEXT
 );
 
 CREATE INDEX IF NOT EXISTS idx_statements_status
@@ -22,6 +28,17 @@ ON statements(status);
 CREATE INDEX IF NOT EXISTS idx_statements_source_type
 ON statements(source_type);
 
+-- At most one live (not failed) statement per uploaded file, so concurrent
+-- uploads of the same PDF cannot both be accepted
+DROP INDEX IF EXISTS idx_statements_content_hash;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_statements_content_hash_active
+ON statements(content_hash)
+WHERE content_hash IS NOT NULL AND status != 'failed';
+
+-- Keyset pagination order: (uploaded_at, id)
+CREATE INDEX IF NOT EXISTS idx_statements_uploaded
+ON statements(uploaded_at);
+
 
 -- =========================
 -- Categories
@@ -50,19 +67,50 @@ CREATE TABLE IF NOT EXISTS transactions (
     amount REAL NOT NULL,
     category_id INTEGER,
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- 1 for payments/transfers between own accounts; set at ingest
+    -- from core/internal_movements.py
+    is_internal INTEGER NOT NULL DEFAULT 0,
+    -- SHA-256 natural key of imported rows (core/transaction_key.py);
+    -- NULL for manual entries
+    natural_key TEXT,
+    -- Derived from ISO transaction_date (NULL otherwise) so year/month
+    -- filters can use an index instead of strftime() scans
+    year INTEGER GENERATED ALWAYS AS (
+        CASE WHEN transaction_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+        THEN CAST(substr(transaction_date, 1, 4) AS INTEGER) END
+    ) VIRTUAL,
+    month INTEGER GENERATED ALWAYS AS (
+        CASE WHEN transaction_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+        THEN CAST(substr(transaction_date, 6, 2) AS INTEGER) END
+    ) VIRTUAL,
 
     FOREIGN KEY (statement_id) REFERENCES statements(id) ON DELETE CASCADE,
     FOREIGN KEY (category_id) REFERENCES categories(id)
 );
 
 -- Vendor cache table
+-- Looked up by fingerprint (core/vendor_fingerprint.py), so store numbers,
+-- reference IDs and locations in raw_vendor don't cause misses
 CREATE TABLE IF NOT EXISTS vendor_cache (
     raw_vendor TEXT PRIMARY KEY,
-    normalized_vendor TEXT NOT NULL
+    normalized_vendor TEXT NOT NULL,
+    fingerprint TEXT
 );
 
-CREATE INDEX IF NOT EXISTS idx_transactions_statement
-ON transactions(statement_id);
+CREATE INDEX IF NOT EXISTS idx_vendor_cache_fingerprint
+ON vendor_cache(fingerprint);
+
+-- Re-imported / overlapping statement rows are skipped on insert
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_natural_key
+ON transactions(natural_key);
+
+-- Keyset pagination orders: (transaction_date, id) within a statement or year
+DROP INDEX IF EXISTS idx_transactions_statement;
+CREATE INDEX IF NOT EXISTS idx_transactions_statement_date
+ON transactions(statement_id, transaction_date);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_year_date
+ON transactions(year, transaction_date);
 
 CREATE INDEX IF NOT EXISTS idx_transactions_date
 ON transactions(transaction_date);
@@ -72,3 +120,219 @@ ON transactions(category_id);
 
 CREATE INDEX IF NOT EXISTS idx_transactions_vendor_norm
 ON transactions(vendor_normalized);
+
+-- Spending queries by month filter on is_internal = 0; amount makes the index
+-- covering for rebuilding monthly_rollups. Internal rows are never queried
+-- this way, so there is no full (year, month, category_id) index.
+DROP INDEX IF EXISTS idx_transactions_year_month_category;
+DROP INDEX IF EXISTS idx_transactions_spending;
+CREATE INDEX IF NOT EXISTS idx_transactions_spending_amount
+ON transactions(year, month, category_id, amount)
+WHERE is_internal = 0;
+
+
+-- =========================
+-- Monthly Spending Rollups
+-- =========================
+-- Pre-aggregated spending per (year, month, category), kept current by the
+-- triggers below. Internal movements are excluded; category_id 0 = uncategorized.
+-- Rebuild with: python -m db rebuild-rollups
+CREATE TABLE IF NOT EXISTS monthly_rollups (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    category_id INTEGER NOT NULL DEFAULT 0,
+    net_amount REAL NOT NULL DEFAULT 0,
+    txn_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (year, month, category_id)
+) WITHOUT ROWID;
+
+DROP TRIGGER IF EXISTS trg_rollup_insert;
+CREATE TRIGGER trg_rollup_insert
+AFTER INSERT ON transactions
+WHEN NEW.year IS NOT NULL AND NEW.is_internal = 0
+BEGIN
+    INSERT INTO monthly_rollups (year, month, category_id, net_amount, txn_count)
+    VALUES (
+        NEW.year,
+        NEW.month,
+        COALESCE(NEW.category_id, 0),
+        NEW.amount,
+        1
+    )
+    ON CONFLICT (year, month, category_id) DO UPDATE SET
+        net_amount = net_amount + excluded.net_amount,
+        txn_count = txn_count + 1;
+END;
+
+DROP TRIGGER IF EXISTS trg_rollup_delete;
+CREATE TRIGGER trg_rollup_delete
+AFTER DELETE ON transactions
+WHEN OLD.year IS NOT NULL AND OLD.is_internal = 0
+BEGIN
+    UPDATE monthly_rollups
+    SET net_amount = net_amount - OLD.amount,
+        txn_count = txn_count - 1
+    WHERE year = OLD.year
+      AND month = OLD.month
+      AND category_id = COALESCE(OLD.category_id, 0);
+
+    DELETE FROM monthly_rollups WHERE txn_count <= 0;
+END;
+
+-- An update is applied as "remove OLD" + "add NEW"; the two triggers commute.
+DROP TRIGGER IF EXISTS trg_rollup_update_old;
+CREATE TRIGGER trg_rollup_update_old
+AFTER UPDATE OF transaction_date, amount, category_id, is_internal ON transactions
+WHEN OLD.year IS NOT NULL AND OLD.is_internal = 0
+BEGIN
+    UPDATE monthly_rollups
+    SET net_amount = net_amount - OLD.amount,
+        txn_count = txn_count - 1
+    WHERE year = OLD.year
+      AND month = OLD.month
+      AND category_id = COALESCE(OLD.category_id, 0);
+
+    DELETE FROM monthly_rollups WHERE txn_count <= 0;
+END;
+
+DROP TRIGGER IF EXISTS trg_rollup_update_new;
+CREATE TRIGGER trg_rollup_update_new
+AFTER UPDATE OF transaction_date, amount, category_id, is_internal ON transactions
+WHEN NEW.year IS NOT NULL AND NEW.is_internal = 0
+BEGIN
+    INSERT INTO monthly_rollups (year, month, category_id, net_amount, txn_count)
+    VALUES (
+        NEW.year,
+        NEW.month,
+        COALESCE(NEW.category_id, 0),
+        NEW.amount,
+        1
+    )
+    ON CONFLICT (year, month, category_id) DO UPDATE SET
+        net_amount = net_amount + excluded.net_amount,
+        txn_count = txn_count + 1;
+END;
+
+
+-- =========================
+-- Full-Text Search
+-- =========================
+-- Vendor and category text per transaction (rowid = transactions.id),
+-- kept in sync by the triggers below. Rebuild with: python -m db rebuild-search
+CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+    vendor_raw,
+    vendor_normalized,
+    category,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+DROP TRIGGER IF EXISTS trg_fts_insert;
+CREATE TRIGGER trg_fts_insert
+AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO transactions_fts (rowid, vendor_raw, vendor_normalized, category)
+    VALUES (
+        NEW.id,
+        NEW.vendor_raw,
+        COALESCE(NEW.vendor_normalized, ''),
+        COALESCE((SELECT name FROM categories WHERE id = NEW.category_id), '')
+    );
+END;
+
+DROP TRIGGER IF EXISTS trg_fts_delete;
+CREATE TRIGGER trg_fts_delete
+AFTER DELETE ON transactions
+BEGIN
+    DELETE FROM transactions_fts WHERE rowid = OLD.id;
+END;
+
+DROP TRIGGER IF EXISTS trg_fts_update;
+CREATE TRIGGER trg_fts_update
+AFTER UPDATE OF vendor_raw, vendor_normalized, category_id ON transactions
+BEGIN
+    DELETE FROM transactions_fts WHERE rowid = OLD.id;
+    INSERT INTO transactions_fts (rowid, vendor_raw, vendor_normalized, category)
+    VALUES (
+        NEW.id,
+        NEW.vendor_raw,
+        COALESCE(NEW.vendor_normalized, ''),
+        COALESCE((SELECT name FROM categories WHERE id = NEW.category_id), '')
+    );
+END;
+
+DROP TRIGGER IF EXISTS trg_fts_category_rename;
+CREATE TRIGGER trg_fts_category_rename
+AFTER UPDATE OF name ON categories
+BEGIN
+    UPDATE transactions_fts
+    SET category = NEW.name
+    WHERE rowid IN (SELECT id FROM transactions WHERE category_id = NEW.id);
+END;
+
+
+-- =========================
+-- Statement Processing Progress
+-- =========================
+-- Live counters written by the ingestion pipeline as pages stream through it
+CREATE TABLE IF NOT EXISTS statement_progress (
+    statement_id INTEGER PRIMARY KEY,
+    pages_total INTEGER NOT NULL DEFAULT 0,
+    pages_done INTEGER NOT NULL DEFAULT 0,
+    lines_parsed INTEGER NOT NULL DEFAULT 0,
+    rows_inserted INTEGER NOT NULL DEFAULT 0,
+    rows_skipped INTEGER NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (statement_id) REFERENCES statements(id) ON DELETE CASCADE
+);
+
+-- =========================
+-- Statement Processing Jobs
+-- =========================
+-- Durable queue drained by worker.py. A job is 'queued' until a worker claims
+-- it ('running'); it then ends 'done', returns to 'queued' with a later
+-- run_after to retry, or ends 'failed' once max_attempts is used up.
+-- Running jobs whose heartbeat stops (worker crashed) are requeued.
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    statement_id INTEGER NOT NULL,
+    pdf_path TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (
+        status IN ('queued', 'running', 'done', 'failed')
+    ),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by TEXT,
+    heartbeat_at DATETIME,
+    last_error TEXT,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (statement_id) REFERENCES statements(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after
+ON jobs(status, run_after);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_statement
+ON jobs(statement_id);
+
+
+-- =========================
+-- LLM Response Cache
+-- =========================
+-- Parsed LLM results keyed by sha256(model, prompt template version, input).
+-- Evicted least-recently-used first once the total size passes the cap
+-- (tool/llm_cache.py). Clear with: python -m db clear-llm-cache
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    template_version TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    last_used INTEGER NOT NULL,  -- Unix time in ms
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used
+ON llm_cache(last_used);
@@ -0,0 +1,74 @@
+"""
+Database maintenance commands.
+
+Usage (from the api directory):
+    python -m db rebuild-rollups
+    python -m db reclassify-internal
+    python -m db refingerprint-vendors
+    python -m db rebuild-search
+    python -m db llm-cache-stats
+    python -m db clear-llm-cache
+"""
+import argparse
+
+from db.db import (
+    clear_llm_cache,
+    get_llm_cache_summary,
+    init_db,
+    rebuild_monthly_rollups,
+    rebuild_search_index,
+    reclassify_internal_transactions,
+    refingerprint_vendors,
+)
+from tool.logging_config import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m db", description="Expense AI database maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild-rollups", help="Recompute monthly_rollups from transactions")
+    commands.add_parser(
+        "reclassify-internal",
+        help="Re-apply core/internal_movements.py rules to stored transactions",
+    )
+    commands.add_parser(
+        "refingerprint-vendors",
+        help="Recompute vendor_cache fingerprints with core/vendor_fingerprint.py",
+    )
+    commands.add_parser("rebuild-search", help="Recompute the transactions_fts full-text index")
+    commands.add_parser("llm-cache-stats", help="Show LLM response cache size and lifetime hits")
+    commands.add_parser("clear-llm-cache", help="Delete all cached LLM responses")
+
+    args = parser.parse_args()
+    init_db()
+
+    if args.command == "rebuild-rollups":
+        rows = rebuild_monthly_rollups()
+        logger.info(f"Rebuilt monthly_rollups ({rows} rows)")
+
+    elif args.command == "reclassify-internal":
+        changed = reclassify_internal_transactions()
+        logger.info(f"Reclassified {changed} transactions")
+
+    elif args.command == "refingerprint-vendors":
+        changed = refingerprint_vendors()
+        logger.info(f"Updated {changed} vendor fingerprints")
+
+    elif args.command == "rebuild-search":
+        rows = rebuild_search_index()
+        logger.info(f"Rebuilt transactions_fts ({rows} transactions)")
+
+    elif args.command == "llm-cache-stats":
+        summary = get_llm_cache_summary()
+        logger.info(
+            f"LLM cache: {summary['entries']} entries, {summary['bytes']} bytes,"
+            f" {summary['hits']} hits"
+        )
+
+    elif args.command == "clear-llm-cache":
+        deleted = clear_llm_cache()
+        logger.info(f"Deleted {deleted} cached LLM responses")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
+from collections import Counter
+from contextlib import contextmanager
 from pathlib import Path
+import re
 import sqlite3
-from typing import List, Optional, Dict, Any
+import threading
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Set, Tuple
+
+from core.internal_movements import is_internal_movement
+from core.transaction_key import next_transaction_key, statement_account
+from core.vendor_fingerprint import vendor_fingerprint
+from tool.logging_config import logger
 
 # =========================
 # Configuration
@@ -10,27 +19,305 @@ DATA_DIR = Path("data")
 DB_PATH = DATA_DIR / "expense_ai.db"
 SCHEMA_PATH = DATA_DIR / "schema.sql"
 
+# Applied once when a connection is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",      # readers don't block the writer
+    "PRAGMA synchronous = NORMAL",    # safe with WAL, far fewer fsyncs
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -65536",     # 64 MiB page cache
+    "PRAGMA mmap_size = 268435456",   # 256 MiB memory-mapped I/O
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Rows that count as spending: ISO-dated and not an internal payment/transfer.
+# Must match the monthly_rollups triggers in schema.sql.
+SPENDING_FILTER = "{t}year IS NOT NULL AND {t}is_internal = 0"
+
 
 # =========================
 # Connection Helpers
 # =========================
 
-def get_connection() -> sqlite3.Connection:
+_local = threading.local()
+
+
+def _open_connection() -> sqlite3.Connection:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    # Lets SQL (re)classify stored rows with the same rules used at ingest
+    conn.create_function(
+        "is_internal_movement",
+        2,
+        lambda raw, normalized: int(is_internal_movement(raw, normalized)),
+        deterministic=True,
+    )
+    conn.create_function("vendor_fingerprint", 1, vendor_fingerprint, deterministic=True)
     return conn
 
 
+def get_connection() -> sqlite3.Connection:
+    """
+    Return this thread's connection, opening and configuring it on first use.
+    The connection is reused across calls; do not close it.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _open_connection()
+        _local.conn = conn
+        _local.depth = 0
+    return conn
+
+
+def close_connection():
+    """
+    Close this thread's connection, if one is open.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Run the enclosed statements as one transaction on this thread's connection.
+    Commits on success and rolls back on error. Nested blocks join the outer
+    transaction, which is committed only when the outermost block exits.
+    """
+    conn = get_connection()
+    _local.depth += 1
+    try:
+        yield conn
+    except BaseException:
+        _local.depth -= 1
+        if _local.depth == 0:
+            conn.rollback()
+        raise
+    _local.depth -= 1
+    if _local.depth == 0:
+        conn.commit()
+
+
 def init_db():
     if not SCHEMA_PATH.exists():
         raise FileNotFoundError(f"Schema file not found: {SCHEMA_PATH}")
 
     conn = get_connection()
+    added_columns = _migrate_columns(conn)
+    _release_duplicate_content_hashes(conn)
     with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
         conn.executescript(f.read())
     conn.commit()
-    conn.close()
+
+    if "transactions.is_internal" in added_columns:
+        reclassify_internal_transactions()
+        rebuild_monthly_rollups()
+    if {"transactions.natural_key", "statements.account_number"} & added_columns:
+        _backfill_natural_keys()
+    _backfill_monthly_rollups(conn)
+    _backfill_vendor_fingerprints()
+    _backfill_search_index(conn)
+
+
+# Columns added after the first release, applied to existing databases
+# before schema.sql runs (so its indexes and triggers can use them).
+# Virtual generated columns need no data backfill; building the index does it.
+COLUMN_MIGRATIONS = {
+    "statements": {
+        "content_hash": "content_hash TEXT",
+        "issuer": "issuer TEXT",
+        "account_number": "account_number TEXT",
+    },
+    "transactions": {
+        "year": """
+            year INTEGER GENERATED ALWAYS AS (
+                CASE WHEN transaction_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+                THEN CAST(substr(transaction_date, 1, 4) AS INTEGER) END
+            ) VIRTUAL
+        """,
+        "month": """
+            month INTEGER GENERATED ALWAYS AS (
+                CASE WHEN transaction_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+                THEN CAST(substr(transaction_date, 6, 2) AS INTEGER) END
+            ) VIRTUAL
+        """,
+        "is_internal": "is_internal INTEGER NOT NULL DEFAULT 0",
+        "natural_key": "natural_key TEXT",
+    },
+    "vendor_cache": {
+        "fingerprint": "fingerprint TEXT",
+    },
+}
+
+
+def _migrate_columns(conn: sqlite3.Connection) -> Set[str]:
+    """
+    Add any missing columns to existing tables.
+    Returns the added columns as "table.column".
+    """
+    added = set()
+    for table, columns in COLUMN_MIGRATIONS.items():
+        existing = {
+            row["name"]
+            for row in conn.execute(f"PRAGMA table_xinfo({table})").fetchall()
+        }
+        if not existing:
+            continue  # Fresh table; schema.sql creates it in full
+
+        for name, ddl in columns.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+                added.add(f"{table}.{name}")
+    conn.commit()
+    return added
+
+
+def _release_duplicate_content_hashes(conn: sqlite3.Connection):
+    """
+    Before the unique content_hash index exists, concurrent uploads could
+    create several live statements for one file. Keep the hash on the
+    earliest of each, so schema.sql can build the index.
+    """
+    has_index = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_statements_content_hash_active'"
+    ).fetchone()
+    has_column = any(
+        row["name"] == "content_hash"
+        for row in conn.execute("PRAGMA table_info(statements)").fetchall()
+    )
+    if has_index or not has_column:
+        return
+
+    with transaction():
+        released = conn.execute(
+            """
+            UPDATE statements
+            SET content_hash = NULL
+            WHERE content_hash IS NOT NULL
+              AND status != 'failed'
+              AND id NOT IN (
+                  SELECT MIN(id)
+                  FROM statements
+                  WHERE content_hash IS NOT NULL AND status != 'failed'
+                  GROUP BY content_hash
+              )
+            """
+        ).rowcount
+    if released:
+        logger.warning(f"Cleared content_hash of {released} duplicate uploads")
+
+
+def _backfill_monthly_rollups(conn: sqlite3.Connection):
+    """
+    Populate monthly_rollups for databases created before the table existed.
+    """
+    has_rollups = conn.execute("SELECT 1 FROM monthly_rollups LIMIT 1").fetchone()
+    has_transactions = conn.execute("SELECT 1 FROM transactions LIMIT 1").fetchone()
+    if has_transactions and not has_rollups:
+        rebuild_monthly_rollups()
+
+
+def _backfill_search_index(conn: sqlite3.Connection):
+    """
+    Populate transactions_fts for databases created before it existed.
+    """
+    has_index = conn.execute("SELECT 1 FROM transactions_fts LIMIT 1").fetchone()
+    has_transactions = conn.execute("SELECT 1 FROM transactions LIMIT 1").fetchone()
+    if has_transactions and not has_index:
+        rebuild_search_index()
+
+
+def rebuild_search_index() -> int:
+    """
+    Recompute transactions_fts from transactions and categories.
+    Returns the number of indexed transactions.
+    """
+    with transaction() as conn:
+        conn.execute("DELETE FROM transactions_fts")
+        cur = conn.execute(
+            """
+            INSERT INTO transactions_fts (rowid, vendor_raw, vendor_normalized, category)
+            SELECT t.id, t.vendor_raw, COALESCE(t.vendor_normalized, ''), COALESCE(c.name, '')
+            FROM transactions t
+            LEFT JOIN categories c ON t.category_id = c.id
+            """
+        )
+        conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('optimize')")
+        return cur.rowcount
+
+
+def _backfill_natural_keys():
+    """
+    Key transactions imported before natural keys (or their account part)
+    existed. Rows whose key is already taken are earlier duplicates; they keep
+    their previous key and are logged.
+    """
+    conn = get_connection()
+    rows = conn.execute(
+        """
+        SELECT t.id, t.statement_id, s.issuer, s.account_number, t.transaction_date, t.amount, t.vendor_raw
+        FROM transactions t
+        JOIN statements s ON s.id = t.statement_id
+        WHERE s.source_type = 'pdf'
+        ORDER BY t.statement_id, t.id
+        """
+    ).fetchall()
+
+    keys = []
+    occurrences: Counter = Counter()
+    current_statement = None
+    for row in rows:
+        if row["statement_id"] != current_statement:
+            current_statement, occurrences = row["statement_id"], Counter()
+        key = next_transaction_key(
+            occurrences,
+            statement_account(row["statement_id"], row["issuer"], row["account_number"]),
+            row["transaction_date"],
+            row["amount"],
+            row["vendor_raw"],
+        )
+        keys.append((key, row["id"]))
+
+    with transaction() as conn:
+        cur = conn.executemany("UPDATE OR IGNORE transactions SET natural_key = ? WHERE id = ?", keys)
+        duplicates = len(keys) - cur.rowcount
+    if duplicates:
+        logger.warning(f"{duplicates} existing duplicate transactions were left without a new natural key")
+
+
+def _backfill_vendor_fingerprints():
+    """
+    Fill in fingerprints for vendor_cache rows cached before they existed.
+    """
+    with transaction() as conn:
+        conn.execute(
+            """
+            UPDATE vendor_cache
+            SET fingerprint = vendor_fingerprint(raw_vendor)
+            WHERE fingerprint IS NULL
+            """
+        )
+
+
+def refingerprint_vendors() -> int:
+    """
+    Recompute every vendor_cache fingerprint (after the rules change).
+    Returns the number of rows whose fingerprint changed.
+    """
+    with transaction() as conn:
+        cur = conn.execute(
+            """
+            UPDATE vendor_cache
+            SET fingerprint = vendor_fingerprint(raw_vendor)
+            WHERE fingerprint IS NOT vendor_fingerprint(raw_vendor)
+            """
+        )
+        return cur.rowcount
 
 
 # =========================
@@ -42,20 +329,33 @@ def create_statement(
     file_size: int,
     status: str,
     source_type: str = "pdf",
+    content_hash: Optional[str] = None,
 ) -> int:
+    with transaction() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO statements (filename, file_size, status, source_type, content_hash)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (filename, file_size, status, source_type, content_hash),
+        )
+        return cur.lastrowid
+
+
+def get_statement_by_hash(content_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    The statement uploaded with this SHA-256 that has not failed, if any.
+    """
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
+    row = conn.execute(
         """
-        INSERT INTO statements (filename, file_size, status, source_type)
-        VALUES (?, ?, ?, ?)
+        SELECT *
+        FROM statements
+        WHERE content_hash = ? AND status != 'failed'
         """,
-        (filename, file_size, status, source_type),
-    )
-    conn.commit()
-    statement_id = cur.lastrowid
-    conn.close()
-    return statement_id
+        (content_hash,),
+    ).fetchone()
+    return dict(row) if row else None
 
 
 def create_manual_statement(filename: str) -> int:
@@ -63,25 +363,37 @@ def create_manual_statement(filename: str) -> int:
     Create a manual statement container.
     Always completed, file_size = 0, source_type = manual.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO statements (
-            filename,
-            file_size,
-            status,
-            source_type,
-            processed_at
+    with transaction() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO statements (
+                filename,
+                file_size,
+                status,
+                source_type,
+                processed_at
+            )
+            VALUES (?, 0, 'completed', 'manual', CURRENT_TIMESTAMP)
+            """,
+            (filename,),
+        )
+        return cur.lastrowid
+
+
+def set_statement_account(
+    statement_id: int,
+    issuer: Optional[str],
+    account_number: Optional[str],
+):
+    """
+    Record the bank profile and card/account number read from a statement;
+    its transactions' natural keys use them as the account.
+    """
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE statements SET issuer = ?, account_number = ? WHERE id = ?",
+            (issuer, account_number, statement_id),
         )
-        VALUES (?, 0, 'completed', 'manual', CURRENT_TIMESTAMP)
-        """,
-        (filename,),
-    )
-    conn.commit()
-    statement_id = cur.lastrowid
-    conn.close()
-    return statement_id
 
 
 def update_statement_status(
@@ -89,85 +401,264 @@ def update_statement_status(
     status: str,
     error_message: Optional[str] = None,
 ):
-    conn = get_connection()
-    conn.execute(
-        """
-        UPDATE statements
-        SET status = ?, 
-            error_message = ?,
-            processed_at = CASE 
-                WHEN ? IN ('completed', 'failed') THEN CURRENT_TIMESTAMP
-                ELSE processed_at
-            END
-        WHERE id = ?
-        """,
-        (status, error_message, status, statement_id),
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(
+            """
+            UPDATE statements
+            SET status = ?, 
+                error_message = ?,
+                processed_at = CASE 
+                    WHEN ? IN ('completed', 'failed') THEN CURRENT_TIMESTAMP
+                    ELSE processed_at
+                END
+            WHERE id = ?
+            """,
+            (status, error_message, status, statement_id),
+        )
 
 
-def update_statement_filename(statement_id: int, filename: str):
-    conn = get_connection()
-    conn.execute(
-        """
-        UPDATE statements
-        SET filename = ?
-        WHERE id = ?
-        """,
-        (filename, statement_id),
-    )
-    conn.commit()
-    conn.close()
+def fail_statement(statement_id: int, error_message: str) -> int:
+    """
+    Mark a statement failed and delete the transactions it had inserted so far
+    (monthly_rollups and transactions_fts follow via triggers), so a partial
+    import neither shows up in spending nor shadows a re-upload as duplicates.
+    Returns the number of transactions deleted.
+    """
+    with transaction() as conn:
+        deleted = conn.execute(
+            "DELETE FROM transactions WHERE statement_id = ?",
+            (statement_id,),
+        ).rowcount
+        update_statement_status(statement_id, "failed", error_message)
+    if deleted:
+        logger.info(f"Deleted {deleted} partially imported transactions of failed statement {statement_id}")
+    return deleted
+
+
+def update_statement_filename(statement_id: int, filename: str) -> bool:
+    """
+    Returns False if the statement does not exist.
+    """
+    with transaction() as conn:
+        cur = conn.execute(
+            """
+            UPDATE statements
+            SET filename = ?
+            WHERE id = ?
+            """,
+            (filename, statement_id),
+        )
+        return cur.rowcount > 0
+
+
+# Per-statement transaction count, total and date span, aggregated in the
+# same query as the statements themselves ({statements} selects the rows)
+STATEMENT_SUMMARY_QUERY = """
+    SELECT
+        s.*,
+        COUNT(t.id) AS transaction_count,
+        ROUND(COALESCE(SUM(t.amount), 0), 2) AS total_amount,
+        MIN(t.transaction_date) AS first_transaction_date,
+        MAX(t.transaction_date) AS last_transaction_date
+    FROM ({statements}) s
+    LEFT JOIN transactions t ON t.statement_id = s.id
+    GROUP BY s.id
+"""
 
 
-def get_statements() -> List[Dict[str, Any]]:
+def get_statement_by_id(statement_id: int) -> Optional[Dict[str, Any]]:
+    """
+    One statement with its transaction summary, by primary key.
+    """
     conn = get_connection()
-    rows = conn.execute(
-        """
+    row = conn.execute(
+        STATEMENT_SUMMARY_QUERY.format(statements="SELECT * FROM statements WHERE id = ?"),
+        (statement_id,),
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def get_statements(
+    after: Optional[Tuple[str, int]] = None,
+    limit: Optional[int] = None,
+    source_type: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Statements with their transaction summary, newest first, ordered by
+    (uploaded_at, id) descending. With `after`, resumes strictly after that
+    (uploaded_at, id) key; with `source_type`, only statements of that type.
+    Only the selected page is aggregated.
+    """
+    conditions, params = [], []
+    if source_type:
+        conditions.append("source_type = ?")
+        params.append(source_type)
+    if after:
+        conditions.append("(uploaded_at, id) < (?, ?)")
+        params.extend(after)
+
+    page = f"""
         SELECT *
         FROM statements
-        ORDER BY uploaded_at DESC
-        """
+        {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        ORDER BY uploaded_at DESC, id DESC
+        LIMIT ?
+    """
+    conn = get_connection()
+    rows = conn.execute(
+        STATEMENT_SUMMARY_QUERY.format(statements=page) + "ORDER BY s.uploaded_at DESC, s.id DESC",
+        (*params, -1 if limit is None else limit),
     ).fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 
+def start_statement_progress(statement_id: int, pages_total: int):
+    """
+    Reset a statement's ingestion counters (also on a retried job).
+    """
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO statement_progress (statement_id, pages_total)
+            VALUES (?, ?)
+            """,
+            (statement_id, pages_total),
+        )
+
+
+def add_statement_progress(
+    statement_id: int,
+    pages_done: int = 0,
+    lines_parsed: int = 0,
+    rows_inserted: int = 0,
+    rows_skipped: int = 0,
+):
+    with transaction() as conn:
+        conn.execute(
+            """
+            UPDATE statement_progress
+            SET pages_done = pages_done + ?,
+                lines_parsed = lines_parsed + ?,
+                rows_inserted = rows_inserted + ?,
+                rows_skipped = rows_skipped + ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE statement_id = ?
+            """,
+            (pages_done, lines_parsed, rows_inserted, rows_skipped, statement_id),
+        )
+
+
+def get_statement_progress(statement_id: int) -> Optional[Dict[str, Any]]:
+    conn = get_connection()
+    row = conn.execute(
+        "SELECT * FROM statement_progress WHERE statement_id = ?",
+        (statement_id,),
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def get_statement_snapshots(statement_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Status and ingestion counters of several statements, by id.
+    Counters are 0 for statements without a statement_progress row.
+    """
+    if not statement_ids:
+        return {}
+    conn = get_connection()
+    placeholders = ",".join("?" * len(statement_ids))
+    rows = conn.execute(
+        f"""
+        SELECT
+            s.id AS statement_id,
+            s.status,
+            s.error_message,
+            COALESCE(p.pages_total, 0) AS pages_total,
+            COALESCE(p.pages_done, 0) AS pages_done,
+            COALESCE(p.lines_parsed, 0) AS lines_parsed,
+            COALESCE(p.rows_inserted, 0) AS rows_inserted,
+            COALESCE(p.rows_skipped, 0) AS rows_skipped
+        FROM statements s
+        LEFT JOIN statement_progress p ON p.statement_id = s.id
+        WHERE s.id IN ({placeholders})
+        """,
+        list(statement_ids),
+    ).fetchall()
+    return {row["statement_id"]: dict(row) for row in rows}
+
+
+def get_data_version() -> int:
+    """
+    Changes whenever another connection (e.g. a worker process) commits,
+    so callers can skip re-reading tables that cannot have changed.
+    """
+    return get_connection().execute("PRAGMA data_version").fetchone()[0]
+
 # =========================
 # Transaction Operations
 # =========================
 
 def insert_transactions(
     statement_id: int,
-    transactions: List[Dict[str, Any]],
-):
-    conn = get_connection()
-    cur = conn.cursor()
-
-    for tx in transactions:
-        cur.execute(
+    transactions: Iterable[Dict[str, Any]],
+    occurrences: Optional[Counter] = None,
+) -> Tuple[int, int]:
+    """
+    Bulk insert parsed transactions in a single database transaction.
+    Accepts any iterable (including generators), so rows are streamed to
+    executemany without building a full list.
+
+    Each row gets a natural key (core/transaction_key.py) on the statement's
+    account; rows whose key already exists, from a re-import or an
+    overlapping statement of the same account, are skipped.
+    Pass the same `occurrences` Counter to every batch of one import.
+    Returns (inserted, skipped) row counts.
+    """
+    occurrences = Counter() if occurrences is None else occurrences
+    total = 0
+
+    with transaction() as conn:
+        source = conn.execute(
+            "SELECT issuer, account_number FROM statements WHERE id = ?",
+            (statement_id,),
+        ).fetchone()
+        if not source:
+            raise ValueError("Statement not found")
+        account = statement_account(statement_id, source["issuer"], source["account_number"])
+
+        def rows():
+            nonlocal total
+            for tx in transactions:
+                total += 1
+                yield (
+                    statement_id,
+                    tx["date"],
+                    tx["vendor_raw"],
+                    tx.get("vendor"),
+                    tx["amount"],
+                    int(is_internal_movement(tx["vendor_raw"], tx.get("vendor"))),
+                    next_transaction_key(
+                        occurrences, account, tx["date"], tx["amount"], tx["vendor_raw"]
+                    ),
+                )
+
+        cur = conn.executemany(
             """
             INSERT INTO transactions (
                 statement_id,
                 transaction_date,
                 vendor_raw,
                 vendor_normalized,
-                amount
+                amount,
+                is_internal,
+                natural_key
             )
-            VALUES (?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (natural_key) DO NOTHING
             """,
-            (
-                statement_id,
-                tx["date"],
-                tx["vendor_raw"],
-                tx.get("vendor"),
-                tx["amount"],
-            ),
+            rows(),
         )
-
-    conn.commit()
-    conn.close()
+        inserted = max(cur.rowcount, 0)
+        return inserted, total - inserted
 
 
 def insert_manual_transaction(
@@ -182,41 +673,43 @@ def insert_manual_transaction(
     Insert a manual transaction.
     Only allowed for manual statements.
     """
-    conn = get_connection()
-    cur = conn.cursor()
+    with transaction() as conn:
+        stmt = conn.execute(
+            "SELECT source_type FROM statements WHERE id = ?",
+            (statement_id,),
+        ).fetchone()
 
-    stmt = cur.execute(
-        "SELECT source_type FROM statements WHERE id = ?",
-        (statement_id,),
-    ).fetchone()
-
-    if not stmt or stmt["source_type"] != "manual":
-        conn.close()
-        raise ValueError("Manual transactions must belong to a manual statement")
+        if not stmt or stmt["source_type"] != "manual":
+            raise ValueError("Manual transactions must belong to a manual statement")
 
-    # category_id = None
-    # if category_name:
-    #     category_id = get_or_create_category(category_name)
+        # category_id = None
+        # if category_name:
+        #     category_id = get_or_create_category(category_name)
 
-    cur.execute(
-        """
-        INSERT INTO transactions (
-            statement_id,
-            transaction_date,
-            vendor_raw,
-            vendor_normalized,
-            amount,
-            category_id
+        cur = conn.execute(
+            """
+            INSERT INTO transactions (
+                statement_id,
+                transaction_date,
+                vendor_raw,
+                vendor_normalized,
+                amount,
+                category_id,
+                is_internal
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                statement_id,
+                transaction_date,
+                vendor_raw,
+                vendor_normalized,
+                amount,
+                category_id,
+                int(is_internal_movement(vendor_raw, vendor_normalized)),
+            ),
         )
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (statement_id, transaction_date, vendor_raw, vendor_normalized, amount, category_id),
-    )
-
-    transaction_id = cur.lastrowid
-    conn.commit()
-    conn.close()
-    return transaction_id
+        return cur.lastrowid
 
 
 def update_manual_transaction(
@@ -226,125 +719,103 @@ def update_manual_transaction(
     """
     Update a manual transaction.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-
-    row = cur.execute(
-        """
-        SELECT s.source_type
-        FROM transactions t
-        JOIN statements s ON t.statement_id = s.id
-        WHERE t.id = ?
-        """,
-        (transaction_id,),
-    ).fetchone()
+    with transaction() as conn:
+        row = conn.execute(
+            """
+            SELECT s.source_type, t.vendor_normalized
+            FROM transactions t
+            JOIN statements s ON t.statement_id = s.id
+            WHERE t.id = ?
+            """,
+            (transaction_id,),
+        ).fetchone()
 
-    if not row or row["source_type"] != "manual":
-        conn.close()
-        raise ValueError("Only manual transactions can be updated")
+        if not row or row["source_type"] != "manual":
+            raise ValueError("Only manual transactions can be updated")
 
-    fields = []
-    values = []
+        fields = []
+        values = []
 
-    for key in ("transaction_date", "vendor_raw", "amount"):
-        if key in updates:
-            fields.append(f"{key} = ?")
-            values.append(updates[key])
+        for key in ("transaction_date", "vendor_raw", "amount"):
+            if key in updates:
+                fields.append(f"{key} = ?")
+                values.append(updates[key])
 
-    if "category" in updates:
-        category_id = (
-            get_or_create_category(updates["category"])
-            if updates["category"]
-            else None
-        )
-        fields.append("category_id = ?")
-        values.append(category_id)
+        if "vendor_raw" in updates:
+            fields.append("is_internal = ?")
+            values.append(int(is_internal_movement(updates["vendor_raw"], row["vendor_normalized"])))
 
-    if not fields:
-        conn.close()
-        return
+        if "category" in updates:
+            category_id = (
+                get_or_create_category(updates["category"])
+                if updates["category"]
+                else None
+            )
+            fields.append("category_id = ?")
+            values.append(category_id)
 
-    values.append(transaction_id)
+        if not fields:
+            return
 
-    cur.execute(
-        f"""
-        UPDATE transactions
-        SET {', '.join(fields)}
-        WHERE id = ?
-        """,
-        values,
-    )
+        values.append(transaction_id)
 
-    transaction_id = cur.lastrowid
-    conn.commit()
-    conn.close()
-    return transaction_id
+        cur = conn.execute(
+            f"""
+            UPDATE transactions
+            SET {', '.join(fields)}
+            WHERE id = ?
+            """,
+            values,
+        )
+        return cur.lastrowid
 
 
 def delete_manual_transaction(transaction_id: int):
     """
     Delete a manual transaction.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-
-    row = cur.execute(
-        """
-        SELECT s.source_type
-        FROM transactions t
-        JOIN statements s ON t.statement_id = s.id
-        WHERE t.id = ?
-        """,
-        (transaction_id,),
-    ).fetchone()
+    with transaction() as conn:
+        row = conn.execute(
+            """
+            SELECT s.source_type
+            FROM transactions t
+            JOIN statements s ON t.statement_id = s.id
+            WHERE t.id = ?
+            """,
+            (transaction_id,),
+        ).fetchone()
 
-    if not row or row["source_type"] != "manual":
-        conn.close()
-        raise ValueError("Only manual transactions can be deleted")
+        if not row or row["source_type"] != "manual":
+            raise ValueError("Only manual transactions can be deleted")
 
-    cur.execute(
-        "DELETE FROM transactions WHERE id = ?",
-        (transaction_id,),
-    )
-
-    conn.commit()
-    conn.close()
+        conn.execute(
+            "DELETE FROM transactions WHERE id = ?",
+            (transaction_id,),
+        )
 
 
 def get_transactions_for_statement(
     statement_id: int,
+    after: Optional[Tuple[str, int]] = None,
+    limit: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
+    """
+    Transactions of a statement ordered by (transaction_date, id).
+    With `after`, resumes strictly after that (transaction_date, id) key.
+    """
     conn = get_connection()
     rows = conn.execute(
-        """
+        f"""
         SELECT t.*, c.name AS category
         FROM transactions t
         LEFT JOIN categories c ON t.category_id = c.id
         WHERE t.statement_id = ?
-        ORDER BY t.transaction_date
+            {"AND (t.transaction_date, t.id) > (?, ?)" if after else ""}
+        ORDER BY t.transaction_date, t.id
+        LIMIT ?
         """,
-        (statement_id,),
+        (statement_id, *(after or ()), -1 if limit is None else limit),
     ).fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
-
-def get_transactions_for_statement_exclude_payment(
-    statement_id: int,
-) -> List[Dict[str, Any]]:
-    conn = get_connection()
-    rows = conn.execute(
-        """
-        SELECT t.*, c.name AS category
-        FROM transactions t
-        LEFT JOIN categories c ON t.category_id = c.id
-        WHERE t.statement_id = ? 
-            AND t.vendor_normalized NOT LIKE '%payment%'
-            AND t.vendor_raw NOT LIKE '%payment%'   
-        ORDER BY t.transaction_date
-        """,
-        (statement_id,),
-    ).fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 
@@ -352,17 +823,15 @@ def assign_category_to_transactions(
     transaction_ids: List[int],
     category_id: int,
 ):
-    conn = get_connection()
-    conn.execute(
-        f"""
-        UPDATE transactions
-        SET category_id = ?
-        WHERE id IN ({','.join('?' * len(transaction_ids))})
-        """,
-        [category_id, *transaction_ids],
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(
+            f"""
+            UPDATE transactions
+            SET category_id = ?
+            WHERE id IN ({','.join('?' * len(transaction_ids))})
+            """,
+            [category_id, *transaction_ids],
+        )
 
 
 def is_manual_transaction(transaction_id: int) -> bool:
@@ -376,7 +845,6 @@ def is_manual_transaction(transaction_id: int) -> bool:
         """,
         (transaction_id,),
     ).fetchone()
-    conn.close()
     return row is not None
 
 
@@ -391,10 +859,91 @@ def get_transaction_by_id(transaction_id: int) -> Optional[Dict[str, Any]]:
         """,
         (transaction_id,),
     ).fetchone()
-    conn.close()
     return dict(row) if row else None
 
 
+# =========================
+# Dashboard Operations
+# =========================
+
+def get_monthly_expense_totals(year: int) -> List[Dict[str, Any]]:
+    """
+    Total spending per month for a year, read from monthly_rollups.
+    Returns [{month, expense}] ordered by month; months without spending are omitted.
+    """
+    conn = get_connection()
+    rows = conn.execute(
+        """
+        SELECT month, ROUND(SUM(net_amount), 2) AS expense
+        FROM monthly_rollups
+        WHERE year = ?
+        GROUP BY month
+        ORDER BY month
+        """,
+        (year,),
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def get_transactions_for_month(year: int, month: int) -> List[Dict[str, Any]]:
+    """
+    All spending transactions in a month, ordered by date.
+    """
+    conn = get_connection()
+    rows = conn.execute(
+        f"""
+        SELECT t.*, c.name AS category
+        FROM transactions t
+        LEFT JOIN categories c ON t.category_id = c.id
+        WHERE t.year = ? AND t.month = ?
+            AND {SPENDING_FILTER.format(t="t.")}
+        ORDER BY t.transaction_date
+        """,
+        (year, month),
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def reclassify_internal_transactions() -> int:
+    """
+    Re-apply the internal-movement rules to every stored transaction.
+    Returns the number of rows whose flag changed; rollups follow via triggers.
+    """
+    with transaction() as conn:
+        cur = conn.execute(
+            """
+            UPDATE transactions
+            SET is_internal = is_internal_movement(vendor_raw, vendor_normalized)
+            WHERE is_internal != is_internal_movement(vendor_raw, vendor_normalized)
+            """
+        )
+        return cur.rowcount
+
+
+def rebuild_monthly_rollups() -> int:
+    """
+    Recompute monthly_rollups from the transactions table.
+    Returns the number of rollup rows written.
+    """
+    with transaction() as conn:
+        conn.execute("DELETE FROM monthly_rollups")
+        cur = conn.execute(
+            f"""
+            INSERT INTO monthly_rollups (year, month, category_id, net_amount, txn_count)
+            SELECT
+                year,
+                month,
+                COALESCE(category_id, 0),
+                SUM(amount),
+                COUNT(*)
+            FROM transactions
+            WHERE {SPENDING_FILTER.format(t="")}
+            GROUP BY 1, 2, 3
+            """
+        )
+        return cur.rowcount
+
+
 # =========================
 # Category Operations
 # =========================
@@ -403,29 +952,23 @@ def get_or_create_category(
     name: str,
     parent_id: Optional[int] = None,
 ) -> int:
-    conn = get_connection()
-    cur = conn.cursor()
+    with transaction() as conn:
+        row = conn.execute(
+            "SELECT id FROM categories WHERE name = ?",
+            (name,),
+        ).fetchone()
 
-    row = cur.execute(
-        "SELECT id FROM categories WHERE name = ?",
-        (name,),
-    ).fetchone()
+        if row:
+            return row["id"]
 
-    if row:
-        conn.close()
-        return row["id"]
-
-    cur.execute(
-        """
-        INSERT INTO categories (name, parent_id)
-        VALUES (?, ?)
-        """,
-        (name, parent_id),
-    )
-    conn.commit()
-    category_id = cur.lastrowid
-    conn.close()
-    return category_id
+        cur = conn.execute(
+            """
+            INSERT INTO categories (name, parent_id)
+            VALUES (?, ?)
+            """,
+            (name, parent_id),
+        )
+        return cur.lastrowid
 
 
 def get_categories() -> List[Dict[str, Any]]:
@@ -437,7 +980,6 @@ def get_categories() -> List[Dict[str, Any]]:
         ORDER BY name
         """
     ).fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 
@@ -446,45 +988,92 @@ def get_categories() -> List[Dict[str, Any]]:
 # =========================
 
 
-def get_yearly_transactions(year: int):
-    """Fetches all transactions for a specific year including category names."""
+def get_yearly_transactions(
+    year: int,
+    after: Optional[Tuple[str, int]] = None,
+    limit: Optional[int] = None,
+):
+    """
+    Fetches transactions for a specific year including category names,
+    newest first by (transaction_date, id). With `after`, resumes strictly
+    after that key.
+    """
     conn = get_connection()
-    query = """
+    query = f"""
         SELECT 
+            t.id,
             t.transaction_date, 
             t.vendor_raw as vendor, 
             t.amount, 
             c.name as category 
         FROM transactions t 
         LEFT JOIN categories c ON t.category_id = c.id 
-        WHERE strftime('%Y', t.transaction_date) = ?
-        ORDER BY t.transaction_date DESC
+        WHERE t.year = ?
+            {"AND (t.transaction_date, t.id) < (?, ?)" if after else ""}
+        ORDER BY t.transaction_date DESC, t.id DESC
+        LIMIT ?
     """
-    rows = conn.execute(query, (str(year),)).fetchall()
-    conn.close()
+    rows = conn.execute(query, (year, *(after or ()), -1 if limit is None else limit)).fetchall()
     return [dict(row) for row in rows]
 
-def search_transactions(query_term: str):
-    """Search for transactions by vendor name or category name."""
+def _fts_query(query_term: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word must match as a prefix.
+    'star buck' -> '"star"* "buck"*'
+    """
+    words = re.findall(r"\w+", query_term)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_transactions(
+    query_term: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    limit: int = 100,
+):
+    """
+    Full-text search over vendor and category names, best matches first.
+    Each word matches as a prefix; all words must match. Optional filters
+    narrow by date (inclusive, YYYY-MM-DD) and amount.
+    """
+    match = _fts_query(query_term)
+    if not match:
+        return []
+
+    filters = []
+    params: List[Any] = [match]
+    if start_date:
+        filters.append("t.transaction_date >= ?")
+        params.append(start_date)
+    if end_date:
+        filters.append("t.transaction_date <= ?")
+        params.append(end_date)
+    if min_amount is not None:
+        filters.append("t.amount >= ?")
+        params.append(min_amount)
+    if max_amount is not None:
+        filters.append("t.amount <= ?")
+        params.append(max_amount)
+    params.append(limit)
+
     conn = get_connection()
-    # Flexible search across both vendor and category
-    query = """
+    query = f"""
         SELECT 
             t.transaction_date, 
             t.vendor_raw as vendor, 
             t.amount, 
             c.name as category 
-        FROM transactions t 
+        FROM transactions_fts f
+        JOIN transactions t ON t.id = f.rowid
         LEFT JOIN categories c ON t.category_id = c.id 
-        WHERE t.vendor_raw LIKE ? 
-           OR t.vendor_normalized LIKE ? 
-           OR c.name LIKE ?
-        ORDER BY t.transaction_date DESC
-        LIMIT 100
-    """
-    search_val = f"%{query_term}%"
-    rows = conn.execute(query, (search_val, search_val, search_val)).fetchall()
-    conn.close()
+        WHERE transactions_fts MATCH ?
+            {''.join(f" AND {clause}" for clause in filters)}
+        ORDER BY bm25(transactions_fts, 1.0, 2.0, 1.0), t.transaction_date DESC
+        LIMIT ?
+    """
+    rows = conn.execute(query, params).fetchall()
     return [dict(row) for row in rows]
 
 
@@ -492,21 +1081,348 @@ def get_net_spending_aggregation(year: int):
     """
     Executes a precise SQL aggregation for net spending.
     Excludes internal transfers/payments and nets out refunds.
+    Reads the pre-aggregated monthly_rollups rows for the year.
     """
     conn = get_connection()
     # We use a single query to get the total and the count for context
     query = """
         SELECT 
-            ROUND(SUM(amount), 2) as net_total,
-            COUNT(id) as transaction_count
-        FROM transactions 
-        WHERE strftime('%Y', transaction_date) = ?
-          AND vendor_raw NOT LIKE '%PAYMENT%'
-          AND vendor_raw NOT LIKE '%TRANSFER%'
-          AND vendor_raw NOT LIKE '%CREDIT CARD%'
+            ROUND(SUM(net_amount), 2) as net_total,
+            COALESCE(SUM(txn_count), 0) as transaction_count
+        FROM monthly_rollups 
+        WHERE year = ?
     """
-    try:
-        row = conn.execute(query, (str(year),)).fetchone()
-        return dict(row) if row else {"net_total": 0, "transaction_count": 0}
-    finally:
-        conn.close()
\ No newline at end of file
+    row = conn.execute(query, (year,)).fetchone()
+    return dict(row) if row else {"net_total": 0, "transaction_count": 0}
+
+
+# Grouping keys of get_spending_rollup; also the values its filters match
+SPENDING_DIMENSIONS = {
+    "category": "COALESCE(c.name, 'Uncategorized')",
+    "month": "substr(t.transaction_date, 1, 7)",
+    "vendor": "COALESCE(t.vendor_normalized, t.vendor_raw)",
+}
+
+
+def _spending_window_filters(
+    start_date: Optional[str],
+    end_date: Optional[str],
+    category: Optional[str],
+    vendor: Optional[str],
+) -> Tuple[str, List[Any]]:
+    """
+    WHERE clause (and its params) selecting spending transactions in a date
+    window (inclusive, YYYY-MM-DD), optionally of one category and/or vendor.
+    """
+    clauses = [SPENDING_FILTER.format(t="t.")]
+    params: List[Any] = []
+    if start_date:
+        clauses.append("t.transaction_date >= ?")
+        params.append(start_date)
+    if end_date:
+        # Inclusive of the whole end day, whatever follows the date
+        clauses.append("t.transaction_date < date(?, '+1 day')")
+        params.append(end_date)
+    if category:
+        clauses.append(f"{SPENDING_DIMENSIONS['category']} = ? COLLATE NOCASE")
+        params.append(category)
+    if vendor:
+        clauses.append(f"{SPENDING_DIMENSIONS['vendor']} = ? COLLATE NOCASE")
+        params.append(vendor)
+    return " AND ".join(clauses), params
+
+
+def get_spending_rollup(
+    dimension: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    category: Optional[str] = None,
+    vendor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Net spending grouped by category, month (YYYY-MM) or vendor over a date
+    window, computed in one query. Months come in calendar order, other
+    dimensions largest first; `limit` keeps the top groups only.
+
+    Each row is {key, net_amount, txn_count, window_total, window_count,
+    group_count}; the window_* and group_count columns describe the whole
+    window, including groups cut off by `limit`.
+    """
+    if dimension not in SPENDING_DIMENSIONS:
+        raise ValueError(f"Unknown dimension: {dimension}")
+
+    where, params = _spending_window_filters(start_date, end_date, category, vendor)
+    order = "key" if dimension == "month" else "net_amount DESC, key"
+    params.append(-1 if limit is None else limit)
+
+    conn = get_connection()
+    rows = conn.execute(
+        f"""
+        SELECT
+            {SPENDING_DIMENSIONS[dimension]} AS key,
+            ROUND(SUM(t.amount), 2) AS net_amount,
+            COUNT(*) AS txn_count,
+            ROUND(SUM(SUM(t.amount)) OVER (), 2) AS window_total,
+            SUM(COUNT(*)) OVER () AS window_count,
+            COUNT(*) OVER () AS group_count
+        FROM transactions t
+        LEFT JOIN categories c ON t.category_id = c.id
+        WHERE {where}
+        GROUP BY key
+        ORDER BY {order}
+        LIMIT ?
+        """,
+        params,
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def get_spending_transactions(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    category: Optional[str] = None,
+    vendor: Optional[str] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Largest spending transactions in a date window, optionally of one
+    category and/or vendor (as named by get_spending_rollup).
+    """
+    where, params = _spending_window_filters(start_date, end_date, category, vendor)
+    params.append(limit)
+
+    conn = get_connection()
+    rows = conn.execute(
+        f"""
+        SELECT
+            t.transaction_date,
+            t.vendor_raw AS vendor,
+            t.amount,
+            c.name AS category
+        FROM transactions t
+        LEFT JOIN categories c ON t.category_id = c.id
+        WHERE {where}
+        ORDER BY t.amount DESC, t.transaction_date DESC
+        LIMIT ?
+        """,
+        params,
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+# =========================
+# Job Queue
+# =========================
+
+def enqueue_job(statement_id: int, pdf_path: str, max_attempts: int = 3) -> int:
+    with transaction() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO jobs (statement_id, pdf_path, max_attempts)
+            VALUES (?, ?, ?)
+            """,
+            (statement_id, pdf_path, max_attempts),
+        )
+        return cur.lastrowid
+
+
+def count_pending_jobs() -> int:
+    """
+    Jobs queued or running; used for upload backpressure.
+    """
+    conn = get_connection()
+    row = conn.execute(
+        "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+    ).fetchone()
+    return row[0]
+
+
+def claim_job(worker_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Atomically take the oldest due job for `worker_id`, or None.
+    """
+    with transaction() as conn:
+        row = conn.execute(
+            """
+            UPDATE jobs
+            SET status = 'running',
+                attempts = attempts + 1,
+                locked_by = ?,
+                heartbeat_at = CURRENT_TIMESTAMP
+            WHERE id = (
+                SELECT id
+                FROM jobs
+                WHERE status = 'queued' AND run_after <= CURRENT_TIMESTAMP
+                ORDER BY run_after, id
+                LIMIT 1
+            )
+            RETURNING *
+            """,
+            (worker_id,),
+        ).fetchone()
+        return dict(row) if row else None
+
+
+def heartbeat_job(job_id: int):
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE jobs SET heartbeat_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'running'",
+            (job_id,),
+        )
+
+
+def complete_job(job_id: int):
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = 'done', locked_by = NULL, last_error = NULL WHERE id = ?",
+            (job_id,),
+        )
+
+
+def fail_job(job_id: int, error: str) -> str:
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', locked_by = NULL, last_error = ? WHERE id = ?",
+            (error, job_id),
+        )
+    return "failed"
+
+
+def retry_or_fail_job(job_id: int, error: str, retry_delay_seconds: int) -> str:
+    """
+    Requeue a failed attempt after `retry_delay_seconds`, or mark the job
+    failed when it has no attempts left. Returns the new status.
+    """
+    with transaction() as conn:
+        row = conn.execute(
+            """
+            UPDATE jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                run_after = datetime('now', '+' || ? || ' seconds'),
+                locked_by = NULL,
+                last_error = ?
+            WHERE id = ?
+            RETURNING status
+            """,
+            (retry_delay_seconds, error, job_id),
+        ).fetchone()
+        return row["status"] if row else "failed"
+
+
+def recover_orphaned_jobs(stale_after_seconds: int) -> List[Dict[str, Any]]:
+    """
+    Requeue running jobs whose worker stopped heartbeating (crashed or was
+    killed). Jobs without attempts left are failed along with their
+    statement. Returns the recovered jobs with their new status.
+    """
+    with transaction() as conn:
+        rows = conn.execute(
+            """
+            UPDATE jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                run_after = CURRENT_TIMESTAMP,
+                locked_by = NULL,
+                last_error = 'Worker stopped while processing'
+            WHERE status = 'running'
+              AND heartbeat_at < datetime('now', '-' || ? || ' seconds')
+            RETURNING id, statement_id, pdf_path, status, last_error
+            """,
+            (stale_after_seconds,),
+        ).fetchall()
+        jobs = [dict(row) for row in rows]
+
+        for job in jobs:
+            if job["status"] == "failed":
+                fail_statement(job["statement_id"], job["last_error"])
+        return jobs
+
+
+# =========================
+# LLM Response Cache
+# =========================
+
+def get_llm_cache_entries(keys: List[str], now_ms: int) -> Dict[str, str]:
+    """
+    Cached responses for the keys found, marking them as just used.
+    """
+    found: Dict[str, str] = {}
+    with transaction() as conn:
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, response FROM llm_cache WHERE key IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            found.update((row["key"], row["response"]) for row in rows)
+        if found:
+            conn.executemany(
+                "UPDATE llm_cache SET hits = hits + 1, last_used = ? WHERE key = ?",
+                [(now_ms, key) for key in found],
+            )
+    return found
+
+
+def put_llm_cache_entries(entries: List[Tuple[str, str, str, str]], now_ms: int) -> int:
+    """
+    Store (key, model, template_version, response) rows.
+    Returns the bytes added.
+    """
+    rows = [
+        (key, model, version, response, len(response.encode()), now_ms)
+        for key, model, version, response in entries
+    ]
+    with transaction() as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO llm_cache (key, model, template_version, response, size, last_used)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    return sum(row[4] for row in rows)
+
+
+def get_llm_cache_size() -> int:
+    conn = get_connection()
+    return conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+
+def evict_llm_cache(bytes_to_free: int) -> int:
+    """
+    Delete least recently used entries until at least `bytes_to_free`
+    bytes are gone. Returns the number of entries deleted.
+    """
+    with transaction() as conn:
+        cur = conn.execute(
+            """
+            DELETE FROM llm_cache
+            WHERE key IN (
+                SELECT key
+                FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY last_used, key) - size AS freed_before
+                    FROM llm_cache
+                )
+                WHERE freed_before < ?
+            )
+            """,
+            (bytes_to_free,),
+        )
+        return cur.rowcount
+
+
+def get_llm_cache_summary() -> Dict[str, Any]:
+    conn = get_connection()
+    row = conn.execute(
+        """
+        SELECT COUNT(*) AS entries, COALESCE(SUM(size), 0) AS bytes, COALESCE(SUM(hits), 0) AS hits
+        FROM llm_cache
+        """
+    ).fetchone()
+    return dict(row)
+
+
+def clear_llm_cache() -> int:
+    with transaction() as conn:
+        return conn.execute("DELETE FROM llm_cache").rowcount
@@ -2,9 +2,8 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from datetime import datetime
-from collections import defaultdict
 
-from db.db import get_transactions_for_statement_exclude_payment, get_statements
+from db.db import get_monthly_expense_totals, get_transactions_for_month
 
 router = APIRouter()
 
@@ -47,32 +46,18 @@ def dashboard_summary(year: Optional[int] = None):
     if year is None:
         year = datetime.now().year
 
-    monthly_expenses_dict = defaultdict(float)
-    total_expense = 0.0
-
-    statements = get_statements()
-    for stmt in statements:
-        transactions = get_transactions_for_statement_exclude_payment(stmt["id"])
-        for tx in transactions:
-            try:
-                if tx["transaction_date"]:
-                    tx_date = datetime.strptime(tx["transaction_date"], "%Y-%m-%d")
-                    if tx_date.year == year:
-                        amount = tx.get("amount") or 0
-                        total_expense += amount
-                        monthly_expenses_dict[tx_date.month] += amount
-            except Exception:
-                continue
-
-    if not monthly_expenses_dict:
+    rows = get_monthly_expense_totals(year)
+
+    if not rows:
         return DashboardSummaryResponse(
             total_expense=0.0,
             highest_expense_month=None,
             monthly_expenses=[]
         )
 
-    highest_month = max(monthly_expenses_dict.items(), key=lambda x: x[1])[0]
-    monthly_expenses = [MonthlyExpenses(month=m, expense=e) for m, e in sorted(monthly_expenses_dict.items())]
+    total_expense = sum(row["expense"] for row in rows)
+    highest_month = max(rows, key=lambda row: row["expense"])["month"]
+    monthly_expenses = [MonthlyExpenses(month=row["month"], expense=row["expense"]) for row in rows]
 
     return DashboardSummaryResponse(
         total_expense=total_expense,
@@ -89,21 +74,9 @@ def transactions_by_month(year: int, month: int):
     if not (1 <= month <= 12):
         raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
 
-    result = []
-    statements = get_statements()
-    for stmt in statements:
-        transactions = get_transactions_for_statement_exclude_payment(stmt["id"])
-        for tx in transactions:
-            try:
-                if tx["transaction_date"]:
-                    tx_date = datetime.strptime(tx["transaction_date"], "%Y-%m-%d")
-                    if tx_date.year == year and tx_date.month == month:
-                        result.append(tx)
-            except Exception:
-                continue
+    result = get_transactions_for_month(year, month)
 
     if not result:
         raise HTTPException(status_code=404, detail=f"No transactions found for {year}-{month:02d}")
 
-    result.sort(key=lambda x: x["transaction_date"])
     return result
\ No newline at end of file
@@ -1,28 +1,53 @@
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pathlib import Path
-import shutil
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
 import uuid
-from typing import List, Optional
+from typing import List, Literal, Optional
+
+import anyio
 
 from pydantic import BaseModel
 from db.db import (
+    transaction,
     create_statement,
     create_manual_statement,
-    update_statement_status,
     get_statements,
+    get_statement_by_id,
+    get_statement_by_hash,
     get_transactions_for_statement,
-    insert_transactions,
+    get_statement_progress,
     update_statement_filename,  # ✅ new import
+    enqueue_job,
+    count_pending_jobs,
 )
-from tool.pdf import extract_text_from_pdf
-from tool.transactions import parse_text_to_transactions
+from core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
 from tool.logging_config import logger
+from tool.statement_events import statement_events
 
 router = APIRouter()
 
 UPLOAD_DIR = Path("data/uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_MB", "25")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Uploads are refused with 429 while this many statements wait for or are in processing
+MAX_QUEUE_DEPTH = int(os.environ.get("MAX_QUEUE_DEPTH", "10"))
+QUEUE_RETRY_AFTER_SECONDS = 60
+
+# Event streams send a comment this often so proxies keep idle connections open
+SSE_KEEPALIVE_SECONDS = 15
+# Streams end after this long and EventSource reconnects, so open streams
+# never hold up a server restart for longer
+SSE_MAX_STREAM_SECONDS = 300
+SSE_RETRY_MS = 3000
+
 # =========================
 # Pydantic Models
 # =========================
@@ -45,14 +70,34 @@ class StatementOut(BaseModel):
     uploaded_at: str
     processed_at: Optional[str]
     error_message: Optional[str]
+    transaction_count: int = 0
+    total_amount: float = 0
+    first_transaction_date: Optional[str] = None
+    last_transaction_date: Optional[str] = None
     transactions: Optional[List[TransactionOut]] = []
 
 
+class StatementPage(BaseModel):
+    items: List[StatementOut]
+    next_cursor: Optional[str] = None
+
+
+class StatementProgressOut(BaseModel):
+    statement_id: int
+    status: str
+    pages_total: int = 0
+    pages_done: int = 0
+    lines_parsed: int = 0
+    rows_inserted: int = 0
+    rows_skipped: int = 0
+    updated_at: Optional[str] = None
+
 
 class UploadResponse(BaseModel):
     message: str
     statement_id: int
     status: str
+    duplicate: bool = False
 
 
 class StatementRenameRequest(BaseModel):
@@ -65,50 +110,19 @@ class ManualStatementCreateRequest(BaseModel):
     filename: str
 
 
-# ==============================================================================================================================================
-# Background Job
-# ==============================================================================================================================================
-
-def process_statement_async(statement_id: int, pdf_path: Path):
-    """
-    Background job:
-    - Extract text
-    - Parse transactions
-    - Save transactions
-    - Update statement status
-    """
-    try:
-        text = extract_text_from_pdf(pdf_path)
-        transactions = parse_text_to_transactions(text, statement_id)
-
-        # TODO (next step):
-        # save_transactions(statement_id, transactions)
-
-        update_statement_status(statement_id, "completed")
-        logger.info(f" Statement {statement_id} processing completed:")
-
-    except Exception as e:
-        update_statement_status(statement_id, "failed")
-        logger.info(f"❌ Statement {statement_id} failed:", e)
-
-    finally:
-        # Cleanup uploaded file
-        if pdf_path.exists():
-            pdf_path.unlink()
-
-
 # ==============================================================================================================================================
 # Endpoints
 # ==============================================================================================================================================
 
 @router.post("/upload", response_model=UploadResponse)
 async def upload_statement(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
 ):
     """
     Upload a PDF statement for processing.
-    Returns immediately with processing status. Transactions are parsed asynchronously.
+    Returns immediately with processing status. Transactions are parsed by worker.py.
+    A file identical to an earlier upload that has not failed returns that statement instead,
+    even while the processing queue is full.
     """
 
     if not file.filename.lower().endswith(".pdf"):
@@ -117,23 +131,53 @@ async def upload_statement(
     file_id = uuid.uuid4().hex
     pdf_path = UPLOAD_DIR / f"{file_id}.pdf"
 
-    # Save file temporarily
-    with open(pdf_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    # Create DB record
-    statement_id = create_statement(
-        filename=file.filename,
-        file_size=pdf_path.stat().st_size,
-        status="processing",
-    )
-
-    # Start async processing
-    background_tasks.add_task(
-        process_statement_async,
-        statement_id,
+    # Save file temporarily in chunks, hashing as we go, without blocking the event loop
+    digest = hashlib.sha256()
+    file_size = 0
+    try:
+        async with await anyio.open_file(pdf_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit",
+                    )
+                digest.update(chunk)
+                await buffer.write(chunk)
+    except BaseException:
+        pdf_path.unlink(missing_ok=True)
+        raise
+
+    # SQLite calls run in worker threads: a busy database must not stall the event loop
+    content_hash = digest.hexdigest()
+    existing = await anyio.to_thread.run_sync(get_statement_by_hash, content_hash)
+    if existing:
+        return _duplicate_upload(existing, file.filename, pdf_path)
+
+    # Only new work is limited by the queue depth
+    if await anyio.to_thread.run_sync(count_pending_jobs) >= MAX_QUEUE_DEPTH:
+        pdf_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=429,
+            detail="Statement processing queue is full, try again later",
+            headers={"Retry-After": str(QUEUE_RETRY_AFTER_SECONDS)},
+        )
+
+    statement_id = await anyio.to_thread.run_sync(
+        _create_statement_job,
+        file.filename,
+        file_size,
+        content_hash,
         pdf_path,
     )
+    if statement_id is None:
+        # A concurrent upload of the same file got there first
+        existing = await anyio.to_thread.run_sync(get_statement_by_hash, content_hash)
+        if not existing:
+            pdf_path.unlink(missing_ok=True)
+            raise HTTPException(status_code=409, detail="The same file is being uploaded, try again")
+        return _duplicate_upload(existing, file.filename, pdf_path)
 
     return UploadResponse(
         message="Statement uploaded successfully",
@@ -142,13 +186,65 @@ async def upload_statement(
     )
 
 
-@router.get("/", response_model=List[StatementOut])
-def list_statements() -> List[StatementOut]:
+def _create_statement_job(
+    filename: str,
+    file_size: int,
+    content_hash: str,
+    pdf_path: Path,
+) -> Optional[int]:
     """
-    List all uploaded statements with status, processed date, and error messages.
+    Create the statement and queue it for the workers in one transaction.
+    Returns None if a live statement with the same content hash already exists.
     """
-    statements = get_statements()
-    return [StatementOut(**s) for s in statements]
+    try:
+        with transaction():
+            statement_id = create_statement(
+                filename=filename,
+                file_size=file_size,
+                status="processing",
+                content_hash=content_hash,
+            )
+            enqueue_job(statement_id, str(pdf_path.resolve()))
+    except sqlite3.IntegrityError as e:
+        if "content_hash" not in str(e):
+            raise
+        return None
+    return statement_id
+
+
+def _duplicate_upload(existing: dict, filename: str, pdf_path: Path) -> UploadResponse:
+    pdf_path.unlink(missing_ok=True)
+    logger.info(f"Upload of {filename} matches statement {existing['id']}, skipping processing")
+    return UploadResponse(
+        message="Statement already uploaded",
+        statement_id=existing["id"],
+        status=existing["status"],
+        duplicate=True,
+    )
+
+
+@router.get("/", response_model=StatementPage)
+def list_statements(
+    cursor: Optional[str] = None,
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    source_type: Optional[Literal["pdf", "manual"]] = None,
+) -> StatementPage:
+    """
+    List uploaded statements, newest first, with status, processed date, error messages,
+    and transaction count, total amount and date span. Filter by `source_type` if given.
+    Pass the returned next_cursor back as `cursor` to get the following page.
+    """
+    def fetch(after, limit):
+        return get_statements(after=after, limit=limit, source_type=source_type)
+
+    try:
+        statements, next_cursor = paginate(fetch, cursor, page_size, "uploaded_at")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StatementPage(
+        items=[StatementOut(**s) for s in statements],
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/{statement_id}", response_model=StatementOut)
@@ -156,8 +252,7 @@ def get_statement(statement_id: int) -> StatementOut:
     """
     Get details of a single statement including all transactions.
     """
-    statements = get_statements()
-    stmt = next((s for s in statements if s["id"] == statement_id), None)
+    stmt = get_statement_by_id(statement_id)
     if not stmt:
         raise HTTPException(status_code=404, detail="Statement not found")
 
@@ -166,6 +261,59 @@ def get_statement(statement_id: int) -> StatementOut:
     return StatementOut(**stmt)
 
 
+@router.get("/{statement_id}/progress", response_model=StatementProgressOut)
+def get_statement_progress_endpoint(statement_id: int) -> StatementProgressOut:
+    """
+    Live ingestion counters of a statement: pages done out of pages total,
+    candidate lines parsed, and rows inserted or skipped as duplicates.
+    """
+    stmt = get_statement_by_id(statement_id)
+    if not stmt:
+        raise HTTPException(status_code=404, detail="Statement not found")
+
+    progress = get_statement_progress(statement_id) or {"statement_id": statement_id}
+    return StatementProgressOut(**progress, status=stmt["status"])
+
+
+@router.get("/{statement_id}/events")
+async def statement_events_endpoint(statement_id: int) -> StreamingResponse:
+    """
+    Server-sent events of a statement's processing: `status` on status changes,
+    `progress` with per-stage counters, and `complete` with the final counts,
+    after which the stream ends. The current status and progress come first.
+    """
+    if not await anyio.to_thread.run_sync(get_statement_by_id, statement_id):
+        raise HTTPException(status_code=404, detail="Statement not found")
+
+    subscription = statement_events.subscribe(statement_id)
+
+    async def stream():
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            deadline = asyncio.get_running_loop().time() + SSE_MAX_STREAM_SECONDS
+            while (remaining := deadline - asyncio.get_running_loop().time()) > 0:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(),
+                        min(SSE_KEEPALIVE_SECONDS, remaining),
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                name, data = event
+                yield f"event: {name}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            statement_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.put("/{statement_id}/filename", response_model=StatementOut)
 def update_statement_filename_endpoint(
     statement_id: int,
@@ -179,15 +327,10 @@ def update_statement_filename_endpoint(
     if not payload.filename.strip():
         raise HTTPException(status_code=400, detail="Filename cannot be empty")
 
-    statements = get_statements()
-    stmt = next((s for s in statements if s["id"] == statement_id), None)
-    if not stmt:
+    if not update_statement_filename(statement_id, payload.filename):
         raise HTTPException(status_code=404, detail="Statement not found")
 
-    update_statement_filename(statement_id, payload.filename)
-
-    stmt["filename"] = payload.filename
-    return StatementOut(**stmt)
+    return StatementOut(**get_statement_by_id(statement_id))
 
 @router.post("/manual", response_model=StatementOut)
 def create_manual_statement_endpoint(
@@ -204,8 +347,7 @@ def create_manual_statement_endpoint(
     statement_id = create_manual_statement(payload.filename)
 
     # Fetch created statement to return full object
-    statements = get_statements()
-    stmt = next((s for s in statements if s["id"] == statement_id), None)
+    stmt = get_statement_by_id(statement_id)
 
     if not stmt:
         raise HTTPException(status_code=500, detail="Failed to create manual statement")
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 from pydantic import BaseModel
 
+from core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
 from db.db import (
     get_transactions_for_statement,
     assign_category_to_transactions,
@@ -44,6 +45,11 @@ class TransactionOut(BaseModel):
     category: Optional[str]
 
 
+class TransactionPage(BaseModel):
+    items: List[TransactionOut]
+    next_cursor: Optional[str] = None
+
+
 class ManualTransactionCreate(BaseModel):
     statement_id: int
     transaction_date: str
@@ -63,13 +69,27 @@ class ManualTransactionUpdate(BaseModel):
 # Existing Endpoints (UNCHANGED)
 # =========================
 
-@router.get("/statement/{statement_id}/transactions", response_model=List[TransactionOut])
-def list_transactions(statement_id: int):
+@router.get("/statement/{statement_id}/transactions", response_model=TransactionPage)
+def list_transactions(
+    statement_id: int,
+    cursor: Optional[str] = None,
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
     """
-    List all transactions for a given statement.
+    List transactions for a given statement, ordered by date.
+    Pass the returned next_cursor back as `cursor` to get the following page.
     """
-    transactions = get_transactions_for_statement(statement_id)
-    return [TransactionOut(**tx) for tx in transactions]
+    def fetch(after, limit):
+        return get_transactions_for_statement(statement_id, after=after, limit=limit)
+
+    try:
+        transactions, next_cursor = paginate(fetch, cursor, page_size, "transaction_date")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TransactionPage(
+        items=[TransactionOut(**tx) for tx in transactions],
+        next_cursor=next_cursor,
+    )
 
 
 @router.post("/assign-category", response_model=dict)
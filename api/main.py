@@ -2,8 +2,11 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 
-from db.db import init_db
+from db.db import init_db, close_connection
 from tool.logging_config import logger
+from tool.llm import set_llm_client
+from tool.vendor import load_vendor_index
+from tool.statement_events import statement_events
 
 # Routers
 from handler.statement import router as statements_router
@@ -19,10 +22,14 @@ async def lifespan(app: FastAPI):
     # Startup
     init_db()
     logger.info("✅ Database initialized")
+    load_vendor_index()
 
     yield
 
     # Shutdown
+    statement_events.close()
+    set_llm_client(None)
+    close_connection()
     logger.info("🛑 FastAPI shutting down")
 
 
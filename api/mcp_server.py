@@ -1,8 +1,17 @@
 from fastmcp import FastMCP
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
-from typing import List, Optional
-from db.db import get_yearly_transactions, search_transactions, get_net_spending_aggregation
+import calendar
+from datetime import date
+from typing import List, Optional, Tuple
+from core.pagination import DEFAULT_PAGE_SIZE, paginate
+from db.db import (
+    get_yearly_transactions,
+    search_transactions,
+    get_net_spending_aggregation,
+    get_spending_rollup,
+    get_spending_transactions,
+)
 
 # Initialize FastMCP Server
 mcp = FastMCP("Expense-AI-Analyst")
@@ -10,26 +19,55 @@ mcp = FastMCP("Expense-AI-Analyst")
 # --- Your Tools remain the same ---
 
 @mcp.tool()
-def fetch_all_transactions_for_year(year: int) -> str:
+def fetch_all_transactions_for_year(
+    year: int,
+    cursor: Optional[str] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> str:
     """
-    Use this for broad, high-level questions about a specific year. 
-    Ideal for: 'Total spend in 2024', 'What was my biggest category last year?', or 'Summary of 2025'.
+    Use this only when the user wants to read through a year's individual transactions.
+    For totals and breakdowns ('biggest category last year', 'monthly trend', 'top shops')
+    use get_spending_by_category, get_spending_by_month or get_top_vendors instead.
+    Returns one page of transactions, newest first. If the last line is 'next_cursor: <value>',
+    call again with that cursor to read the next page.
     """
-    data = get_yearly_transactions(year)
+    def fetch(after, limit):
+        return get_yearly_transactions(year, after=after, limit=limit)
+
+    try:
+        data, next_cursor = paginate(fetch, cursor, page_size, "transaction_date")
+    except ValueError as e:
+        return str(e)
     if not data:
         return f"No transaction data found for the year {year}."
     
     # We convert to a clean string format to save tokens
     output = [f"{t['transaction_date']} | {t['vendor']} | ${t['amount']} | {t['category'] or 'Uncategorized'}" for t in data]
+    if next_cursor:
+        output.append(f"next_cursor: {next_cursor}")
     return "\n".join(output)
 
 @mcp.tool()
-def search_spending(query_term: str) -> str:
+def search_spending(
+    query_term: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+) -> str:
     """
     Use this for targeted searches regarding specific names, shops, or types of spending.
     Ideal for: 'How much did I spend at Amazon?', 'Show me all Grocery bills', or 'Find transactions for Starbucks'.
+    Words match as prefixes and results are ranked by relevance.
+    Optionally narrow by date (YYYY-MM-DD, inclusive) and amount range.
     """
-    data = search_transactions(query_term)
+    data = search_transactions(
+        query_term,
+        start_date=start_date,
+        end_date=end_date,
+        min_amount=min_amount,
+        max_amount=max_amount,
+    )
     if not data:
         return f"No transactions found matching '{query_term}'."
     
@@ -54,6 +92,163 @@ def get_net_spending_summary(year: int) -> str:
         f"automatically excluding internal payments and accounting for refunds."
     )
 
+# --- Aggregations: compact, database-computed breakdowns ---
+
+def _date_window(
+    start_date: Optional[str],
+    end_date: Optional[str],
+    month: Optional[str],
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Validate a YYYY-MM-DD window; a YYYY-MM `month` narrows it to that month.
+    """
+    for value in (start_date, end_date):
+        if value:
+            date.fromisoformat(value)
+    if month:
+        year, month_number = (int(part) for part in month.split("-"))
+        last_day = calendar.monthrange(year, month_number)[1]
+        month_start = f"{year:04d}-{month_number:02d}-01"
+        month_end = f"{year:04d}-{month_number:02d}-{last_day:02d}"
+        start_date = max(start_date or month_start, month_start)
+        end_date = min(end_date or month_end, month_end)
+    return start_date, end_date
+
+
+def _describe_window(start_date, end_date, category=None, vendor=None) -> str:
+    window = f"{start_date or 'the beginning'} to {end_date or 'now'}"
+    for label, value in (("category", category), ("vendor", vendor)):
+        if value:
+            window += f", {label} '{value}'"
+    return window
+
+
+def _format_rollup(title: str, rows, window: str, share: bool = True) -> str:
+    if not rows:
+        return f"No spending found for {window}."
+
+    first = rows[0]
+    output = [
+        f"{title}, {window} (net ${first['window_total']:,.2f}"
+        f" across {first['window_count']} transactions):"
+    ]
+    # Shares of a window that nets to zero or to refunds would be meaningless
+    share = share and first["window_total"] > 0
+    for row in rows:
+        line = f"{row['key']} | ${row['net_amount']:,.2f}"
+        if share:
+            line += f" | {row['net_amount'] / first['window_total']:.0%}"
+        output.append(f"{line} | {row['txn_count']} txns")
+
+    rest = first["group_count"] - len(rows)
+    if rest > 0:
+        other = first["window_total"] - sum(row["net_amount"] for row in rows)
+        output.append(f"Other ({rest} more) | ${other:,.2f}")
+    return "\n".join(output)
+
+
+@mcp.tool()
+def get_spending_by_category(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    month: Optional[str] = None,
+    vendor: Optional[str] = None,
+) -> str:
+    """
+    Use this for 'where did my money go' questions: net spending per category, largest first,
+    with each category's share and transaction count.
+    Dates are YYYY-MM-DD, inclusive; leave them out for all time. `month` (YYYY-MM) limits it to one month.
+    Drill down with `vendor` to see one vendor's spending by category.
+    """
+    try:
+        start_date, end_date = _date_window(start_date, end_date, month)
+    except ValueError:
+        return "Dates must be YYYY-MM-DD and month YYYY-MM."
+    rows = get_spending_rollup("category", start_date, end_date, vendor=vendor)
+    return _format_rollup("Spending by category", rows, _describe_window(start_date, end_date, vendor=vendor))
+
+
+@mcp.tool()
+def get_spending_by_month(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    category: Optional[str] = None,
+    vendor: Optional[str] = None,
+) -> str:
+    """
+    Use this for trends over time: net spending per month (YYYY-MM), in calendar order.
+    Dates are YYYY-MM-DD, inclusive; leave them out for all time.
+    Drill down with `category` and/or `vendor` (names as shown by the other breakdown tools).
+    """
+    try:
+        start_date, end_date = _date_window(start_date, end_date, None)
+    except ValueError:
+        return "Dates must be YYYY-MM-DD."
+    rows = get_spending_rollup("month", start_date, end_date, category=category, vendor=vendor)
+    window = _describe_window(start_date, end_date, category, vendor)
+    return _format_rollup("Spending by month", rows, window, share=False)
+
+
+@mcp.tool()
+def get_top_vendors(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: int = 10,
+    month: Optional[str] = None,
+    category: Optional[str] = None,
+) -> str:
+    """
+    Use this for 'where do I spend the most' questions: the top `limit` vendors by net spending,
+    with the remainder summed as 'Other'.
+    Dates are YYYY-MM-DD, inclusive; leave them out for all time. `month` (YYYY-MM) limits it to one month.
+    Drill down with `category` to rank vendors within one category.
+    """
+    try:
+        start_date, end_date = _date_window(start_date, end_date, month)
+    except ValueError:
+        return "Dates must be YYYY-MM-DD and month YYYY-MM."
+    rows = get_spending_rollup(
+        "vendor",
+        start_date,
+        end_date,
+        category=category,
+        limit=max(1, min(limit, 50)),
+    )
+    window = _describe_window(start_date, end_date, category)
+    return _format_rollup(f"Top {len(rows)} vendors", rows, window)
+
+
+@mcp.tool()
+def get_largest_transactions(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    month: Optional[str] = None,
+    category: Optional[str] = None,
+    vendor: Optional[str] = None,
+    limit: int = 20,
+) -> str:
+    """
+    Use this to drill into one line of a breakdown: the largest individual transactions
+    for a category and/or vendor (names as shown by the breakdown tools) in a date window.
+    Dates are YYYY-MM-DD, inclusive; `month` (YYYY-MM) limits it to one month.
+    """
+    try:
+        start_date, end_date = _date_window(start_date, end_date, month)
+    except ValueError:
+        return "Dates must be YYYY-MM-DD and month YYYY-MM."
+    data = get_spending_transactions(
+        start_date,
+        end_date,
+        category=category,
+        vendor=vendor,
+        limit=max(1, min(limit, 100)),
+    )
+    if not data:
+        return f"No spending found for {_describe_window(start_date, end_date, category, vendor)}."
+
+    output = [f"{t['transaction_date']} | {t['vendor']} | ${t['amount']} | {t['category'] or 'Uncategorized'}" for t in data]
+    return "\n".join(output)
+
 # --- The "Magic" Bridge ---
 # Configure CORS for browser-based clients
 middleware = [
@@ -0,0 +1,37 @@
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+API_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_DIR))
+
+from db import db  # noqa: E402
+from tool.llm import set_llm_client  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """
+    Fresh database in a temporary data directory (the app uses paths relative to api/).
+    """
+    (tmp_path / "data").mkdir()
+    shutil.copy(API_DIR / "data" / "schema.sql", tmp_path / "data" / "schema.sql")
+    monkeypatch.chdir(tmp_path)
+    db.close_connection()
+    # Threads reused across tests (e.g. anyio's pool) must not keep an earlier test's connection
+    monkeypatch.setattr(db, "_local", threading.local())
+    db.init_db()
+    yield db
+    db.close_connection()
+
+
+@pytest.fixture
+def llm_client():
+    """
+    Install a client for the test to replace; restores the default afterwards.
+    """
+    yield set_llm_client
+    set_llm_client(None)
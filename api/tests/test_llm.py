@@ -0,0 +1,75 @@
+import json
+
+import httpx
+import pytest
+
+from tool import llm
+from tool.llm import LLMClient, LLMError, generate, normalize_base_url
+
+
+def _client(handler, **kwargs) -> LLMClient:
+    return LLMClient(base_url="http://ollama.test", transport=httpx.MockTransport(handler), **kwargs)
+
+
+@pytest.mark.parametrize(
+    "host, expected",
+    [
+        ("0.0.0.0", "http://0.0.0.0"),
+        ("127.0.0.1:11434", "http://127.0.0.1:11434"),
+        ("http://127.0.0.1:11434/", "http://127.0.0.1:11434"),
+        ("https://ollama.example.com", "https://ollama.example.com"),
+    ],
+)
+def test_normalize_base_url(host, expected):
+    assert normalize_base_url(host) == expected
+
+
+def test_generate_posts_prompt_and_returns_response():
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": "  hello  "})
+
+    client = _client(handler, options={"num_ctx": 2048})
+    assert client.generate("Say hi", model="granite3.3:2b", options={"seed": 1}) == "hello"
+
+    payload = requests[0]
+    assert payload["model"] == "granite3.3:2b"
+    assert payload["prompt"] == "Say hi"
+    assert payload["stream"] is False
+    assert payload["options"] == {"temperature": 0, "num_ctx": 2048, "seed": 1}
+
+
+def test_generate_wraps_http_errors():
+    client = _client(lambda request: httpx.Response(500, text="model not found"))
+    with pytest.raises(LLMError, match="failed"):
+        client.generate("prompt", model="m")
+
+
+def test_generate_wraps_connection_errors():
+    def handler(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    with pytest.raises(LLMError, match="connection refused"):
+        _client(handler).generate("prompt", model="m")
+
+
+def test_generate_wraps_invalid_json():
+    client = _client(lambda request: httpx.Response(200, text="<html>proxy error</html>"))
+    with pytest.raises(LLMError, match="not valid JSON"):
+        client.generate("prompt", model="m")
+
+
+def test_generate_rejects_non_object_body():
+    client = _client(lambda request: httpx.Response(200, json=["unexpected"]))
+    with pytest.raises(LLMError):
+        client.generate("prompt", model="m")
+
+
+def test_shared_client_can_be_replaced(llm_client):
+    llm_client(_client(lambda request: httpx.Response(200, json={"response": "stand-in"})))
+    assert generate("prompt", model="m") == "stand-in"
+
+    llm_client(None)
+    assert llm._client is None
@@ -0,0 +1,119 @@
+import json
+
+import httpx
+import pytest
+
+import tool.transactions as transactions
+from tool.llm import LLMClient
+from tool.llm_cache import LLMResponseCache, cache_key, get_llm_cache, set_llm_cache
+from tool.transactions import LINE_PROMPT_VERSION, MODEL_NAME, parse_transaction_lines
+
+
+@pytest.fixture
+def cache(database):
+    previous = get_llm_cache()
+    cache = LLMResponseCache(max_bytes=1024 * 1024, enabled=True)
+    set_llm_cache(cache)
+    yield cache
+    set_llm_cache(previous)
+
+
+@pytest.fixture
+def llm_calls(llm_client):
+    """
+    Stand-in LLM answering every line prompt from `replies` (by vendor word in the prompt).
+    """
+    replies = {}
+    prompts = []
+
+    def handler(request):
+        prompt = json.loads(request.content)["prompt"]
+        prompts.append(prompt)
+        reply = next(reply for word, reply in replies.items() if word in prompt)
+        return httpx.Response(200, json={"response": reply})
+
+    llm_client(LLMClient(base_url="http://ollama.test", transport=httpx.MockTransport(handler)))
+    return replies, prompts
+
+
+def test_get_and_put_round_trip(cache):
+    cache.put_many("m", "v1", {"line a": "A", "line b": "B"})
+
+    assert cache.get_many("m", "v1", ["line a", "line b", "line c"]) == {"line a": "A", "line b": "B"}
+    assert (cache.hits, cache.misses) == (2, 1)
+    # Model and prompt version are part of the key
+    assert cache.get_many("other", "v1", ["line a"]) == {}
+    assert cache.get_many("m", "v2", ["line a"]) == {}
+
+
+def test_eviction_keeps_total_under_cap(database):
+    cache = LLMResponseCache(max_bytes=1000, enabled=True)
+    cache.put_many("m", "v", {f"line {i}": "x" * 100 for i in range(20)})
+
+    assert database.get_llm_cache_size() <= 1000
+
+
+def test_second_parse_is_served_from_cache(cache, llm_calls):
+    replies, prompts = llm_calls
+    replies["IKEA"] = '{"date": "Nov 20", "vendor_raw": "IKEA", "amount": 12}'
+
+    first = parse_transaction_lines(["Nov 20 IKEA 12.00"], batch_size=1)
+    second = parse_transaction_lines(["Nov 20 IKEA 12.00"], batch_size=1)
+
+    assert first == second == [{"date": "Nov 20", "vendor_raw": "IKEA", "amount": 12.0}]
+    assert len(prompts) == 1
+
+
+def test_unusable_rows_are_not_cached(cache, llm_calls):
+    replies, prompts = llm_calls
+    replies["IKEA"] = '{"date": "Nov 20", "vendor_raw": "IKEA", "amount": "n/a"}'
+
+    assert parse_transaction_lines(["Nov 20 IKEA n/a"], batch_size=1) == [None]
+    assert parse_transaction_lines(["Nov 20 IKEA n/a"], batch_size=1) == [None]
+    assert len(prompts) == 2
+    assert cache.get_many(MODEL_NAME, LINE_PROMPT_VERSION, ["Nov 20 IKEA n/a"]) == {}
+
+
+def test_unusable_cached_rows_are_parsed_again(cache, llm_calls, database):
+    replies, prompts = llm_calls
+    replies["IKEA"] = '{"date": "Nov 20", "vendor_raw": "IKEA", "amount": 12}'
+    line = "Nov 20 IKEA 12.00"
+    database.put_llm_cache_entries(
+        [(cache_key(MODEL_NAME, LINE_PROMPT_VERSION, line), MODEL_NAME, LINE_PROMPT_VERSION,
+          '{"date": null, "vendor_raw": "IKEA", "amount": 12}')],
+        0,
+    )
+
+    assert parse_transaction_lines([line], batch_size=1) == [
+        {"date": "Nov 20", "vendor_raw": "IKEA", "amount": 12.0}
+    ]
+    assert len(prompts) == 1
+
+
+def test_retry_after_failed_ingest_replays_parsed_lines(cache, llm_calls, database, monkeypatch, tmp_path):
+    replies, prompts = llm_calls
+    replies["IKEA"] = '{"date": "11/20/2025", "vendor_raw": "IKEA", "amount": 12}'
+    replies["COSTCO"] = '{"date": "11/21/2025", "vendor_raw": "COSTCO", "amount": 30}'
+    pages = ["11/20/2025 IKEA $12.00", "11/21/2025 COSTCO $30.00"]
+
+    monkeypatch.setattr(transactions, "count_pdf_pages", lambda path: len(pages))
+    monkeypatch.setattr(transactions, "iter_pdf_pages", lambda path: iter(pages))
+    monkeypatch.setattr(transactions, "normalize_vendors", lambda names: {n.strip(): n for n in names})
+
+    insert = transactions.insert_transactions
+    failures = ["database is locked"]
+
+    def fail_once(*args, **kwargs):
+        if failures:
+            raise RuntimeError(failures.pop())
+        return insert(*args, **kwargs)
+
+    monkeypatch.setattr(transactions, "insert_transactions", fail_once)
+    statement_id = database.create_statement("a.pdf", 1, "processing")
+
+    with pytest.raises(RuntimeError):
+        transactions.ingest_pdf_statement(statement_id, tmp_path / "a.pdf", insert_batch_size=100)
+    assert len(prompts) == 2  # Both pages parsed before the insert failed
+
+    assert transactions.ingest_pdf_statement(statement_id, tmp_path / "a.pdf", insert_batch_size=100) == (2, 0)
+    assert len(prompts) == 2  # The retry made no new LLM calls
@@ -0,0 +1,156 @@
+import pytest
+
+import mcp_server
+from mcp_server import (
+    _date_window,
+    get_largest_transactions,
+    get_spending_by_category,
+    get_spending_by_month,
+    get_top_vendors,
+)
+
+
+@pytest.fixture
+def spend(database):
+    """
+    Add manual transactions: spend(date, vendor, amount, category).
+    """
+    statement_id = database.create_manual_statement("bills")
+
+    def add(date, vendor, amount, category="Groceries"):
+        category_id = database.get_or_create_category(category)
+        database.insert_manual_transaction(statement_id, date, vendor, vendor.lower(), amount, category_id)
+
+    return add
+
+
+@pytest.fixture
+def february(spend):
+    spend("2024-01-31", "FRESHCO", 40)
+    spend("2024-02-01", "FRESHCO", 100)
+    spend("2024-02-10", "LOBLAWS", 50)
+    spend("2024-02-29", "IKEA", 30, "Home")
+    spend("2024-02-29", "NETFLIX", 20, "Entertainment")
+    spend("2024-03-01", "FRESHCO", 60)
+
+
+@pytest.mark.parametrize(
+    "start, end, month, expected",
+    [
+        (None, None, "2024-02", ("2024-02-01", "2024-02-29")),
+        (None, None, "2023-02", ("2023-02-01", "2023-02-28")),
+        ("2024-01-15", "2024-03-15", "2024-02", ("2024-02-01", "2024-02-29")),
+        ("2024-02-10", "2024-02-20", "2024-02", ("2024-02-10", "2024-02-20")),
+        ("2024-01-15", None, None, ("2024-01-15", None)),
+    ],
+)
+def test_month_clamps_the_date_window(start, end, month, expected):
+    assert _date_window(start, end, month) == expected
+
+
+@pytest.mark.parametrize(
+    "start, end, month",
+    [("2024/02/01", None, None), (None, "2024-02-30", None), (None, None, "2024-13"), (None, None, "February")],
+)
+def test_invalid_window_is_reported(start, end, month):
+    expected = "Dates must be YYYY-MM-DD and month YYYY-MM."
+    assert get_spending_by_category(start, end, month) == expected
+    assert get_top_vendors(start, end, month=month) == expected
+    assert get_largest_transactions(start, end, month) == expected
+
+
+def test_invalid_dates_by_month(database):
+    assert get_spending_by_month("2024-02-30") == "Dates must be YYYY-MM-DD."
+
+
+def test_spending_by_category_in_a_month(february):
+    assert get_spending_by_category(month="2024-02").splitlines() == [
+        "Spending by category, 2024-02-01 to 2024-02-29 (net $200.00 across 4 transactions):",
+        "Groceries | $150.00 | 75% | 2 txns",
+        "Home | $30.00 | 15% | 1 txns",
+        "Entertainment | $20.00 | 10% | 1 txns",
+    ]
+
+
+def test_spending_by_month_has_no_shares(february):
+    assert get_spending_by_month(category="groceries").splitlines()[1:] == [
+        "2024-01 | $40.00 | 1 txns",
+        "2024-02 | $150.00 | 2 txns",
+        "2024-03 | $60.00 | 1 txns",
+    ]
+
+
+def test_top_vendors_sum_the_rest_as_other(february):
+    assert get_top_vendors(month="2024-02", limit=2).splitlines() == [
+        "Top 2 vendors, 2024-02-01 to 2024-02-29 (net $200.00 across 4 transactions):",
+        "freshco | $100.00 | 50% | 1 txns",
+        "loblaws | $50.00 | 25% | 1 txns",
+        "Other (2 more) | $50.00",
+    ]
+    assert "Other" not in get_top_vendors(month="2024-02", limit=4)
+
+
+def test_shares_are_left_out_when_the_window_nets_to_zero(spend):
+    spend("2024-02-01", "FRESHCO", 50)
+    spend("2024-02-02", "IKEA", -50, "Home")
+
+    assert get_spending_by_category().splitlines() == [
+        "Spending by category, the beginning to now (net $0.00 across 2 transactions):",
+        "Groceries | $50.00 | 1 txns",
+        "Home | $-50.00 | 1 txns",
+    ]
+
+
+def test_shares_are_left_out_when_refunds_exceed_spending(spend):
+    spend("2024-02-01", "FRESHCO", 10)
+    spend("2024-02-02", "IKEA", -30, "Home")
+
+    lines = get_spending_by_category().splitlines()
+
+    assert lines[0].endswith("(net $-20.00 across 2 transactions):")
+    assert lines[1:] == ["Groceries | $10.00 | 1 txns", "Home | $-30.00 | 1 txns"]
+
+
+@pytest.mark.parametrize("limit, clamped", [(0, 1), (-5, 1), (10, 10), (500, 50)])
+def test_top_vendors_limit_is_clamped(database, monkeypatch, limit, clamped):
+    calls = []
+    monkeypatch.setattr(mcp_server, "get_spending_rollup", lambda *args, **kwargs: calls.append(kwargs) or [])
+
+    get_top_vendors(limit=limit)
+
+    assert calls[0]["limit"] == clamped
+
+
+@pytest.mark.parametrize("limit, clamped", [(0, 1), (20, 20), (1000, 100)])
+def test_largest_transactions_limit_is_clamped(database, monkeypatch, limit, clamped):
+    calls = []
+    monkeypatch.setattr(mcp_server, "get_spending_transactions", lambda *args, **kwargs: calls.append(kwargs) or [])
+
+    get_largest_transactions(limit=limit)
+
+    assert calls[0]["limit"] == clamped
+
+
+def test_largest_transactions_drill_down(february):
+    assert get_largest_transactions(month="2024-02", category="groceries", limit=1) == (
+        "2024-02-01 | FRESHCO | $100.0 | Groceries"
+    )
+    assert get_largest_transactions(month="2024-04") == "No spending found for 2024-04-01 to 2024-04-30."
+
+
+def test_rollup_window_columns_cover_groups_cut_by_limit(february, database):
+    rows = database.get_spending_rollup("vendor", "2024-02-01", "2024-02-29", limit=1)
+
+    assert rows == [{
+        "key": "freshco",
+        "net_amount": 100.0,
+        "txn_count": 1,
+        "window_total": 200.0,
+        "window_count": 4,
+        "group_count": 4,
+    }]
+
+
+def test_rollup_rejects_unknown_dimension(database):
+    with pytest.raises(ValueError):
+        database.get_spending_rollup("year")
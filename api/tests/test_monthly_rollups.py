@@ -0,0 +1,109 @@
+import pytest
+
+
+def _rollups(database):
+    rows = database.get_connection().execute(
+        "SELECT year, month, category_id, ROUND(net_amount, 2), txn_count FROM monthly_rollups"
+    )
+    return sorted(tuple(row) for row in rows)
+
+
+def _fresh_aggregate(database):
+    rows = database.get_connection().execute(
+        """
+        SELECT year, month, COALESCE(category_id, 0), ROUND(SUM(amount), 2), COUNT(*)
+        FROM transactions
+        WHERE year IS NOT NULL AND is_internal = 0
+        GROUP BY 1, 2, 3
+        """
+    )
+    return sorted(tuple(row) for row in rows)
+
+
+@pytest.fixture
+def statement_id(database):
+    statement_id = database.create_statement("statement.pdf", 1, "completed")
+    database.insert_transactions(statement_id, [
+        {"date": "2025-01-03", "vendor_raw": "FRESHCO #9888", "vendor": "freshco", "amount": 23.87},
+        {"date": "2025-01-15", "vendor_raw": "IKEA", "vendor": "ikea", "amount": 120.10},
+        {"date": "2025-01-20", "vendor_raw": "IKEA", "vendor": "ikea", "amount": -20.10},
+        {"date": "2025-02-02", "vendor_raw": "TIM HORTONS", "vendor": "tim hortons", "amount": 4.35},
+        {"date": "2025-02-05", "vendor_raw": "PAYMENT THANK YOU", "vendor": None, "amount": -500},
+    ])
+    return statement_id
+
+
+def _id(database, vendor_raw, date):
+    return database.get_connection().execute(
+        "SELECT id FROM transactions WHERE vendor_raw = ? AND transaction_date = ?",
+        (vendor_raw, date),
+    ).fetchone()[0]
+
+
+def test_inserts_are_rolled_up_without_internal_movements(database, statement_id):
+    assert _rollups(database) == _fresh_aggregate(database)
+    assert sum(row[4] for row in _rollups(database)) == 4
+
+
+def test_rollups_follow_every_kind_of_change(database, statement_id):
+    conn = database.get_connection()
+    groceries = database.get_or_create_category("Groceries")
+    home = database.get_or_create_category("Home")
+    ikea = [_id(database, "IKEA", "2025-01-15"), _id(database, "IKEA", "2025-01-20")]
+    payment = _id(database, "PAYMENT THANK YOU", "2025-02-05")
+
+    # Category changes, for one row and then moving it between categories
+    database.assign_category_to_transactions([_id(database, "FRESHCO #9888", "2025-01-03")], groceries)
+    database.assign_category_to_transactions(ikea, home)
+    database.assign_category_to_transactions(ikea[:1], groceries)
+    assert _rollups(database) == _fresh_aggregate(database)
+
+    # Flipping is_internal both ways
+    with database.transaction():
+        conn.execute("UPDATE transactions SET is_internal = 0 WHERE id = ?", (payment,))
+        conn.execute("UPDATE transactions SET is_internal = 1 WHERE id = ?", (ikea[1],))
+    assert _rollups(database) == _fresh_aggregate(database)
+    assert database.reclassify_internal_transactions() == 2
+    assert _rollups(database) == _fresh_aggregate(database)
+
+    # Moving a row to another month and changing its amount
+    with database.transaction():
+        conn.execute(
+            "UPDATE transactions SET transaction_date = '2025-03-01', amount = 99.99 WHERE id = ?",
+            (ikea[0],),
+        )
+    assert _rollups(database) == _fresh_aggregate(database)
+
+    # Deletes, down to an empty group and an empty table
+    with database.transaction():
+        conn.execute("DELETE FROM transactions WHERE id = ?", (ikea[0],))
+    assert _rollups(database) == _fresh_aggregate(database)
+    assert (2025, 3) not in {row[:2] for row in _rollups(database)}
+
+    with database.transaction():
+        conn.execute("DELETE FROM transactions")
+    assert _rollups(database) == []
+
+
+def test_manual_transactions_keep_rollups_current(database):
+    statement_id = database.create_manual_statement("cash")
+    groceries = database.get_or_create_category("Groceries")
+    transaction_id = database.insert_manual_transaction(
+        statement_id, "2025-04-01", "FARMERS MARKET", "farmers market", 30, groceries
+    )
+
+    database.update_manual_transaction(transaction_id, {"amount": 45, "category": "Produce"})
+    assert _rollups(database) == _fresh_aggregate(database)
+
+    database.update_manual_transaction(transaction_id, {"category": None, "transaction_date": "2025-05-01"})
+    assert _rollups(database) == _fresh_aggregate(database) == [(2025, 5, 0, 45.0, 1)]
+
+    database.delete_manual_transaction(transaction_id)
+    assert _rollups(database) == []
+
+
+def test_rebuild_matches_the_triggers(database, statement_id):
+    expected = _rollups(database)
+
+    assert database.rebuild_monthly_rollups() == len(expected)
+    assert _rollups(database) == expected
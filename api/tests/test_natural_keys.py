@@ -0,0 +1,96 @@
+import pytest
+
+import tool.transactions as transactions
+from tool.transactions import extract_account_number
+
+TXN = {"date": "2025-11-20", "vendor_raw": "FRESHCO #9888 BRAMPTON ON", "vendor": "freshco", "amount": 23.87}
+
+
+def _statement(database, name, issuer=None, account_number=None):
+    statement_id = database.create_statement(name, 1, "processing")
+    if issuer or account_number:
+        database.set_statement_account(statement_id, issuer, account_number)
+    return statement_id
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("CIBC Aventura Visa Card\nAccount number\n4500 XXXX XXXX 6680", "6680"),
+        ("Account# 3773 XXXXXX 89781", "89781"),
+        ("Visa card ending in 1234", "1234"),
+        ("Account No.: 0012 3456 789", "6789"),
+        ("Customer service 1 888 232-5656", None),
+    ],
+)
+def test_extract_account_number(text, expected):
+    assert extract_account_number(text) == expected
+
+
+def test_overlapping_statement_of_same_card_is_skipped(database):
+    first = _statement(database, "nov.pdf", "cibc", "6680")
+    second = _statement(database, "nov-dec.pdf", "cibc", "6680")
+
+    assert database.insert_transactions(first, [TXN]) == (1, 0)
+    assert database.insert_transactions(second, [TXN]) == (0, 1)
+
+
+def test_same_purchase_on_two_cards_of_one_issuer_is_kept(database):
+    first_card = _statement(database, "visa.pdf", "cibc", "6680")
+    second_card = _statement(database, "mastercard.pdf", "cibc", "1234")
+
+    assert database.insert_transactions(first_card, [TXN]) == (1, 0)
+    assert database.insert_transactions(second_card, [TXN]) == (1, 0)
+
+
+def test_same_card_digits_at_two_issuers_are_kept(database):
+    cibc = _statement(database, "cibc.pdf", "cibc", "1234")
+    mbna = _statement(database, "mbna.pdf", "mbna", "1234")
+
+    assert database.insert_transactions(cibc, [TXN]) == (1, 0)
+    assert database.insert_transactions(mbna, [TXN]) == (1, 0)
+
+
+def test_statements_without_an_account_number_are_never_merged(database):
+    first = _statement(database, "a.pdf", "cibc")
+    second = _statement(database, "b.pdf", "cibc")
+
+    assert database.insert_transactions(first, [TXN]) == (1, 0)
+    assert database.insert_transactions(second, [TXN]) == (1, 0)
+    # A retry of the same statement is still deduplicated
+    assert database.insert_transactions(first, [TXN]) == (0, 1)
+
+
+def test_backfill_rekeys_on_the_account(database):
+    first_card = _statement(database, "visa.pdf", "cibc", "6680")
+    second_card = _statement(database, "mastercard.pdf", "cibc", "1234")
+    conn = database.get_connection()
+    for statement_id in (first_card, second_card):
+        conn.execute(
+            "INSERT INTO transactions (statement_id, transaction_date, vendor_raw, amount) VALUES (?, ?, ?, ?)",
+            (statement_id, TXN["date"], TXN["vendor_raw"], TXN["amount"]),
+        )
+    conn.commit()
+
+    database._backfill_natural_keys()
+
+    keys = [row[0] for row in conn.execute("SELECT natural_key FROM transactions")]
+    assert len(set(keys)) == 2 and None not in keys
+    assert database.insert_transactions(first_card, [TXN]) == (0, 1)
+
+
+def test_ingest_records_the_statement_account(database, monkeypatch, tmp_path):
+    page = (
+        "www.cibc.com\nAccount number 4500 XXXX XXXX 6680\n"
+        "Nov 20 Nov 24 FRESHCO #9888 BRAMPTON ON Retail and Grocery 23.87"
+    )
+    monkeypatch.setattr(transactions, "count_pdf_pages", lambda path: 1)
+    monkeypatch.setattr(transactions, "iter_pdf_pages", lambda path: iter([page]))
+    monkeypatch.setattr(transactions, "normalize_vendors", lambda names: {n.strip(): n for n in names})
+    statement_id = _statement(database, "cibc.pdf")
+    other_card = _statement(database, "other.pdf", "cibc", "1234")
+    database.insert_transactions(other_card, [TXN])
+
+    assert transactions.ingest_pdf_statement(statement_id, tmp_path / "cibc.pdf") == (1, 0)
+    statement = database.get_statement_by_id(statement_id)
+    assert (statement["issuer"], statement["account_number"]) == ("cibc", "6680")
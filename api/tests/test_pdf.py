@@ -0,0 +1,123 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import tool.pdf as pdf
+
+
+def _write_pdf(path, page_texts):
+    """
+    Minimal text PDF, one line of Helvetica per page.
+    """
+    page_count = len(page_texts)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{4 + 2 * i} 0 R" for i in range(page_count)), page_count
+        ),
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(page_texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(out)
+    return path
+
+
+@pytest.fixture
+def statement_pdf(tmp_path):
+    return _write_pdf(tmp_path / "statement.pdf", [f"Page {n}" for n in range(1, 11)])
+
+
+class FakePool:
+    """
+    Runs the first `ready` submitted tasks at once; the rest stay pending.
+    Later futures can be failed through `fail_from`.
+    """
+
+    def __init__(self, ready=1, fail_from=None):
+        self.ready = ready
+        self.fail_from = fail_from
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        index = len(self.futures)
+        if self.fail_from is not None and index >= self.fail_from:
+            future.set_exception(BrokenProcessPool("worker died"))
+        elif index < self.ready:
+            future.set_result(fn(*args))
+        self.futures.append(future)
+        return future
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    """
+    Extract in ranges of two pages with two workers, even for short PDFs.
+    """
+    monkeypatch.setattr(pdf, "PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(pdf, "PAGES_PER_TASK", 2)
+
+
+def test_count_pdf_pages(statement_pdf):
+    assert pdf.count_pdf_pages(statement_pdf) == 10
+
+
+def test_missing_pdf_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        next(pdf.iter_pdf_pages(tmp_path / "missing.pdf"))
+
+
+def test_pages_are_streamed_in_order(statement_pdf):
+    assert list(pdf.iter_pdf_pages(statement_pdf, workers=1)) == [f"Page {n}" for n in range(1, 11)]
+
+
+def test_parallel_extraction_keeps_page_order(statement_pdf, parallel):
+    try:
+        pages = list(pdf.iter_pdf_pages(statement_pdf, workers=2))
+    finally:
+        pdf._reset_pool()
+
+    assert pages == [f"Page {n}" for n in range(1, 11)]
+
+
+def test_page_ranges_in_flight_are_bounded_and_cancelled_on_close(statement_pdf, parallel, monkeypatch):
+    pool = FakePool(ready=1)
+    monkeypatch.setattr(pdf, "_get_pool", lambda workers: pool)
+
+    pages = pdf.iter_pdf_pages(statement_pdf, workers=2)
+    assert next(pages) == "Page 1"
+    # Two per worker, plus one submitted as the first range was taken
+    assert len(pool.futures) == 2 * pdf.TASKS_PER_WORKER + 1
+
+    pages.close()
+
+    assert all(future.cancelled() for future in pool.futures[1:])
+
+
+def test_broken_pool_falls_back_to_serial_extraction(statement_pdf, parallel, monkeypatch):
+    pool = FakePool(ready=2, fail_from=2)
+    resets = []
+    monkeypatch.setattr(pdf, "_get_pool", lambda workers: pool)
+    monkeypatch.setattr(pdf, "_reset_pool", lambda: resets.append(True))
+
+    pages = list(pdf.iter_pdf_pages(statement_pdf, workers=2))
+
+    assert pages == [f"Page {n}" for n in range(1, 11)]
+    assert resets == [True]
@@ -0,0 +1,114 @@
+import pytest
+
+from db.db import _fts_query
+
+
+@pytest.fixture
+def spend(database):
+    """
+    Add manual transactions: spend(date, vendor_raw, vendor, amount, category) -> id.
+    """
+    statement_id = database.create_manual_statement("bills")
+
+    def add(date, vendor_raw, vendor, amount, category="Shopping"):
+        category_id = database.get_or_create_category(category)
+        return database.insert_manual_transaction(statement_id, date, vendor_raw, vendor, amount, category_id)
+
+    return add
+
+
+def _vendors(results):
+    return [row["vendor"] for row in results]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("star buck", '"star"* "buck"*'),
+        ('mc"donald\'s', '"mc"* "donald"* "s"*'),
+        ("AT&T -wireless", '"AT"* "T"* "wireless"*'),
+        ("vendor:amazon NEAR(a b)", '"vendor"* "amazon"* "NEAR"* "a"* "b"*'),
+        ("amazon OR ikea", '"amazon"* "OR"* "ikea"*'),
+        ("*^-()", ""),
+    ],
+)
+def test_fts_query_quotes_every_word(text, expected):
+    assert _fts_query(text) == expected
+
+
+def test_words_match_as_prefixes_and_all_must_match(database, spend):
+    spend("2025-01-02", "STARBUCKS #123 TORONTO", "starbucks", 5.25, "Dining")
+    spend("2025-01-03", "STAR CINEMAS", "star cinemas", 14, "Entertainment")
+
+    assert sorted(_vendors(database.search_transactions("star"))) == ["STAR CINEMAS", "STARBUCKS #123 TORONTO"]
+    assert _vendors(database.search_transactions("starb tor")) == ["STARBUCKS #123 TORONTO"]
+    assert _vendors(database.search_transactions("din")) == ["STARBUCKS #123 TORONTO"]
+    assert database.search_transactions("star pizza") == []
+
+
+def test_special_characters_are_searched_as_text(database, spend):
+    spend("2025-01-02", "AT&T WIRELESS", "at&t", 80, "Phone")
+    spend("2025-01-03", "MCDONALD'S #40", "mcdonald's", 9, "Dining")
+
+    assert _vendors(database.search_transactions("AT&T")) == ["AT&T WIRELESS"]
+    assert _vendors(database.search_transactions('mcdonald"s')) == ["MCDONALD'S #40"]
+    # FTS5 operators are plain words once quoted
+    assert database.search_transactions("wireless OR dining") == []
+    assert database.search_transactions("NEAR(at wireless)") == []
+    assert database.search_transactions('"*-') == []
+
+
+def test_vendor_name_matches_rank_above_category_matches(database, spend):
+    spend("2025-03-01", "COSTCO WHOLESALE", "costco", 200, "Coffee")
+    spend("2025-01-01", "SQ *BLUE BOTTLE", "blue bottle coffee", 6, "Dining")
+
+    assert _vendors(database.search_transactions("coffee")) == ["SQ *BLUE BOTTLE", "COSTCO WHOLESALE"]
+
+
+def test_equal_matches_are_newest_first(database, spend):
+    for date in ("2025-01-05", "2025-03-05", "2025-02-05"):
+        spend(date, "NETFLIX.COM", "netflix", 16.99, "Entertainment")
+
+    dates = [row["transaction_date"] for row in database.search_transactions("netflix")]
+    assert dates == ["2025-03-05", "2025-02-05", "2025-01-05"]
+
+
+def test_index_follows_vendor_and_category_changes(database, spend):
+    transaction_id = spend("2025-01-02", "AMZN MKTP CA", "amzn mktp", 30)
+
+    database.get_connection().execute(
+        "UPDATE transactions SET vendor_normalized = 'amazon' WHERE id = ?", (transaction_id,)
+    )
+    assert _vendors(database.search_transactions("amazon")) == ["AMZN MKTP CA"]
+    assert database.search_transactions("mktp ca")
+
+    database.update_manual_transaction(transaction_id, {"vendor_raw": "AMAZON.CA", "category": "Books"})
+    assert database.search_transactions("mktp") == []
+    assert _vendors(database.search_transactions("books")) == ["AMAZON.CA"]
+
+    database.get_connection().execute("UPDATE categories SET name = 'Reading' WHERE name = 'Books'")
+    assert database.search_transactions("books") == []
+    assert _vendors(database.search_transactions("reading")) == ["AMAZON.CA"]
+
+    database.delete_manual_transaction(transaction_id)
+    assert database.search_transactions("amazon") == []
+
+
+def test_date_and_amount_filters_are_inclusive(database, spend):
+    for date, amount in (("2025-01-31", 10), ("2025-02-01", 25), ("2025-02-28", 40), ("2025-03-01", 55)):
+        spend(date, "UBER EATS", "uber eats", amount, "Dining")
+
+    def amounts(**filters):
+        return sorted(row["amount"] for row in database.search_transactions("uber", **filters))
+
+    assert amounts(start_date="2025-02-01", end_date="2025-02-28") == [25, 40]
+    assert amounts(min_amount=25, max_amount=40) == [25, 40]
+    assert amounts(start_date="2025-02-01", max_amount=40) == [25, 40]
+    assert amounts(end_date="2025-01-31", min_amount=11) == []
+
+
+def test_limit(database, spend):
+    for day in range(1, 6):
+        spend(f"2025-01-0{day}", "IKEA", "ikea", day)
+
+    assert len(database.search_transactions("ikea", limit=3)) == 3
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import handler.statement as statement_handler
+import main
+from tool.statement_events import StatementEventHub
+
+TIMEOUT = 5
+
+
+@pytest.fixture
+def hub():
+    hub = StatementEventHub(poll_interval=0.01)
+    yield hub
+    hub.close()
+
+
+@pytest.fixture
+def statement_id(database):
+    statement_id = database.create_statement("statement.pdf", 8, "processing")
+    database.start_statement_progress(statement_id, pages_total=2)
+    return statement_id
+
+
+async def _events(subscription, count):
+    return [await asyncio.wait_for(subscription.get(), TIMEOUT) for _ in range(count)]
+
+
+async def _until_end(subscription):
+    events = []
+    while (event := await asyncio.wait_for(subscription.get(), TIMEOUT)) is not None:
+        events.append(event)
+    return events
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_subscribe_delivers_current_status_and_progress(hub, statement_id):
+    async def scenario():
+        subscription = hub.subscribe(statement_id)
+        try:
+            return await _events(subscription, 2)
+        finally:
+            hub.unsubscribe(subscription)
+
+    status, progress = asyncio.run(scenario())
+
+    assert status == ("status", {"statement_id": statement_id, "status": "processing", "error_message": None})
+    assert progress[0] == "progress"
+    assert progress[1]["stage"] == "parsing"
+    assert (progress[1]["pages_total"], progress[1]["pages_done"]) == (2, 0)
+
+
+def test_changes_are_published_and_complete_ends_the_stream(hub, statement_id, database):
+    async def scenario():
+        subscription = hub.subscribe(statement_id)
+        await _events(subscription, 2)  # Initial snapshot
+
+        await asyncio.to_thread(database.add_statement_progress, statement_id, pages_done=1)
+        [progress] = await _events(subscription, 1)
+
+        def finish():
+            with database.transaction():  # One commit, so one change to publish
+                database.insert_transactions(statement_id, [
+                    {"date": "2025-01-02", "vendor_raw": "IKEA", "vendor": "ikea", "amount": 40},
+                ])
+                database.add_statement_progress(statement_id, pages_done=1, rows_inserted=1)
+                database.update_statement_status(statement_id, "completed")
+            database.close_connection()
+
+        await asyncio.to_thread(finish)
+        return progress, await _until_end(subscription)
+
+    progress, rest = asyncio.run(scenario())
+
+    assert progress[1]["pages_done"] == 1
+    assert [name for name, _ in rest] == ["status", "progress", "complete"]
+    complete = rest[-1][1]
+    assert (complete["status"], complete["transaction_count"], complete["total_amount"]) == ("completed", 1, 40)
+    assert complete["rows_inserted"] == 1
+
+
+def test_subscribers_share_one_watcher_that_stops_when_the_last_leaves(hub, statement_id):
+    async def scenario():
+        first = hub.subscribe(statement_id)
+        second = hub.subscribe(statement_id)
+        await _events(first, 2)
+        await _events(second, 2)
+        thread = hub._thread
+
+        hub.unsubscribe(first)
+        assert hub._thread is thread and thread.is_alive()
+        hub.unsubscribe(second)
+        return thread
+
+    thread = asyncio.run(scenario())
+
+    thread.join(TIMEOUT)
+    assert not thread.is_alive()
+    assert hub._thread is None
+
+
+def test_unsubscribed_listener_gets_no_more_events(hub, statement_id, database):
+    async def scenario():
+        leaving = hub.subscribe(statement_id)
+        staying = hub.subscribe(statement_id)
+        await _events(leaving, 2)
+        await _events(staying, 2)
+        hub.unsubscribe(leaving)
+
+        await asyncio.to_thread(database.add_statement_progress, statement_id, pages_done=1)
+        await _events(staying, 1)
+        hub.unsubscribe(staying)
+        return leaving._queue.qsize()
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_missing_statement_ends_the_stream_with_an_error(hub, database):
+    async def scenario():
+        return await _until_end(hub.subscribe(12345))
+
+    assert asyncio.run(scenario()) == [("error", {"statement_id": 12345, "detail": "Statement not found"})]
+
+
+@pytest.fixture
+def client(database, hub, monkeypatch):
+    monkeypatch.setattr(statement_handler, "statement_events", hub)
+    return TestClient(main.app)
+
+
+def _sse_events(body):
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_events_endpoint_streams_until_complete(client, statement_id, database, hub):
+    database.update_statement_status(statement_id, "completed")
+
+    with client.stream("GET", f"/statements/{statement_id}/events") as response:
+        body = "".join(response.iter_text())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert body.startswith("retry: ")
+    assert [name for name, _ in _sse_events(body)] == ["status", "progress", "complete"]
+    _wait_for(lambda: hub._thread is None)
+
+
+def test_events_endpoint_unknown_statement(client):
+    assert client.get("/statements/12345/events").status_code == 404
@@ -0,0 +1,81 @@
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_pages_follow_the_cursor(database):
+    ids = [database.create_statement(f"{i}.pdf", 1, "completed") for i in range(3)]
+    client = TestClient(main.app)
+
+    first = client.get("/statements/", params={"page_size": 2}).json()
+    second = client.get("/statements/", params={"page_size": 2, "cursor": first["next_cursor"]}).json()
+
+    assert [s["id"] for s in first["items"] + second["items"]] == ids[::-1]
+    assert second["next_cursor"] is None
+
+
+def test_filter_by_source_type(database):
+    database.create_statement("card.pdf", 1, "completed")
+    manual = [database.create_manual_statement(f"bills {i}") for i in range(3)]
+    client = TestClient(main.app)
+
+    first = client.get("/statements/", params={"source_type": "manual", "page_size": 2}).json()
+    second = client.get(
+        "/statements/",
+        params={"source_type": "manual", "page_size": 2, "cursor": first["next_cursor"]},
+    ).json()
+
+    assert [s["id"] for s in first["items"] + second["items"]] == manual[::-1]
+    assert client.get("/statements/", params={"source_type": "csv"}).status_code == 422
+
+
+def test_equal_upload_times_across_a_page_boundary(database):
+    card = [database.create_statement(f"{i}.pdf", 1, "completed") for i in range(2)]
+    manual = [database.create_manual_statement(f"bills {i}") for i in range(5)]
+    conn = database.get_connection()
+    conn.execute("UPDATE statements SET uploaded_at = '2025-01-01 00:00:00'")
+    conn.commit()
+    client = TestClient(main.app)
+
+    seen, cursor = [], None
+    while True:
+        params = {"source_type": "manual", "page_size": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/statements/", params=params).json()
+        seen += [s["id"] for s in page["items"]]
+        if not (cursor := page["next_cursor"]):
+            break
+
+    # Ties on uploaded_at fall back to id: nothing repeated or skipped
+    assert seen == manual[::-1]
+    first = database.get_statements(limit=3)
+    rest = database.get_statements(after=(first[-1]["uploaded_at"], first[-1]["id"]))
+    assert [s["id"] for s in first + rest] == (card + manual)[::-1]
+
+
+def test_statement_without_transactions_has_empty_summary(database):
+    empty = database.create_manual_statement("cash")
+    filled = database.create_manual_statement("bills")
+    category_id = database.get_or_create_category("Groceries")
+    for date, amount in (("2025-02-03", 10.10), ("2025-01-20", 5.25)):
+        database.insert_manual_transaction(filled, date, "FRESHCO", "freshco", amount, category_id)
+
+    summaries = {s["id"]: s for s in database.get_statements()}
+    summary = {key: summaries[empty][key] for key in (
+        "transaction_count", "total_amount", "first_transaction_date", "last_transaction_date"
+    )}
+
+    assert summary == {
+        "transaction_count": 0,
+        "total_amount": 0,
+        "first_transaction_date": None,
+        "last_transaction_date": None,
+    }
+    assert (summaries[filled]["transaction_count"], summaries[filled]["total_amount"]) == (2, 15.35)
+    assert (summaries[filled]["first_transaction_date"], summaries[filled]["last_transaction_date"]) == (
+        "2025-01-20", "2025-02-03"
+    )
+    assert database.get_statement_by_id(empty)["transaction_count"] == 0
+
+    response = TestClient(main.app).get(f"/statements/{empty}")
+    assert response.status_code == 200
+    assert (response.json()["transaction_count"], response.json()["total_amount"]) == (0, 0)
@@ -0,0 +1,128 @@
+import json
+
+import httpx
+import pytest
+
+from tool.llm import LLMClient
+from tool.llm_cache import LLMResponseCache, get_llm_cache, set_llm_cache
+from tool.transactions import (
+    parse_lines_with_profile,
+    parse_transaction_lines_batch,
+    validate_parsed_row,
+)
+
+
+@pytest.fixture
+def llm_replies(llm_client):
+    """
+    Stand-in LLM answering prompts with the queued replies, in order.
+    The response cache is disabled so every line reaches it.
+    """
+    replies = []
+    prompts = []
+
+    def handler(request):
+        prompts.append(json.loads(request.content)["prompt"])
+        return httpx.Response(200, json={"response": replies.pop(0)})
+
+    llm_client(LLMClient(base_url="http://ollama.test", transport=httpx.MockTransport(handler)))
+    previous = get_llm_cache()
+    set_llm_cache(LLMResponseCache(enabled=False))
+    yield replies, prompts
+    set_llm_cache(previous)
+
+
+@pytest.mark.parametrize(
+    "row, expected",
+    [
+        (
+            {"date": "Nov 20", "vendor_raw": " FRESHCO #9888 ", "amount": 23.87},
+            {"date": "Nov 20", "vendor_raw": "FRESHCO #9888", "amount": 23.87},
+        ),
+        (
+            {"date": "Nov 20", "vendor_raw": "IKEA", "amount": "$1,234.50"},
+            {"date": "Nov 20", "vendor_raw": "IKEA", "amount": 1234.5},
+        ),
+        (
+            {"date": "Nov 20", "vendor_raw": "REFUND", "amount": "-$3,600.00"},
+            {"date": "Nov 20", "vendor_raw": "REFUND", "amount": -3600.0},
+        ),
+        (
+            {"date": "Nov 20", "vendor_raw": "IKEA", "amount": 12, "index": 1},
+            {"date": "Nov 20", "vendor_raw": "IKEA", "amount": 12.0},
+        ),
+    ],
+)
+def test_validate_parsed_row_accepts_and_coerces(row, expected):
+    assert validate_parsed_row(row) == expected
+
+
+@pytest.mark.parametrize(
+    "row",
+    [
+        None,
+        ["Nov 20", "IKEA", 12],
+        {"date": None, "vendor_raw": "IKEA", "amount": 12},
+        {"date": "", "vendor_raw": "IKEA", "amount": 12},
+        {"date": "Nov 20", "vendor_raw": None, "amount": 12},
+        {"date": "Nov 20", "vendor_raw": "   ", "amount": 12},
+        {"date": "Nov 20", "vendor_raw": "IKEA", "amount": None},
+        {"date": "Nov 20", "vendor_raw": "IKEA", "amount": "twelve"},
+        {"date": "Nov 20", "vendor_raw": "IKEA", "amount": True},
+        {"date": "Nov 20", "vendor_raw": "IKEA", "amount": float("nan")},
+        {"date": 20241120, "vendor_raw": "IKEA", "amount": 12},
+    ],
+)
+def test_validate_parsed_row_rejects_unusable_values(row):
+    assert validate_parsed_row(row) is None
+
+
+def test_single_line_with_bad_amount_is_skipped(llm_replies):
+    replies, _ = llm_replies
+    replies.append('{"date": "Nov 20", "vendor_raw": "IKEA", "amount": "n/a"}')
+
+    assert parse_transaction_lines_batch(["Nov 20 Nov 21 IKEA n/a"]) == [None]
+
+
+def test_batch_coerces_string_amounts(llm_replies):
+    replies, _ = llm_replies
+    replies.append(json.dumps([
+        {"index": 1, "date": "Nov 20", "vendor_raw": "IKEA", "amount": "$1,234.50"},
+        {"index": 2, "date": "Nov 21", "vendor_raw": "SHELL", "amount": 40},
+    ]))
+
+    assert parse_transaction_lines_batch(["line one", "line two"]) == [
+        {"date": "Nov 20", "vendor_raw": "IKEA", "amount": 1234.5},
+        {"date": "Nov 21", "vendor_raw": "SHELL", "amount": 40.0},
+    ]
+
+
+def test_batch_row_with_null_values_is_retried_alone(llm_replies):
+    replies, prompts = llm_replies
+    replies.append(json.dumps([
+        {"index": 1, "date": "Nov 20", "vendor_raw": "IKEA", "amount": 12},
+        {"index": 2, "date": None, "vendor_raw": None, "amount": 40},
+    ]))
+    replies.append('{"date": "Nov 21", "vendor_raw": "SHELL", "amount": 40}')
+
+    assert parse_transaction_lines_batch(["line one", "line two"]) == [
+        {"date": "Nov 20", "vendor_raw": "IKEA", "amount": 12.0},
+        {"date": "Nov 21", "vendor_raw": "SHELL", "amount": 40.0},
+    ]
+    assert "line two" in prompts[1] and "line one" not in prompts[1]
+
+
+def test_unusable_rows_do_not_fail_the_other_lines(llm_replies):
+    replies, _ = llm_replies
+    replies.append(json.dumps([
+        {"index": 1, "date": "Nov 20", "vendor_raw": "IKEA", "amount": 12},
+        {"index": 2, "date": "Nov 21", "vendor_raw": "", "amount": 40},
+        {"index": 3, "date": "Nov 22", "vendor_raw": "UBER", "amount": "$7.25"},
+    ]))
+    replies.append('{"date": "Nov 21", "vendor_raw": null, "amount": 40}')
+
+    parsed = parse_lines_with_profile(["a", "b", "c"], profile=None, batch_size=3, max_workers=1)
+    assert parsed == [
+        {"date": "Nov 20", "vendor_raw": "IKEA", "amount": 12.0},
+        {"date": "Nov 22", "vendor_raw": "UBER", "amount": 7.25},
+    ]
@@ -0,0 +1,104 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import handler.statement as statement_handler
+import main
+
+PDF = b"%PDF-1.4\n" + b"0" * 2048
+
+
+@pytest.fixture
+def client(database, tmp_path):
+    (tmp_path / "data" / "uploads").mkdir()
+    return TestClient(main.app)
+
+
+def _upload(client, content=PDF, name="statement.pdf"):
+    return client.post("/statements/upload", files={"file": (name, content, "application/pdf")})
+
+
+def test_upload_queues_statement(client, database):
+    response = _upload(client)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["duplicate"] is False
+    assert database.get_statement_by_id(body["statement_id"])["status"] == "processing"
+    assert database.count_pending_jobs() == 1
+
+
+def test_same_file_is_deduplicated(client, database):
+    first = _upload(client).json()
+    second = _upload(client, name="renamed.pdf").json()
+
+    assert second["duplicate"] is True
+    assert second["statement_id"] == first["statement_id"]
+    assert database.count_pending_jobs() == 1
+
+
+def test_concurrent_uploads_of_one_file_create_one_statement(client, database, monkeypatch):
+    # Both uploads pass the pre-check before either has inserted
+    monkeypatch.setattr(statement_handler, "get_statement_by_hash", lambda content_hash: None)
+    first = _upload(client).json()
+
+    monkeypatch.setattr(
+        statement_handler,
+        "get_statement_by_hash",
+        _none_then(database.get_statement_by_hash),
+    )
+    second = _upload(client).json()
+
+    assert second["duplicate"] is True
+    assert second["statement_id"] == first["statement_id"]
+    assert database.count_pending_jobs() == 1
+    assert len(list((database.DATA_DIR / "uploads").iterdir())) == 1
+
+
+def test_file_of_failed_statement_can_be_uploaded_again(client, database):
+    first = _upload(client).json()
+    database.fail_statement(first["statement_id"], "LLM unavailable")
+
+    second = _upload(client).json()
+
+    assert second["duplicate"] is False
+    assert second["statement_id"] != first["statement_id"]
+
+
+def test_existing_duplicates_are_released_before_the_unique_index(database):
+    conn = database.get_connection()
+    conn.execute("DROP INDEX idx_statements_content_hash_active")
+    for _ in range(2):
+        conn.execute(
+            "INSERT INTO statements (filename, file_size, status, content_hash) VALUES ('a.pdf', 1, 'completed', 'abc')"
+        )
+    conn.commit()
+
+    database.init_db()
+
+    hashes = [row[0] for row in conn.execute("SELECT content_hash FROM statements ORDER BY id")]
+    assert hashes == ["abc", None]
+
+
+def _none_then(lookup):
+    calls = []
+
+    def get_statement_by_hash(content_hash):
+        calls.append(content_hash)
+        return None if len(calls) == 1 else lookup(content_hash)
+
+    return get_statement_by_hash
+
+
+def test_full_queue_rejects_new_files_but_not_duplicates(client, database, monkeypatch):
+    first = _upload(client).json()
+    monkeypatch.setattr(statement_handler, "MAX_QUEUE_DEPTH", 1)
+
+    rejected = _upload(client, content=PDF + b"new")
+    duplicate = _upload(client, name="again.pdf")
+
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"]
+    assert duplicate.status_code == 200
+    assert duplicate.json()["statement_id"] == first["statement_id"]
+    # Neither upload left a file behind
+    assert len(list((database.DATA_DIR / "uploads").iterdir())) == 1
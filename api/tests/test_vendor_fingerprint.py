@@ -0,0 +1,63 @@
+import pytest
+
+from core.vendor_fingerprint import vendor_fingerprint
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        # Docstring examples
+        ("SQ *POPUPSHOPSCANADA Brampton ON", "POPUPSHOPSCANADA"),
+        ("FRESHCO #9888 BRAMPTON ON", "FRESHCO"),
+        ("AMAZON.CA*PZ3T61XX3 866-216-1072 ON", "AMAZON"),
+        # Store numbers and known cities vary; the merchant does not
+        ("FRESHCO #1234 TORONTO ON", "FRESHCO"),
+        ("SHELL C07859 MISSISSAUGA ON", "SHELL"),
+        ("HM CA0060 Brampton ON", "HM"),
+        # Multi-word cities
+        ("LOBLAWS 1012 RICHMOND HILL ON", "LOBLAWS"),
+        ("IKEA NORTH VANCOUVER BC", "IKEA"),
+        ("IKEA VANCOUVER BC", "IKEA"),
+        # No city before the province code: the merchant name stays whole
+        ("BEST WESTERN ON", "BEST WESTERN"),
+        ("TIM HORTONS ON", "TIM HORTONS"),
+        ("BEST BUY #123 ON", "BEST BUY"),
+        # Unlisted city with enough merchant words before it
+        ("CANADIAN TIRE STOUFFVILLE ON", "CANADIAN TIRE"),
+        ("TIM HORTONS #123 BOLTON ON", "TIM HORTONS"),
+        # A phone number takes the city's place
+        ("NETFLIX.COM 866-579-7172 ON", "NETFLIX"),
+        # Country codes alone do not imply a city
+        ("PRESTO FARE TORONTO CA", "PRESTO FARE TORONTO"),
+        # A word after "MERCHANT*" names the service; reference IDs do not
+        ("UBER* EATS HELP.UBER.COM ON", "UBER EATS"),
+        ("UBER* TRIP 800-592-8996 ON", "UBER TRIP"),
+        ("UBER*TRIP", "UBER TRIP"),
+        ("DOORDASH*MCDONALDS", "DOORDASH MCDONALDS"),
+        ("NETFLIX.COM*12AB34", "NETFLIX"),
+        # Processor prefixes need their "*"
+        ("PAYPAL *SPOTIFY", "SPOTIFY"),
+        ("IN *GOODFOOD MARKET", "GOODFOOD MARKET"),
+        ("LS*BEANFIELD", "BEANFIELD"),
+        ("LS TOWERS", "LS TOWERS"),
+        ("IN N OUT BURGER", "IN N OUT BURGER"),
+        ("FS LOGISTICS", "FS LOGISTICS"),
+        ("BT CAFE", "BT CAFE"),
+        ("SPOTIFY P12345", "SPOTIFY"),
+        # Single word is never dropped
+        ("COSTCO ON", "COSTCO"),
+        ("  freshco   #9888  brampton  on ", "FRESHCO"),
+    ],
+)
+def test_vendor_fingerprint(raw, expected):
+    assert vendor_fingerprint(raw) == expected
+
+
+def test_different_merchants_get_different_fingerprints():
+    assert vendor_fingerprint("UBER* EATS") != vendor_fingerprint("UBER* TRIP")
+    assert vendor_fingerprint("BEST WESTERN ON") != vendor_fingerprint("BEST BUY #123 ON")
+    assert vendor_fingerprint("TIM HORTONS ON") != vendor_fingerprint("TIM'S DINER ON")
+
+
+def test_empty_result_falls_back_to_original():
+    assert vendor_fingerprint("#1234") == "#1234"
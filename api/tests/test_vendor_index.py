@@ -0,0 +1,72 @@
+import pytest
+
+from core.vendor_fingerprint import vendor_fingerprint
+from tool.vendor import VendorIndex
+
+
+@pytest.fixture
+def index():
+    index = VendorIndex(min_prefix_len=10)
+    index.load([
+        ("HMSHOST", "hmshost"),
+        ("SHELLFISH SHACK", "shellfish-shack"),
+        ("STARBUCKS COFFEE", "starbucks"),
+        ("CANADIAN TIRE GAS BAR", "canadian-tire-gas"),
+        ("WALMART SUPERCENTER", "walmart"),
+    ])
+    return index
+
+
+def test_exact_match(index):
+    assert index.lookup("HMSHOST") == "hmshost"
+    assert index.lookup("starbucks coffee") == "starbucks"
+
+
+def test_short_keys_need_an_exact_match(index):
+    assert index.lookup(vendor_fingerprint("HM CA0060 Brampton ON")) is None
+    assert index.lookup(vendor_fingerprint("SHELL C07859 MISSISSAUGA ON")) is None
+    assert index.lookup("STARBUCKS") is None
+
+
+def test_cached_key_is_leading_words_of_lookup(index):
+    assert index.lookup("STARBUCKS COFFEE RESERVE") == "starbucks"
+    assert index.lookup("WALMART SUPERCENTER STORE") == "walmart"
+
+
+def test_lookup_is_leading_words_of_cached_key(index):
+    assert index.lookup("CANADIAN TIRE GAS") == "canadian-tire-gas"
+    assert index.lookup("CANADIAN TIRE") == "canadian-tire-gas"
+
+
+def test_shared_words_with_different_endings_do_not_match(index):
+    # Same brand words, but neither key is the other's leading words
+    assert index.lookup("CANADIAN TIRE STORE") is None
+
+
+def test_ambiguous_continuation_does_not_match(index):
+    index.add("CANADIAN TIRE STORE", "canadian-tire-store")
+    assert index.lookup("CANADIAN TIRE") is None
+    assert index.lookup("CANADIAN TIRE GAS") == "canadian-tire-gas"
+
+
+def test_longest_cached_leading_words_win(index):
+    index.add("WALMART SUPERCENTER STORE", "walmart-store")
+    assert index.lookup("WALMART SUPERCENTER STORE 1234") == "walmart-store"
+    assert index.lookup("WALMART SUPERCENTER 1234") == "walmart"
+
+
+def test_prefix_must_end_on_a_word_boundary(index):
+    # Shares 'STARBUCKS COFF' but not the whole word
+    assert index.lookup("STARBUCKS COFFIN") is None
+    assert index.lookup("WALMART SUPERCENTERS") is None
+
+
+def test_prefix_must_reach_min_length(index):
+    # 'SHELLFISH' is a whole shared word but only 9 characters
+    assert index.lookup("SHELLFISH MARKET") is None
+
+
+def test_added_keys_are_found(index):
+    index.add("HM", "h-and-m")
+    assert index.lookup("HM") == "h-and-m"
+    assert index.lookup("HMSHOST") == "hmshost"
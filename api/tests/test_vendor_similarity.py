@@ -0,0 +1,83 @@
+import pytest
+
+import tool.vendor as vendor
+from tool.vendor_similarity import TrigramIndex
+
+
+@pytest.fixture
+def index():
+    index = TrigramIndex()
+    index.load([
+        ("WALMART SUPERCENTER", "walmart"),
+        ("TIM HORTONS", "tim-hortons"),
+        ("CANADIAN TIRE GAS BAR", "canadian-tire-gas"),
+        ("PETRO CANADA", "petro-canada"),
+        ("AMAZON", "amazon"),
+    ])
+    return index
+
+
+def test_spelling_variants_match(index):
+    assert index.best_match("WAL-MART SUPERCENTER")[1] == "walmart"
+    assert index.best_match("tim horton")[1] == "tim-hortons"
+
+
+def test_exact_key_scores_one(index):
+    assert index.best_match("TIM HORTONS") == ("TIM HORTONS", "tim-hortons", 1.0)
+
+
+def test_threshold_is_inclusive_and_configurable(index):
+    # "PETRO-CANADA" ~ "PETRO CANADA" scores about 0.77
+    assert index.best_match("PETRO-CANADA") is None
+    assert index.best_match("PETRO-CANADA", threshold=0.75)[1] == "petro-canada"
+    _, _, score = index.best_match("PETRO-CANADA", threshold=0.75)
+    assert index.best_match("PETRO-CANADA", threshold=score)[1] == "petro-canada"
+
+
+def test_related_but_different_vendor_does_not_match(index):
+    assert index.best_match("CANADIAN TIRE STORE") is None
+
+
+def test_abbreviations_are_out_of_scope(index):
+    # Too few shared trigrams; these are left to the LLM
+    assert index.best_match("AMZN MKTP") is None
+
+
+def test_add_replaces_value_of_existing_key(index):
+    index.add("tim hortons", "tims")
+    assert index.best_match("TIM HORTONS")[1] == "tims"
+    assert len(index) == 5
+
+
+@pytest.fixture
+def llm_vendors(database, monkeypatch):
+    """
+    Stand-in for the vendor LLM; records the vendors sent to it.
+    """
+    sent = []
+
+    def normalize_batch(raw_vendors):
+        sent.extend(raw_vendors)
+        return {raw: raw.split()[0].lower() for raw in raw_vendors}
+
+    monkeypatch.setattr(vendor, "_normalize_batch_with_llm", normalize_batch)
+    vendor.cache_vendor("WALMART SUPERCENTER", "walmart")
+    vendor.load_vendor_index()
+    return sent
+
+
+def test_fuzzy_matches_are_not_cached(database, llm_vendors):
+    assert vendor.normalize_vendors(["WAL-MART SUPERCENTER"]) == {"WAL-MART SUPERCENTER": "walmart"}
+    assert llm_vendors == []
+
+    cached = database.get_connection().execute("SELECT raw_vendor FROM vendor_cache").fetchall()
+    assert [row[0] for row in cached] == ["WALMART SUPERCENTER"]
+    assert vendor.get_cached_vendor("WAL-MART SUPERCENTER") is None
+
+
+def test_fuzzy_match_is_not_an_anchor_for_further_matches(database, llm_vendors):
+    # Close to the fuzzy-matched name, but not to the cached fingerprint
+    vendor.normalize_vendor("WAL-MART SUPERCENTER")
+    vendor.normalize_vendors(["WAL-MART SUPERCENTRE #1"])
+
+    assert llm_vendors == ["WAL-MART SUPERCENTRE #1"]
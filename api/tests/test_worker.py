@@ -0,0 +1,93 @@
+import sqlite3
+import threading
+
+import pytest
+
+import worker
+
+
+def _txn(day, vendor, amount):
+    return {"date": f"2025-01-{day:02d}", "vendor_raw": vendor, "vendor": vendor.lower(), "amount": amount}
+
+
+def _spending(database):
+    conn = database.get_connection()
+    return {
+        "transactions": conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0],
+        "rollups": conn.execute("SELECT COALESCE(SUM(txn_count), 0) FROM monthly_rollups").fetchone()[0],
+        "search": len(database.search_transactions("ikea")),
+    }
+
+
+@pytest.fixture
+def job(database, tmp_path):
+    """
+    A claimed job for a new statement, with its PDF on disk.
+    """
+    pdf_path = tmp_path / "statement.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4")
+    statement_id = database.create_statement("statement.pdf", 8, "processing")
+    database.enqueue_job(statement_id, str(pdf_path), max_attempts=2)
+    return database.claim_job("test-worker")
+
+
+def _fail_after_inserting(database):
+    def process_statement(statement_id, pdf_path):
+        database.insert_transactions(statement_id, [_txn(1, "IKEA", 50), _txn(2, "IKEA", 20)])
+        raise RuntimeError("LLM unavailable")
+    return process_statement
+
+
+def test_final_failure_deletes_partial_rows(database, job, monkeypatch):
+    monkeypatch.setattr(worker, "process_statement", _fail_after_inserting(database))
+    database.get_connection().execute("UPDATE jobs SET attempts = max_attempts WHERE id = ?", (job["id"],))
+    job["attempts"] = 2
+
+    worker.run_job(job)
+
+    statement = database.get_statement_by_id(job["statement_id"])
+    assert statement["status"] == "failed"
+    assert statement["error_message"] == "LLM unavailable"
+    assert _spending(database) == {"transactions": 0, "rollups": 0, "search": 0}
+
+
+def test_retryable_failure_keeps_rows_for_the_retry(database, job, monkeypatch):
+    monkeypatch.setattr(worker, "process_statement", _fail_after_inserting(database))
+
+    worker.run_job(job)
+
+    assert database.get_statement_by_id(job["statement_id"])["status"] == "processing"
+    assert _spending(database)["transactions"] == 2
+
+
+def test_orphaned_job_without_attempts_left_deletes_partial_rows(database, job):
+    database.insert_transactions(job["statement_id"], [_txn(1, "IKEA", 50)])
+    database.get_connection().execute(
+        "UPDATE jobs SET attempts = max_attempts, heartbeat_at = datetime('now', '-1 hour') WHERE id = ?",
+        (job["id"],),
+    )
+    database.get_connection().commit()
+
+    [recovered] = database.recover_orphaned_jobs(stale_after_seconds=60)
+
+    assert recovered["status"] == "failed"
+    assert database.get_statement_by_id(job["statement_id"])["status"] == "failed"
+    assert _spending(database) == {"transactions": 0, "rollups": 0, "search": 0}
+
+
+def test_heartbeat_survives_a_failed_beat(monkeypatch):
+    beats = []
+    done = threading.Event()
+
+    def heartbeat_job(job_id):
+        beats.append(job_id)
+        if len(beats) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        done.set()
+
+    monkeypatch.setattr(worker, "HEARTBEAT_INTERVAL", 0.01)
+    monkeypatch.setattr(worker, "heartbeat_job", heartbeat_job)
+
+    worker._heartbeat(7, done)
+
+    assert beats == [7, 7]
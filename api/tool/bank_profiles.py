@@ -0,0 +1,126 @@
+import re
+from typing import Dict, List, Optional, Pattern
+
+
+class BankProfile:
+    """
+    Deterministic parser for a known statement layout.
+
+    A profile recognises its issuer from the statement text and turns
+    transaction lines into the same dict shape the LLM parser returns
+    (date, vendor_raw, amount). Lines it cannot parse return None and
+    are left to the LLM.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        detect_patterns: List[str],
+        line_pattern: str,
+        vendor_suffixes: Optional[List[str]] = None,
+    ):
+        self.name = name
+        self.detect_patterns: List[Pattern] = [
+            re.compile(p, re.IGNORECASE) for p in detect_patterns
+        ]
+        self.line_pattern: Pattern = re.compile(line_pattern)
+        # Trailing descriptors (e.g. spend categories) that are not part of the vendor
+        self.vendor_suffixes = vendor_suffixes or []
+
+    def matches(self, text: str) -> bool:
+        return any(p.search(text) for p in self.detect_patterns)
+
+    def parse_line(self, line: str) -> Optional[Dict]:
+        match = self.line_pattern.match(line.strip())
+        if not match:
+            return None
+
+        vendor = match.group("vendor").strip()
+        for suffix in self.vendor_suffixes:
+            if vendor.endswith(" " + suffix):
+                vendor = vendor[: -len(suffix)].strip()
+                break
+
+        if not vendor:
+            return None
+
+        return {
+            "date": match.group("date"),
+            "vendor_raw": vendor,
+            "amount": parse_amount(match.group("amount")),
+        }
+
+
+def parse_amount(value: str) -> float:
+    """
+    Convert '-$3,600.00' / '1,826.62' → float.
+    """
+    value = value.replace("$", "").replace(",", "").strip()
+    return float(value)
+
+
+# =========================
+# Known Layouts
+# =========================
+
+_MONTH_DAY = r"[A-Z][a-z]{2} \d{2}"
+_NUM_DATE = r"\d{2}/\d{2}/\d{2,4}"
+_AMOUNT = r"-?\$?[\d,]+\.\d{2}"
+
+CIBC_SPEND_CATEGORIES = [
+    "Personal and Household Expenses",
+    "Professional and Financial Services",
+    "Retail and Grocery",
+    "Transportation",
+    "Hotel, Entertainment and Recreation",
+    "Restaurants",
+    "Home and Office Improvement",
+    "Health and Education",
+    "Foreign Currency Transactions",
+]
+
+# Nov 20 Nov 24 FRESHCO #9888 BRAMPTON ON Retail and Grocery 23.87
+CIBC = BankProfile(
+    name="cibc",
+    detect_patterns=[r"www\.cibc\.com", r"CIBC Aventura", r"\bCIBC\b.*\bCard\b"],
+    line_pattern=rf"^(?P<date>{_MONTH_DAY}) {_MONTH_DAY} (?P<vendor>.+?) (?P<amount>{_AMOUNT})$",
+    vendor_suffixes=CIBC_SPEND_CATEGORIES,
+)
+
+# 11/13/25 11/14/25 Amazon.ca*B81B095Z1 TORONTO ON 8747 $332.16
+MBNA = BankProfile(
+    name="mbna",
+    detect_patterns=[r"www\.mbna\.ca", r"\bMBNA\b"],
+    line_pattern=rf"^(?P<date>{_NUM_DATE}) {_NUM_DATE} (?P<vendor>.+?) \d{{4}} (?P<amount>{_AMOUNT})$",
+)
+
+# 001 Sep 17 Sep 19 AMAZON.CA*PZ3T61XX3 866-216-1072 ON 1,826.62
+SCOTIABANK = BankProfile(
+    name="scotiabank",
+    detect_patterns=[r"Scotiabank"],
+    line_pattern=rf"^\d{{3}} (?P<date>{_MONTH_DAY}) {_MONTH_DAY} (?P<vendor>.+?) (?P<amount>{_AMOUNT})$",
+)
+
+
+# =========================
+# Registry
+# =========================
+
+BANK_PROFILES: List[BankProfile] = [CIBC, MBNA, SCOTIABANK]
+
+
+def register_profile(profile: BankProfile):
+    """
+    Add a profile to the registry. Later registrations take precedence.
+    """
+    BANK_PROFILES.insert(0, profile)
+
+
+def detect_profile(text: str) -> Optional[BankProfile]:
+    """
+    Return the first registered profile whose issuer markers appear in the text.
+    """
+    for profile in BANK_PROFILES:
+        if profile.matches(text):
+            return profile
+    return None
@@ -0,0 +1,152 @@
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+from tool.logging_config import logger
+
+# =========================
+# Configuration
+# =========================
+
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://127.0.0.1:11434")
+
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 120.0
+MAX_CONNECTIONS = 8
+MAX_IN_FLIGHT = 4  # Concurrent generate calls; match OLLAMA_NUM_PARALLEL
+KEEP_ALIVE = "10m"  # How long Ollama keeps the model loaded between calls
+
+DEFAULT_OPTIONS: Dict[str, Any] = {
+    "temperature": 0,
+}
+
+
+class LLMError(RuntimeError):
+    """Raised when the local LLM runtime cannot produce a response."""
+
+
+def normalize_base_url(host: str) -> str:
+    """
+    Ollama's own OLLAMA_HOST values are often bare ('0.0.0.0', '127.0.0.1:11434');
+    httpx needs a scheme.
+    """
+    host = host.strip().rstrip("/")
+    if "://" not in host:
+        host = f"http://{host}"
+    return host
+
+
+# =========================
+# Client
+# =========================
+
+class LLMClient:
+    """
+    Thin client for the local Ollama HTTP API.
+
+    A single instance holds a pool of keep-alive connections, so repeated
+    calls reuse the same sockets and the model stays attached in the runtime
+    instead of paying process startup on every prompt.
+    """
+
+    def __init__(
+        self,
+        base_url: str = OLLAMA_HOST,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        max_connections: int = MAX_CONNECTIONS,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        options: Optional[Dict[str, Any]] = None,
+        keep_alive: str = KEEP_ALIVE,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        self.base_url = normalize_base_url(base_url)
+        self.options = {**DEFAULT_OPTIONS, **(options or {})}
+        self.keep_alive = keep_alive
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._http = httpx.Client(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            transport=transport,  # e.g. httpx.MockTransport in tests
+        )
+
+    def generate(
+        self,
+        prompt: str,
+        model: str,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Run a single non-streaming completion and return the response text.
+        Blocks while `max_in_flight` other calls are already running.
+        """
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {**self.options, **(options or {})},
+        }
+        try:
+            with self._in_flight:
+                response = self._http.post("/api/generate", json=payload)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise LLMError(f"LLM request to {self.base_url} failed: {e}") from e
+
+        try:
+            body = response.json()
+        except ValueError as e:
+            raise LLMError(f"LLM response from {self.base_url} is not valid JSON: {e}") from e
+        if not isinstance(body, dict):
+            raise LLMError(f"Unexpected LLM response from {self.base_url}: {body!r}")
+        return (body.get("response") or "").strip()
+
+    def close(self):
+        self._http.close()
+
+
+# =========================
+# Shared Instance
+# =========================
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """
+    Return the process-wide client, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+                logger.info(f"LLM client connected to {_client.base_url}")
+    return _client
+
+
+def set_llm_client(client: Optional[LLMClient]):
+    """
+    Replace the shared client (e.g. to point at a stand-in server).
+    Passing None closes the current client; the next call recreates it.
+    """
+    global _client
+    with _client_lock:
+        if _client is not None and _client is not client:
+            _client.close()
+        _client = client
+
+
+def generate(prompt: str, model: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Convenience wrapper around the shared client.
+    """
+    return get_llm_client().generate(prompt, model=model, options=options)
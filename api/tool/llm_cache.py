@@ -0,0 +1,126 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Iterable
+
+from db.db import (
+    evict_llm_cache,
+    get_llm_cache_entries,
+    get_llm_cache_size,
+    get_llm_cache_summary,
+    put_llm_cache_entries,
+)
+from tool.logging_config import logger
+
+# =========================
+# Configuration
+# =========================
+
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE", "1") != "0"
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024
+# Eviction trims the cache to this fraction of the cap, so it doesn't run on every insert
+EVICT_TO_FRACTION = 0.9
+
+
+def cache_key(model: str, template_version: str, text: str) -> str:
+    """
+    Deterministic cache key of one LLM input.
+    """
+    return hashlib.sha256("\x1f".join((model, template_version, text)).encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed cache of LLM results with size-capped LRU eviction.
+
+    Keys hash the model, the prompt template version and the input, so
+    changing either the model or the prompt (bump its version) starts a
+    fresh set of entries. Hit and miss counters are kept per process.
+    """
+
+    def __init__(self, max_bytes: int = LLM_CACHE_MAX_BYTES, enabled: bool = LLM_CACHE_ENABLED):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._size = None  # Approximate total bytes; recomputed before evicting
+        self._lock = threading.Lock()
+
+    def get_many(self, model: str, template_version: str, texts: Iterable[str]) -> Dict[str, str]:
+        """
+        Cached responses for the given inputs, by input.
+        """
+        texts = list(dict.fromkeys(texts))
+        if not self.enabled or not texts:
+            return {}
+
+        keys = {cache_key(model, template_version, text): text for text in texts}
+        found = get_llm_cache_entries(list(keys), _now_ms())
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return {keys[key]: response for key, response in found.items()}
+
+    def put_many(self, model: str, template_version: str, responses: Dict[str, str]):
+        """
+        Cache responses by input, evicting old entries if over the size cap.
+        """
+        if not self.enabled or not responses:
+            return
+
+        added = put_llm_cache_entries(
+            [
+                (cache_key(model, template_version, text), model, template_version, response)
+                for text, response in responses.items()
+            ],
+            _now_ms(),
+        )
+        with self._lock:
+            if self._size is None:
+                self._size = get_llm_cache_size()
+            else:
+                self._size += added
+            if self._size <= self.max_bytes:
+                return
+
+            # Other processes write too; evict against the real total
+            self._size = get_llm_cache_size()
+            excess = self._size - int(self.max_bytes * EVICT_TO_FRACTION)
+            if self._size > self.max_bytes and excess > 0:
+                evicted = evict_llm_cache(excess)
+                self._size = get_llm_cache_size()
+                logger.info(f"LLM cache evicted {evicted} entries ({self._size} bytes left)")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        This process's hit/miss counters plus the stored entry totals.
+        """
+        with self._lock:
+            counters = {"hits": self.hits, "misses": self.misses}
+        summary = get_llm_cache_summary()
+        return {
+            **counters,
+            "entries": summary["entries"],
+            "bytes": summary["bytes"],
+            "lifetime_hits": summary["hits"],
+        }
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+_cache = LLMResponseCache()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    return _cache
+
+
+def set_llm_cache(cache: LLMResponseCache):
+    """
+    Replace the process-wide cache (e.g. a disabled one, or a different size cap).
+    """
+    global _cache
+    _cache = cache
@@ -6,3 +6,6 @@ logging.basicConfig(
 )
 
 logger = logging.getLogger("expense-ai")
+
+# httpx logs every request at INFO; keep LLM traffic out of the app log
+logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -1,26 +1,120 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+import multiprocessing
+import os
+import threading
+from typing import Deque, Iterator, List, Optional
+
 import pdfplumber
 
+from tool.logging_config import logger
+
+# Processes used to extract text from long PDFs (layout analysis is CPU-bound)
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+# PDFs with fewer pages are extracted in-process; a pool isn't worth starting
+PARALLEL_MIN_PAGES = 8
+# Upper bound on pages per pool task, so parallel extraction still streams
+PAGES_PER_TASK = 8
+# Page ranges submitted ahead per worker; bounds the extracted text held in memory
+TASKS_PER_WORKER = 2
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
 
-def extract_text_from_pdf(pdf_path: Path) -> str:
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Lazily started pool, reused across PDFs. Spawned rather than forked:
+    the caller may have other threads running.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """
+    Text of pages [start, stop), one entry per page ('' when it has none).
     """
-    Extract all text from a text-based PDF file.
+    return list(_iter_page_range(pdf_path, start, stop))
 
-    Args:
-        pdf_path (Path): Path to the PDF file
 
-    Returns:
-        str: Extracted text
+def _iter_page_range(pdf_path: str, start: int, stop: int) -> Iterator[str]:
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            text = page.extract_text() or ""
+            page.close()  # Release the page's parsed layout objects
+            yield text
+
+
+def count_pdf_pages(pdf_path: Path) -> int:
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def iter_pdf_pages(pdf_path: Path, workers: int = PDF_WORKERS) -> Iterator[str]:
+    """
+    Yield the text of each page in page order ('' for pages without text),
+    holding only the current page's layout in memory.
+
+    Long PDFs are split into page ranges extracted by `workers` processes,
+    at most TASKS_PER_WORKER ranges per worker ahead of the consumer; ranges
+    are yielded in order. Closing the generator cancels the queued ranges.
     """
     if not pdf_path.exists():
         raise FileNotFoundError(f"PDF not found: {pdf_path}")
 
-    extracted_text = []
+    page_count = count_pdf_pages(pdf_path)
+    if workers <= 1 or page_count < PARALLEL_MIN_PAGES:
+        yield from _iter_page_range(str(pdf_path), 0, page_count)
+        return
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                extracted_text.append(text)
+    size = min(PAGES_PER_TASK, -(-page_count // workers))
+    starts = list(range(0, page_count, size))
+    stops = [min(start + size, page_count) for start in starts]
+    logger.info(f"Extracting {page_count} pages with {min(workers, len(starts))} processes")
+
+    pool = _get_pool(workers)
+    ranges = iter(zip(starts, stops))
+    in_flight: Deque[Future] = deque()
+
+    def submit_next():
+        page_range = next(ranges, None)
+        if page_range is not None:
+            in_flight.append(pool.submit(_extract_page_range, str(pdf_path), *page_range))
 
-    return "\n".join(extracted_text)
+    done = 0
+    try:
+        for _ in range(workers * TASKS_PER_WORKER):
+            submit_next()
+        while in_flight:
+            texts = in_flight.popleft().result()
+            submit_next()
+            done += len(texts)
+            yield from texts
+    except BrokenProcessPool:
+        logger.warning("PDF extraction pool died, extracting the remaining pages serially")
+        _reset_pool()
+        yield from _iter_page_range(str(pdf_path), done, page_count)
+    finally:
+        for future in in_flight:
+            future.cancel()
@@ -0,0 +1,236 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from db.db import (
+    close_connection,
+    get_data_version,
+    get_statement_by_id,
+    get_statement_snapshots,
+)
+from tool.logging_config import logger
+
+# Seconds between checks for database changes while anyone is subscribed.
+# A check is a single PRAGMA; statements are only re-read after a commit.
+# Polling is deliberate: the writers are worker processes and the database is
+# the only channel they share with the API, so there is nothing to wake on.
+EVENTS_POLL_INTERVAL = 0.5
+
+# Statement statuses after which no more events follow
+FINAL_STATUSES = ("completed", "failed")
+
+PROGRESS_FIELDS = ("pages_total", "pages_done", "lines_parsed", "rows_inserted", "rows_skipped")
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+class Subscription:
+    """
+    One listener's queue of (event name, data) for a statement.
+    None marks the end of the stream.
+    """
+
+    def __init__(self, statement_id: int, loop: asyncio.AbstractEventLoop):
+        self.statement_id = statement_id
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def deliver(self, event: Optional[Event]):
+        """
+        Queue an event from any thread.
+        """
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+        except RuntimeError:
+            pass  # The listener's event loop is gone
+
+    async def get(self) -> Optional[Event]:
+        return await self._queue.get()
+
+
+class StatementEventHub:
+    """
+    In-process pub/sub of statement processing events.
+
+    Statements are processed by worker.py in other processes, so one
+    background thread watches the database on behalf of every subscriber:
+    it checks PRAGMA data_version each EVENTS_POLL_INTERVAL and re-reads the
+    watched statements only after a commit. Changes are fanned out to all
+    subscribers of the statement, so extra subscribers cost no queries.
+    The thread runs only while someone is subscribed; an idle API never polls.
+
+    Events:
+        status    {statement_id, status, error_message}
+        progress  {statement_id, stage, pages_total, pages_done, lines_parsed,
+                   rows_inserted, rows_skipped}
+        complete  {statement_id, status, error_message, transaction_count,
+                   total_amount, rows_inserted, rows_skipped}, then the stream ends
+        error     {statement_id, detail} if the statement disappears, then the stream ends
+    """
+
+    def __init__(self, poll_interval: float = EVENTS_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._last: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, statement_id: int) -> Subscription:
+        """
+        Listen for a statement's events. The current status and progress
+        are delivered first. Call from the subscriber's event loop.
+        """
+        subscription = Subscription(statement_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[statement_id].add(subscription)
+            last = self._last.get(statement_id)
+            if last is not None:
+                for event in _snapshot_events(None, last):
+                    subscription.deliver(event)
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="statement-events",
+                    daemon=True,
+                )
+                self._thread.start()
+        self._wake.set()  # Newly watched statements are read right away
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.statement_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.statement_id]
+                self._last.pop(subscription.statement_id, None)
+        self._wake.set()  # Lets the watcher stop once nobody is left
+
+    def close(self):
+        """
+        End every open stream and stop the watcher thread.
+        """
+        with self._lock:
+            for subscribers in self._subscribers.values():
+                for subscription in subscribers:
+                    subscription.deliver(None)
+            self._subscribers.clear()
+            self._last.clear()
+        self._wake.set()
+
+    # =========================
+    # Watcher Thread
+    # =========================
+
+    def _run(self):
+        version = None
+        try:
+            while True:
+                with self._lock:
+                    watched = list(self._subscribers)
+                    if not watched:
+                        self._thread = None
+                        return
+                    unseen = any(statement_id not in self._last for statement_id in watched)
+
+                self._wake.clear()
+                current = get_data_version()
+                if current != version or unseen:
+                    version = current
+                    self._publish(watched, get_statement_snapshots(watched))
+                self._wake.wait(self.poll_interval)
+        except Exception as e:
+            logger.error(f"Statement event watcher stopped: {e}")
+            with self._lock:
+                self._thread = None
+            self.close()
+        finally:
+            close_connection()
+
+    def _publish(self, watched, snapshots: Dict[int, Dict[str, Any]]):
+        for statement_id in watched:
+            snapshot = snapshots.get(statement_id)
+            if snapshot is None:
+                self._finish(statement_id, ("error", {
+                    "statement_id": statement_id,
+                    "detail": "Statement not found",
+                }))
+                continue
+
+            with self._lock:
+                if statement_id not in self._subscribers:
+                    continue
+                previous = self._last.get(statement_id)
+                self._last[statement_id] = snapshot
+                subscribers = list(self._subscribers[statement_id])
+            for event in _snapshot_events(previous, snapshot):
+                for subscription in subscribers:
+                    subscription.deliver(event)
+
+            if snapshot["status"] in FINAL_STATUSES:
+                self._finish(statement_id, _complete_event(snapshot))
+
+    def _finish(self, statement_id: int, event: Event):
+        """
+        Send a last event to a statement's subscribers and end their streams.
+        """
+        with self._lock:
+            subscribers = self._subscribers.pop(statement_id, set())
+            self._last.pop(statement_id, None)
+        for subscription in subscribers:
+            subscription.deliver(event)
+            subscription.deliver(None)
+
+
+def _stage(snapshot: Dict[str, Any]) -> str:
+    """
+    Pipeline stage: queued (waiting for a worker), parsing (pages still being
+    extracted and parsed), inserting (final batch being written), done.
+    """
+    if snapshot["status"] in FINAL_STATUSES:
+        return "done"
+    if snapshot["pages_total"] == 0:
+        return "queued"
+    if snapshot["pages_done"] < snapshot["pages_total"]:
+        return "parsing"
+    return "inserting"
+
+
+def _snapshot_events(previous: Optional[Dict[str, Any]], snapshot: Dict[str, Any]):
+    """
+    Events describing what changed from `previous` (None: everything) to `snapshot`.
+    """
+    statement_id = snapshot["statement_id"]
+    if previous is None or previous["status"] != snapshot["status"]:
+        yield "status", {
+            "statement_id": statement_id,
+            "status": snapshot["status"],
+            "error_message": snapshot["error_message"],
+        }
+    if previous is None or any(previous[f] != snapshot[f] for f in PROGRESS_FIELDS):
+        yield "progress", {
+            "statement_id": statement_id,
+            "stage": _stage(snapshot),
+            **{f: snapshot[f] for f in PROGRESS_FIELDS},
+        }
+
+
+def _complete_event(snapshot: Dict[str, Any]) -> Event:
+    statement = get_statement_by_id(snapshot["statement_id"]) or {}
+    return "complete", {
+        "statement_id": snapshot["statement_id"],
+        "status": snapshot["status"],
+        "error_message": snapshot["error_message"],
+        "transaction_count": statement.get("transaction_count", 0),
+        "total_amount": statement.get("total_amount", 0),
+        "rows_inserted": snapshot["rows_inserted"],
+        "rows_skipped": snapshot["rows_skipped"],
+    }
+
+
+statement_events = StatementEventHub()
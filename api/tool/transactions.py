@@ -1,19 +1,52 @@
 import re
 import json
-import subprocess
-from typing import List, Dict, Optional
+import math
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
 
-from tool.vendor import normalize_vendor
-from db.db import get_connection
+from tool.vendor import normalize_vendors
+from tool.llm import generate
+from tool.llm_cache import get_llm_cache
+from tool.bank_profiles import BankProfile, detect_profile, parse_amount
+from tool.pdf import count_pdf_pages, iter_pdf_pages
+from db.db import (
+    transaction,
+    insert_transactions,
+    start_statement_progress,
+    add_statement_progress,
+    set_statement_account,
+)
 from tool.logging_config import logger
 
 MODEL_NAME = "granite3.3:2b"
 
+# Part of every LLM cache key: bump it when the line prompts below change
+# so responses to the old prompts stop being served
+LINE_PROMPT_VERSION = "transaction-line-v1"
+
+# Lines sent per LLM prompt when parsing a statement.
+# Larger batches mean fewer round trips; smaller ones fail (and re-split) less often.
+# A batch size of 1 falls back to one prompt per line.
+BATCH_SIZE = 10
+
+# Batches parsed concurrently. The LLM client caps requests actually in flight.
+PARSE_WORKERS = 4
+
+# Parsed transactions normalized, inserted and committed together when streaming a PDF
+INSERT_BATCH_SIZE = 50
+
+# Pages searched for the statement date (needed to date "Nov 23" entries)
+# and account (issuer and card number, the account part of natural keys)
+# before parsed transactions are written without them
+STATEMENT_DATE_PAGES = 2
+
 def extract_transaction_lines(text: str) -> List[str]:
     """
     Extract candidate transaction lines from raw statement text.
-    Heuristic-based only; parsing is delegated to the LLM.
+    Heuristic-based only; parsing is delegated to bank profiles and the LLM.
     """
     lines = text.splitlines() # Simple heuristic: line contains date + amount 
     txn_lines = [] 
@@ -57,15 +90,7 @@ def parse_transaction_line(line: str) -> Dict:
 
     prompt = PROMPT_TEMPLATE.format(line=line.strip())
 
-    result = subprocess.run(
-        ["ollama", "run", MODEL_NAME],
-        input=prompt,
-        capture_output=True,
-        text=True,
-        encoding="utf-8",
-    )
-
-    output = result.stdout.strip()
+    output = generate(prompt, model=MODEL_NAME)
     cleaned = _clean_llm_output(output)
 
     try:
@@ -75,42 +100,341 @@ def parse_transaction_line(line: str) -> Dict:
 
     return data
 
+
+BATCH_PROMPT_TEMPLATE = """
+        You are a data extraction engine.
+
+        Given a numbered list of bank transaction lines, extract the following fields
+        for EACH line:
+
+        - index: the number of the input line
+        - date: the transaction date ONLY
+        - vendor_raw: the full vendor name and description
+        - amount: transaction amount as a number
+
+        Rules:
+        - If a line contains two dates, the FIRST date is the transaction date.
+        - Ignore the posted date.
+        - Do not invent or normalize vendor names.
+        - Preserve original spelling in vendor_raw.
+        - Return exactly one object per input line, in the same order.
+        - Output MUST be a valid JSON array.
+        - Do NOT include explanations, markdown, or extra text.
+
+        Input:
+        {lines}
+
+        Output:
+        """
+
+
+def parse_transaction_lines_batch(lines: List[str]) -> List[Optional[Dict]]:
+    """
+    Parse several transaction lines with a single LLM prompt.
+
+    The response must be a JSON array with one object per input line.
+    If it is malformed, the batch is split in half and each half retried,
+    down to single-line parsing via parse_transaction_line.
+    Lines that still cannot be parsed come back as None.
+    """
+    if not lines:
+        return []
+    if len(lines) == 1:
+        return [_parse_line_safely(lines[0])]
+
+    numbered = "\n".join(f"{i}. {line.strip()}" for i, line in enumerate(lines, start=1))
+    prompt = BATCH_PROMPT_TEMPLATE.format(lines=numbered)
+    output = generate(prompt, model=MODEL_NAME)
+
+    try:
+        parsed = _match_batch_output(output, len(lines))
+    except ValueError as e:
+        logger.warning(f"Batch of {len(lines)} lines returned malformed output, re-splitting: {e}")
+    else:
+        # Rows with unusable values get a second chance on their own
+        return [
+            txn if txn is not None else _parse_line_safely(line)
+            for line, txn in zip(lines, parsed)
+        ]
+
+    mid = len(lines) // 2
+    return parse_transaction_lines_batch(lines[:mid]) + parse_transaction_lines_batch(lines[mid:])
+
+
+def parse_transaction_lines(
+    lines: List[str],
+    batch_size: int = BATCH_SIZE,
+    max_workers: int = PARSE_WORKERS,
+) -> List[Optional[Dict]]:
+    """
+    Parse candidate lines in batches of `batch_size` on up to `max_workers`
+    threads. Output order matches the input lines; unparseable lines are None.
+
+    Lines parsed before (by the same model and prompt version) come from the
+    LLM cache; only the rest, each distinct line once, are sent to the LLM.
+    """
+    if not lines:
+        return []
+
+    cache = get_llm_cache()
+    keys = [line.strip() for line in lines]
+    known = {}
+    for key, response in cache.get_many(MODEL_NAME, LINE_PROMPT_VERSION, keys).items():
+        # Entries written before rows were validated may be unusable; parse those again
+        txn = validate_parsed_row(json.loads(response))
+        if txn is not None:
+            known[key] = txn
+    misses = [key for key in dict.fromkeys(keys) if key not in known]
+    if known:
+        logger.info(f"LLM cache hit for {len(known)} lines, parsing {len(misses)}")
+
+    parsed = _parse_uncached_lines(misses, batch_size, max_workers)
+    # Only validated rows are cached; unusable ones get a fresh LLM call next time
+    cache.put_many(
+        MODEL_NAME,
+        LINE_PROMPT_VERSION,
+        {
+            key: json.dumps(row)
+            for key, txn in zip(misses, parsed)
+            if (row := validate_parsed_row(txn)) is not None
+        },
+    )
+    known.update(zip(misses, parsed))
+
+    # Copies, since callers normalize the parsed dicts in place
+    return [dict(known[key]) if known[key] is not None else None for key in keys]
+
+
+def _parse_uncached_lines(
+    lines: List[str],
+    batch_size: int,
+    max_workers: int,
+) -> List[Optional[Dict]]:
+    if not lines:
+        return []
+
+    size = max(batch_size, 1)
+    batches = [lines[start:start + size] for start in range(0, len(lines), size)]
+
+    if max_workers <= 1 or len(batches) == 1:
+        results = [parse_transaction_lines_batch(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(batches)),
+            thread_name_prefix="llm-parse",
+        ) as pool:
+            results = list(pool.map(parse_transaction_lines_batch, batches))
+
+    return [txn for batch in results for txn in batch]
+
+
+def _parse_line_safely(line: str) -> Optional[Dict]:
+    """
+    Parse one line, returning None instead of failing the whole statement
+    when the LLM output is unusable. Runtime errors (LLMError) still propagate.
+    """
+    try:
+        txn = parse_transaction_line(line)
+    except ValueError as e:
+        logger.warning(f"Skipping unparseable line {line!r}: {e}")
+        return None
+
+    row = validate_parsed_row(txn)
+    if row is None:
+        logger.warning(f"Skipping line {line!r}: unusable fields {txn}")
+    return row
+
+
+def validate_parsed_row(txn) -> Optional[Dict]:
+    """
+    The LLM's answer for one line in insertable form, or None when it is unusable:
+    date and vendor_raw must be non-empty strings and amount a finite number
+    (strings like '$1,234.50' are converted the way bank profiles do).
+    """
+    if not isinstance(txn, dict):
+        return None
+
+    date, vendor_raw, amount = txn.get("date"), txn.get("vendor_raw"), txn.get("amount")
+    if not isinstance(date, str) or not date.strip():
+        return None
+    if not isinstance(vendor_raw, str) or not vendor_raw.strip():
+        return None
+
+    if isinstance(amount, str):
+        try:
+            amount = parse_amount(amount)
+        except ValueError:
+            return None
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not math.isfinite(amount):
+        return None
+
+    return {"date": date.strip(), "vendor_raw": vendor_raw.strip(), "amount": float(amount)}
+
+
+def parse_lines_with_profile(
+    lines: List[str],
+    profile: Optional[BankProfile],
+    batch_size: int = BATCH_SIZE,
+    max_workers: int = PARSE_WORKERS,
+) -> List[Dict]:
+    """
+    Parse lines deterministically with `profile`, sending only the lines it
+    cannot handle to the LLM. Output order matches the input lines;
+    lines neither could parse are dropped.
+    """
+    parsed: List[Optional[Dict]] = [
+        profile.parse_line(line) if profile else None for line in lines
+    ]
+    pending = [i for i, txn in enumerate(parsed) if txn is None]
+
+    if profile:
+        logger.info(
+            f"Bank profile '{profile.name}' parsed {len(lines) - len(pending)}/{len(lines)} lines"
+        )
+
+    llm_parsed = parse_transaction_lines(
+        [lines[i] for i in pending],
+        batch_size=batch_size,
+        max_workers=max_workers,
+    )
+    for i, txn in zip(pending, llm_parsed):
+        parsed[i] = txn
+
+    skipped = parsed.count(None)
+    if skipped:
+        logger.warning(f"{skipped}/{len(lines)} lines could not be parsed and were skipped")
+
+    return [txn for txn in parsed if txn is not None]
+
+
+def _match_batch_output(output: str, expected: int) -> List[Optional[Dict]]:
+    """
+    Validate a batch response and return its objects in input order.
+    Objects whose values are unusable (see validate_parsed_row) come back as None.
+    """
+    match = re.search(r"\[.*\]", output, re.DOTALL)
+    if not match:
+        raise ValueError("No JSON array found in LLM output")
+
+    try:
+        items = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise ValueError("LLM returned invalid JSON array") from e
+
+    if len(items) != expected or not all(isinstance(item, dict) for item in items):
+        raise ValueError(f"Expected {expected} objects, got {len(items)}")
+
+    for item in items:
+        if not all(key in item for key in ("date", "vendor_raw", "amount")):
+            raise ValueError(f"Missing fields in {item}")
+
+    # Prefer the model's own line numbers when they form a complete set
+    indexes = [item.get("index") for item in items]
+    if all(isinstance(i, int) for i in indexes) and sorted(indexes) == list(range(1, expected + 1)):
+        items = sorted(items, key=lambda item: item["index"])
+
+    return [validate_parsed_row(item) for item in items]
+
+
 def normalize_transaction_vendors(transactions: list, extracted_statement_date: str) -> list:
     """Add normalized vendor field to each transaction"""
+    vendor_map = normalize_vendors(txn["vendor_raw"] for txn in transactions)
     for txn in transactions:
-        txn["vendor"] = normalize_vendor(txn["vendor_raw"])
+        txn["vendor"] = vendor_map[txn["vendor_raw"].strip()]
         txn["date"] = normalize_transaction_date(txn["date"], statement_date=extracted_statement_date)
     return transactions
 
 
-def parse_text_to_transactions(text: str, statement_id: int) -> List[Dict]:
+def iter_page_transactions(
+    pages: Iterable[str],
+    batch_size: int = BATCH_SIZE,
+    max_workers: int = PARSE_WORKERS,
+) -> Iterator[Tuple[List[Dict], List[str], Optional[str], Optional[BankProfile], Optional[str]]]:
     """
-    Full pipeline:
-    - extract candidate transaction lines
-    - parse each line using the LLM
+    Parse statement pages one at a time. Yields (parsed transactions,
+    candidate lines, statement date, bank profile, account number) per page.
+    The header fields come from the first page showing them.
     """
-    extracted_statement_date = extract_statement_date(text)
-    logger.info("Extracted Statement Date : {}".format(extracted_statement_date))
-    lines = extract_transaction_lines(text)
-    transactions = [parse_transaction_line(line) for line in lines]
-    transactions = normalize_transaction_vendors(transactions, extracted_statement_date)
+    profile = None
+    statement_date = None
+    account_number = None
+    for text in pages:
+        profile = profile or detect_profile(text)
+        statement_date = statement_date or extract_statement_date(text)
+        account_number = account_number or extract_account_number(text)
+        lines = extract_transaction_lines(text)
+        transactions = parse_lines_with_profile(
+            lines,
+            profile,
+            batch_size=batch_size,
+            max_workers=max_workers,
+        )
+        yield transactions, lines, statement_date, profile, account_number
 
-    conn = get_connection()
-    cur = conn.cursor()
 
-    for txn in transactions:
-        cur.execute(
-            """
-            INSERT INTO transactions (statement_id, transaction_date, vendor_raw, vendor_normalized, amount)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (statement_id, txn["date"], txn["vendor_raw"], txn["vendor"], txn["amount"])
-        )
+def ingest_pdf_statement(
+    statement_id: int,
+    pdf_path: Path,
+    batch_size: int = BATCH_SIZE,
+    max_workers: int = PARSE_WORKERS,
+    insert_batch_size: int = INSERT_BATCH_SIZE,
+) -> Tuple[int, int]:
+    """
+    Streaming pipeline: PDF pages -> candidate lines -> parsed transactions -> database.
 
-    conn.commit()
-    conn.close()
+    Pages are extracted and parsed one at a time; parsed transactions are
+    normalized and inserted in committed batches of `insert_batch_size`.
+    Progress (pages done, lines parsed, rows inserted/skipped) is recorded
+    in statement_progress as it goes. Returns (inserted, skipped).
 
-    return transactions
+    Only validated rows are cached, so a retry after a failure replays the
+    lines already parsed from the LLM cache.
+    """
+    start_statement_progress(statement_id, count_pdf_pages(pdf_path))
+    cache = get_llm_cache()
+    hits_before, misses_before = cache.hits, cache.misses
+    occurrences: Counter = Counter()
+    pending: List[Dict] = []
+    statement_date = None
+    account = (None, None)  # (issuer, account number) the keys are built on
+    keyed = False
+    inserted_total = skipped_total = 0
+
+    def flush():
+        nonlocal inserted_total, skipped_total, keyed
+        keyed = True
+        transactions = normalize_transaction_vendors(pending, statement_date)
+        with transaction():
+            inserted, skipped = insert_transactions(statement_id, transactions, occurrences)
+            add_statement_progress(statement_id, rows_inserted=inserted, rows_skipped=skipped)
+        inserted_total += inserted
+        skipped_total += skipped
+        pending.clear()
+
+    pages = iter_pdf_pages(pdf_path)
+    parsed_pages = iter_page_transactions(pages, batch_size=batch_size, max_workers=max_workers)
+    for page_number, page in enumerate(parsed_pages, start=1):
+        transactions, lines, statement_date, profile, account_number = page
+        # The account is fixed once rows are written, so every key of the import uses the same one
+        if not keyed and (profile and profile.name, account_number) != account:
+            account = (profile and profile.name, account_number)
+            set_statement_account(statement_id, *account)
+        pending.extend(transactions)
+        add_statement_progress(statement_id, pages_done=1, lines_parsed=len(lines))
+
+        header_found = statement_date is not None and None not in account
+        header_settled = header_found or page_number >= STATEMENT_DATE_PAGES
+        if header_settled and len(pending) >= insert_batch_size:
+            flush()
+    if pending:
+        flush()
+
+    logger.info(
+        f"Inserted {inserted_total} transactions for statement {statement_id}"
+        f" ({skipped_total} duplicates skipped; LLM cache {cache.hits - hits_before} hits,"
+        f" {cache.misses - misses_before} misses)"
+    )
+    return inserted_total, skipped_total
 
 
 def _clean_llm_output(text: str) -> str: 
@@ -224,6 +548,34 @@ def extract_statement_date(extracted_text: str) -> Optional[str]:
     return None
 
 
+# Masked card numbers as printed in statement headers: "4500 XXXX XXXX 6680", "3773 XXXXXX 89781"
+_MASKED_ACCOUNT_PATTERN = re.compile(r"\b\d{4}[ -]?(?:[X*•]{2,}[ -]?){1,3}(\d{4,5})\b", re.IGNORECASE)
+_CARD_ENDING_PATTERN = re.compile(r"\bending in[:\s]+(\d{4})\b", re.IGNORECASE)
+_ACCOUNT_NUMBER_PATTERN = re.compile(
+    r"\b(?:Account|Card)\s*(?:number|no\.?|#)[:\s]*(\d[\d ]{6,}\d)\b", re.IGNORECASE
+)
+
+
+def extract_account_number(extracted_text: str) -> Optional[str]:
+    """
+    Extract the unmasked trailing digits of the card or account number
+    ('4500 XXXX XXXX 6680' → '6680'). Regex-based, deterministic, no LLM.
+    """
+    text = extracted_text.replace("\n", " ")
+
+    for pattern in (_MASKED_ACCOUNT_PATTERN, _CARD_ENDING_PATTERN):
+        match = pattern.search(text)
+        if match:
+            return match.group(1)
+
+    # Unmasked account number: keep its last four digits
+    match = _ACCOUNT_NUMBER_PATTERN.search(text)
+    if match:
+        return match.group(1).replace(" ", "")[-4:]
+
+    return None
+
+
 def _to_iso(date_str: str) -> str:
     """
     Convert 'September 28, 2025' or 'Sep 28, 2025' → '2025-09-28'
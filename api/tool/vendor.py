@@ -1,43 +1,265 @@
 import re
-import subprocess
-from db.db import get_connection
+import json
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from core.vendor_fingerprint import vendor_fingerprint
+from db.db import get_connection, transaction
+from tool.llm import generate
+from tool.logging_config import logger
+from tool.vendor_similarity import TrigramIndex
 
 MODEL_NAME = "granite3.3:2b"
 
+# A prefix match (handles extra words the fingerprint keeps) needs at least this
+# many characters of whole leading words: either a cached fingerprint is the
+# lookup's leading words, or the lookup is the leading words of exactly one
+# cached fingerprint. Shorter lookups need an exact match.
+MIN_PREFIX_LEN = 10
+LRU_SIZE = 4096
+
+# Distinct uncached vendors sent to the LLM per prompt in normalize_vendors
+VENDOR_BATCH_SIZE = 20
+# SQLite host-parameter limit safety margin for IN (...) lookups
+_SQL_CHUNK = 500
+
+# =========================
+# In-process vendor index
+# =========================
+
+class VendorIndex:
+    """
+    In-memory copy of vendor_cache for exact and longest-prefix lookups.
+
+    Keys are vendor fingerprints, kept upper-cased in a sorted list, so the keys
+    starting with a given run of whole words are found by bisection.
+    A bounded LRU remembers recent results.
+    """
+
+    def __init__(self, min_prefix_len: int = MIN_PREFIX_LEN, lru_size: int = LRU_SIZE):
+        self.min_prefix_len = min_prefix_len
+        self.lru_size = lru_size
+        self._keys: List[str] = []
+        self._values: Dict[str, str] = {}
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def load(self, rows):
+        """
+        Replace the index contents with (fingerprint, normalized_vendor) rows.
+        """
+        values = {key.upper(): normalized for key, normalized in rows}
+        with self._lock:
+            self._values = values
+            self._keys = sorted(values)
+            self._lru.clear()
+            self.loaded = True
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, fingerprint: str, normalized_vendor: str):
+        key = fingerprint.upper()
+        with self._lock:
+            if key not in self._values:
+                insort(self._keys, key)
+            self._values[key] = normalized_vendor
+            # A new key can change other lookups' longest-prefix match
+            self._lru.clear()
+
+    def lookup(self, fingerprint: str) -> Optional[str]:
+        key = fingerprint.upper()
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                return self._lru[key]
+
+            result = self._values.get(key)
+            if result is None:
+                match = self._longest_prefix_match(key)
+                result = self._values[match] if match else None
+
+            if result is not None:
+                self._lru[key] = result
+                if len(self._lru) > self.lru_size:
+                    self._lru.popitem(last=False)
+            return result
+
+    def _longest_prefix_match(self, key: str) -> Optional[str]:
+        """
+        The only cached key that continues `key` with more words, else the
+        longest cached key made of `key`'s leading words; either at least
+        min_prefix_len characters long. None if there is none. Keys that
+        merely share some leading words with `key` never match.
+        """
+        if len(key) < self.min_prefix_len:
+            return None
+
+        # `key` is the leading words of a single cached key (not several)
+        pos = bisect_left(self._keys, key + " ")
+        continuations = [k for k in self._keys[pos:pos + 2] if k.startswith(key + " ")]
+        if len(continuations) == 1:
+            return continuations[0]
+
+        # A cached key is `key`'s leading words
+        words = key.split(" ")
+        for count in range(len(words) - 1, 0, -1):
+            prefix = " ".join(words[:count])
+            if len(prefix) < self.min_prefix_len:
+                break
+            if prefix in self._values:
+                return prefix
+        return None
+
+
+_index = VendorIndex()
+_similar = TrigramIndex()
+
+
+def load_vendor_index() -> int:
+    """
+    Load vendor_cache into the in-process indexes. Returns the entry count.
+    """
+    conn = get_connection()
+    rows = conn.execute(
+        "SELECT fingerprint, normalized_vendor FROM vendor_cache WHERE fingerprint IS NOT NULL"
+    ).fetchall()
+    rows = [(row[0], row[1]) for row in rows]
+    _index.load(rows)
+    _similar.load(rows)
+    logger.info(f"Vendor index loaded ({len(_index)} entries)")
+    return len(_index)
+
+
 # =========================
 # Vendor cache operations
 # =========================
 
 def get_cached_vendor(raw_vendor: str) -> str | None:
     """
-    Look for a vendor in the cache.
-    Matches first few characters to handle unique transaction IDs.
+    Look for a vendor in the cache by its fingerprint.
+    Exact or longest-prefix match in memory; the database is only queried
+    when the index has no match (e.g. rows written by another process).
     """
+    if not _index.loaded:
+        load_vendor_index()
+
+    fingerprint = vendor_fingerprint(raw_vendor)
+    cached = _index.lookup(fingerprint)
+    if cached:
+        return cached
+
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT normalized_vendor FROM vendor_cache WHERE raw_vendor LIKE ?",
-        (f"{raw_vendor[:10]}%",)  # Match first 10 characters
-    )
-    row = cur.fetchone()
-    conn.close()
-    return row[0] if row else None
+    row = conn.execute(
+        "SELECT normalized_vendor FROM vendor_cache WHERE fingerprint = ? LIMIT 1",
+        (fingerprint,),
+    ).fetchone()
+    if not row:
+        return None
+
+    _index.add(fingerprint, row[0])
+    return row[0]
 
 def cache_vendor(raw_vendor: str, normalized_vendor: str):
     """
-    Cache normalized vendor in the DB.
+    Cache normalized vendor in the DB and the in-process index.
+    """
+    fingerprint = vendor_fingerprint(raw_vendor)
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO vendor_cache (raw_vendor, normalized_vendor, fingerprint)
+            VALUES (?, ?, ?)
+            """,
+            (raw_vendor, normalized_vendor, fingerprint),
+        )
+    _index.add(fingerprint, normalized_vendor)
+    _similar.add(fingerprint, normalized_vendor)
+
+
+def get_cached_vendors(raw_vendors: List[str]) -> Dict[str, str]:
     """
+    Resolve many vendors against the cache at once, by fingerprint.
+    Index hits are answered in memory; the rest use one IN (...) query per chunk.
+    Returns raw vendor -> normalized vendor for the vendors found.
+    """
+    if not _index.loaded:
+        load_vendor_index()
+
+    fingerprints = {raw: vendor_fingerprint(raw) for raw in raw_vendors}
+    by_fingerprint: Dict[str, str] = {}
+    missing: List[str] = []
+    for fingerprint in dict.fromkeys(fingerprints.values()):
+        cached = _index.lookup(fingerprint)
+        if cached:
+            by_fingerprint[fingerprint] = cached
+        else:
+            missing.append(fingerprint)
+
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT OR REPLACE INTO vendor_cache (raw_vendor, normalized_vendor)
-        VALUES (?, ?)
-        """,
-        (raw_vendor, normalized_vendor),
-    )
-    conn.commit()
-    conn.close()
+    for start in range(0, len(missing), _SQL_CHUNK):
+        chunk = missing[start:start + _SQL_CHUNK]
+        rows = conn.execute(
+            f"""
+            SELECT fingerprint, normalized_vendor
+            FROM vendor_cache
+            WHERE fingerprint IN ({','.join('?' * len(chunk))})
+            """,
+            chunk,
+        ).fetchall()
+        for fingerprint, normalized in rows:
+            by_fingerprint[fingerprint] = normalized
+            _index.add(fingerprint, normalized)
+
+    return {
+        raw: by_fingerprint[fingerprint]
+        for raw, fingerprint in fingerprints.items()
+        if fingerprint in by_fingerprint
+    }
+
+
+def cache_vendors(mapping: Dict[str, str]):
+    """
+    Cache many normalized vendors in one transaction.
+    """
+    if not mapping:
+        return
+    rows = [(raw, normalized, vendor_fingerprint(raw)) for raw, normalized in mapping.items()]
+    with transaction() as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO vendor_cache (raw_vendor, normalized_vendor, fingerprint)
+            VALUES (?, ?, ?)
+            """,
+            rows,
+        )
+    for _, normalized, fingerprint in rows:
+        _index.add(fingerprint, normalized)
+        _similar.add(fingerprint, normalized)
+
+
+def find_similar_vendor(raw_vendor: str) -> Optional[str]:
+    """
+    Normalized name of the most similar known vendor fingerprint, if it
+    clears the similarity threshold. No LLM involved.
+
+    Matches are approximate, so callers do not cache them: a wrong match
+    must not become an exact mapping or an anchor for further matches.
+    """
+    if not _index.loaded:
+        load_vendor_index()
+
+    fingerprint = vendor_fingerprint(raw_vendor)
+    match = _similar.best_match(fingerprint)
+    if not match:
+        return None
+
+    matched, normalized, score = match
+    logger.debug(f"Fuzzy vendor match {fingerprint!r} ~ {matched!r} ({score:.2f})")
+    return normalized
 
 # =========================
 # LLM Prompt
@@ -62,25 +284,39 @@ Input: {vendor}
 Output:
 """
 
+BATCH_PROMPT_TEMPLATE = """You are an entity extraction engine.
+
+Task:
+Extract the PRIMARY brand name from each numbered credit card transaction string.
+
+Rules:
+- English only
+- Brand name only
+- No locations
+- No domains (.com, .ca)
+- No explanations
+- Lowercase
+- Use hyphens between words
+- One short brand name per input
+- Output a JSON array of strings, one per input, in the same order
+
+Input:
+{vendors}
+Output:
+"""
+
 def _call_llm(raw_vendor: str) -> str:
     """
     Call the LLM to normalize vendor name.
     """
     prompt = PROMPT_TEMPLATE.format(vendor=raw_vendor)
-    result = subprocess.run(
-        ["ollama", "run", MODEL_NAME],
-        input=prompt,
-        capture_output=True,
-        text=True,
-        encoding="utf-8",
-    )
-    return result.stdout.strip()
+    return generate(prompt, model=MODEL_NAME)
 
 def _sanitize_output(output: str) -> str:
     """
     Ensure output is single token, lowercase and only letters/hyphens.
     """
-    output = output.splitlines()[0]
+    output = (output.splitlines() or [""])[0]
     output = output.lower().strip()
     output = re.sub(r"[^a-z\-]", "", output)
     return output
@@ -94,9 +330,88 @@ def normalize_vendor(raw_vendor: str) -> str:
     if cached:
         return cached
 
+    similar = find_similar_vendor(raw_vendor)
+    if similar:
+        return similar  # Approximate; not cached
+
     llm_output = _call_llm(raw_vendor)
     normalized = _sanitize_output(llm_output)
     if not normalized:
         normalized = "unknown-vendor"
     cache_vendor(raw_vendor, normalized)
     return normalized
+
+
+
+def _normalize_batch_with_llm(raw_vendors: List[str]) -> Dict[str, str]:
+    """
+    Normalize several uncached vendors with one prompt.
+    Falls back to one prompt per vendor if the response does not line up.
+    """
+    if len(raw_vendors) > 1:
+        numbered = "\n".join(f"{i}. {raw}" for i, raw in enumerate(raw_vendors, start=1))
+        output = generate(BATCH_PROMPT_TEMPLATE.format(vendors=numbered), model=MODEL_NAME)
+        match = re.search(r"\[.*\]", output, re.DOTALL)
+        try:
+            names = json.loads(match.group(0)) if match else None
+        except json.JSONDecodeError:
+            names = None
+
+        if isinstance(names, list) and len(names) == len(raw_vendors):
+            return {
+                raw: _sanitize_output(str(name)) or "unknown-vendor"
+                for raw, name in zip(raw_vendors, names)
+            }
+        logger.warning(f"Vendor batch of {len(raw_vendors)} returned malformed output, normalizing one by one")
+
+    return {
+        raw: _sanitize_output(_call_llm(raw)) or "unknown-vendor"
+        for raw in raw_vendors
+    }
+
+
+def normalize_vendors(raw_vendors: Iterable[str], batch_size: int = VENDOR_BATCH_SIZE) -> Dict[str, str]:
+    """
+    Normalize all vendors of a statement at once.
+
+    Duplicates are removed, cache hits resolved in bulk, close matches to
+    known vendors reuse their name (without being cached), and only the
+    remaining misses are sent to the LLM in batches of `batch_size`, one
+    representative per fingerprint.
+    Returns a map of stripped raw vendor -> normalized vendor.
+    """
+    unique = list(dict.fromkeys(raw.strip() for raw in raw_vendors))
+    result = get_cached_vendors(unique)
+
+    # Close matches to known vendors reuse their normalized name
+    for raw in unique:
+        if raw not in result:
+            match = find_similar_vendor(raw)
+            if match:
+                result[raw] = match
+
+    # Uncached raw vendors grouped by fingerprint; the first raw represents the group
+    groups: Dict[str, List[str]] = {}
+    for raw in unique:
+        if raw not in result:
+            groups.setdefault(vendor_fingerprint(raw), []).append(raw)
+    representatives = [raws[0] for raws in groups.values()]
+
+    if representatives:
+        logger.info(
+            f"Normalizing {len(representatives)} uncached vendor fingerprints "
+            f"({len(unique) - len(result)}/{len(unique)} vendors) with the LLM"
+        )
+
+    size = max(batch_size, 1)
+    for start in range(0, len(representatives), size):
+        normalized = _normalize_batch_with_llm(representatives[start:start + size])
+        resolved = {
+            raw: normalized[representative]
+            for representative in normalized
+            for raw in groups[vendor_fingerprint(representative)]
+        }
+        cache_vendors(resolved)
+        result.update(resolved)
+
+    return result
@@ -0,0 +1,113 @@
+import math
+import threading
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# Minimum Dice similarity (0-1) between trigram sets for a confident match.
+# At 0.8 this catches spelling and punctuation variants of one fingerprint
+# ("WAL-MART SUPERCENTER" ~ "WALMART SUPERCENTER", "TIM HORTON" ~ "TIM HORTONS").
+# Abbreviations share too few trigrams ("AMZN MKTP" ~ "AMAZON" scores 0.24)
+# and are left to the LLM.
+SIMILARITY_THRESHOLD = 0.8
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """
+    Character trigrams of an upper-cased, space-padded string.
+    """
+    padded = f"  {text.upper()} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    """
+    Approximate string matching over vendor fingerprints, CPU only.
+
+    An inverted index maps each trigram to the entries containing it.
+    Lookups only read the posting lists of a query's rarest trigrams
+    (any entry reaching the threshold must share at least one of them),
+    then verify candidates with an exact Dice score. This keeps queries
+    fast with hundreds of thousands of entries.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._keys: List[str] = []
+        self._grams: List[FrozenSet[str]] = []
+        self._values: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def load(self, rows):
+        """
+        Replace the index contents with (key, value) rows.
+        """
+        with self._lock:
+            self._keys, self._grams, self._values = [], [], []
+            self._positions, self._postings = {}, {}
+            for key, value in rows:
+                self._add_locked(key, value)
+
+    def add(self, key: str, value: str):
+        with self._lock:
+            self._add_locked(key, value)
+
+    def _add_locked(self, key: str, value: str):
+        key = key.upper()
+        pos = self._positions.get(key)
+        if pos is not None:
+            self._values[pos] = value
+            return
+
+        grams = trigrams(key)
+        pos = len(self._keys)
+        self._keys.append(key)
+        self._grams.append(grams)
+        self._values.append(value)
+        self._positions[key] = pos
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(pos)
+
+    def best_match(
+        self,
+        key: str,
+        threshold: Optional[float] = None,
+    ) -> Optional[Tuple[str, str, float]]:
+        """
+        Return (matched key, value, score) for the most similar entry
+        scoring at least `threshold`, or None.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        query = trigrams(key)
+        if not query or threshold <= 0:
+            return None
+
+        # Dice >= t requires |shared| >= t*|A| / (2 - t)
+        min_shared = max(1, math.ceil(threshold * len(query) / (2 - threshold)))
+        min_len = threshold * len(query) / (2 - threshold)
+        max_len = (2 - threshold) * len(query) / threshold
+
+        with self._lock:
+            by_rarity = sorted(query, key=lambda g: len(self._postings.get(g, ())))
+            prefix = by_rarity[: len(query) - min_shared + 1]
+
+            candidates = set()
+            for gram in prefix:
+                candidates.update(self._postings.get(gram, ()))
+
+            best = None
+            best_score = threshold
+            for pos in candidates:
+                grams = self._grams[pos]
+                if not (min_len <= len(grams) <= max_len):
+                    continue
+                score = 2 * len(query & grams) / (len(query) + len(grams))
+                if score >= best_score:
+                    best, best_score = pos, score
+
+            if best is None:
+                return None
+            return self._keys[best], self._values[best], best_score
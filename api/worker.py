@@ -0,0 +1,181 @@
+"""
+Statement processing worker pool.
+
+Drains the jobs table (see data/schema.sql) in separate processes, so
+uploads survive API restarts and at most WORKER_PROCESSES statements are
+processed at once. Run from the api directory:
+
+    uv run python worker.py
+"""
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from pathlib import Path
+
+from db.db import (
+    init_db,
+    claim_job,
+    complete_job,
+    fail_job,
+    fail_statement,
+    heartbeat_job,
+    recover_orphaned_jobs,
+    retry_or_fail_job,
+    update_statement_status,
+)
+from tool.logging_config import logger
+from tool.transactions import ingest_pdf_statement
+
+# =========================
+# Configuration
+# =========================
+
+WORKER_PROCESSES = int(os.environ.get("WORKER_PROCESSES", "2"))
+POLL_INTERVAL = 1.0  # Seconds between queue polls when idle
+HEARTBEAT_INTERVAL = 15  # Seconds between heartbeats of a running job
+STALE_AFTER = 120  # Seconds without a heartbeat before a running job is orphaned
+RECOVERY_INTERVAL = 30  # Seconds between orphaned-job sweeps
+RETRY_BASE_DELAY = 30  # Seconds before the first retry; doubles per attempt
+
+
+# =========================
+# Job Execution
+# =========================
+
+def process_statement(statement_id: int, pdf_path: Path):
+    """
+    Stream the PDF's pages through parsing, normalization and insertion.
+    Safe to re-run: duplicate transactions are skipped on insert.
+    """
+    ingest_pdf_statement(statement_id, pdf_path)
+
+
+def _heartbeat(job_id: int, done: threading.Event):
+    """
+    Refresh the job's heartbeat until it is done. A failed beat (e.g. the
+    database is briefly locked) is logged and retried on the next interval,
+    so the running job is not mistaken for an orphan.
+    """
+    while not done.wait(HEARTBEAT_INTERVAL):
+        try:
+            heartbeat_job(job_id)
+        except Exception as e:
+            logger.warning(f"Heartbeat for job {job_id} failed: {e}")
+
+
+def run_job(job: dict):
+    """
+    Process one claimed job and record its outcome.
+    The PDF is removed once the job is done or has no attempts left; a
+    statement that fails for good loses the rows it had inserted so far.
+    """
+    statement_id = job["statement_id"]
+    pdf_path = Path(job["pdf_path"])
+
+    done = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(job["id"], done), daemon=True)
+    beat.start()
+    try:
+        process_statement(statement_id, pdf_path)
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        if pdf_path.exists():
+            delay = RETRY_BASE_DELAY * 2 ** (job["attempts"] - 1)
+            status = retry_or_fail_job(job["id"], error, delay)
+        else:
+            status = fail_job(job["id"], error)  # Nothing left to retry with
+
+        if status == "failed":
+            fail_statement(statement_id, error)
+            pdf_path.unlink(missing_ok=True)
+            logger.error(f"❌ Statement {statement_id} failed after {job['attempts']} attempts: {error}")
+        else:
+            logger.warning(f"Statement {statement_id} attempt {job['attempts']} failed, retrying in {delay}s: {error}")
+        return
+    finally:
+        done.set()
+        beat.join()
+
+    update_statement_status(statement_id, "completed")
+    complete_job(job["id"])
+    pdf_path.unlink(missing_ok=True)
+    logger.info(f"Statement {statement_id} processing completed")
+
+
+def worker_loop(worker_id: str, stop):
+    """
+    Claim and run jobs until `stop` is set.
+    """
+    # Ctrl+C reaches the whole process group; let the supervisor stop us
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logger.info(f"Worker {worker_id} started")
+    while not stop.is_set():
+        job = claim_job(worker_id)
+        if job is None:
+            stop.wait(POLL_INTERVAL)
+            continue
+        run_job(job)
+    logger.info(f"Worker {worker_id} stopped")
+
+
+# =========================
+# Supervisor
+# =========================
+
+def _recover():
+    for job in recover_orphaned_jobs(STALE_AFTER):
+        if job["status"] == "failed":
+            Path(job["pdf_path"]).unlink(missing_ok=True)
+        logger.warning(f"Recovered orphaned job {job['id']} (statement {job['statement_id']}): {job['status']}")
+
+
+def main(processes: int = WORKER_PROCESSES):
+    init_db()
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+
+    # The handler only flips a flag: setting `stop` here could deadlock
+    # with the main loop, which may hold the event's lock at that moment
+    stopping = False
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    host = socket.gethostname()
+    workers = {}
+    last_recovery = 0.0
+    while not stopping:
+        # Start missing workers, and replace any that died
+        for slot in range(processes):
+            proc = workers.get(slot)
+            if proc is None or not proc.is_alive():
+                if proc is not None:
+                    logger.warning(f"Worker {proc.name} exited with code {proc.exitcode}, restarting")
+                proc = context.Process(
+                    target=worker_loop,
+                    args=(f"{host}:{os.getpid()}:{slot}", stop),
+                    name=f"worker-{slot}",
+                )
+                proc.start()
+                workers[slot] = proc
+
+        if time.monotonic() - last_recovery >= RECOVERY_INTERVAL:
+            _recover()
+            last_recovery = time.monotonic()
+        time.sleep(POLL_INTERVAL)
+
+    logger.info("🛑 Stopping workers after their current job")
+    stop.set()
+    for proc in workers.values():
+        proc.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 import React from 'react';
 import { Calendar } from 'lucide-react';
+import LoadMoreButton from '../common/LoadMoreButton';
 
 export default function StatementSelector({ 
-  statements, selectedId, onSelect, onToggleCreate, isCreating, newName, setNewName, onCreate 
+  statements, selectedId, onSelect, onToggleCreate, isCreating, newName, setNewName, onCreate,
+  hasMore, loadingMore, onLoadMore
 }) {
   return (
     <div className="bg-white p-6 rounded-3xl shadow-sm border border-gray-100">
@@ -44,6 +46,7 @@ export default function StatementSelector({
           </button>
         ))}
       </div>
+      <LoadMoreButton hasMore={hasMore} loading={loadingMore} onClick={onLoadMore} />
     </div>
   );
 }
\ No newline at end of file
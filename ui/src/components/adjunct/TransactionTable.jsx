@@ -1,7 +1,8 @@
 import React, { useState } from 'react';
 import { Trash2, Edit2, Check, X } from 'lucide-react';
+import LoadMoreButton from '../common/LoadMoreButton';
 
-export default function TransactionTable({ transactions, onDelete, onUpdate }) {
+export default function TransactionTable({ transactions, onDelete, onUpdate, hasMore, loadingMore, onLoadMore }) {
   const [editId, setEditId] = useState(null);
   const [editForm, setEditForm] = useState({});
 
@@ -114,6 +115,7 @@ export default function TransactionTable({ transactions, onDelete, onUpdate }) {
           )}
         </tbody>
       </table>
+      <LoadMoreButton hasMore={hasMore} loading={loadingMore} onClick={onLoadMore} />
     </div>
   );
 }
\ No newline at end of file
@@ -1,5 +1,6 @@
 import React from 'react';
 import { Search, Loader2 } from 'lucide-react';
+import LoadMoreButton from '../common/LoadMoreButton';
 
 export default function TransactionTriageTable({ 
   transactions, 
@@ -8,7 +9,10 @@ export default function TransactionTriageTable({
   setSearchTerm, 
   selectedIds, 
   onToggleSelect, 
-  onSelectAll 
+  onSelectAll,
+  hasMore,
+  loadingMore,
+  onLoadMore
 }) {
   
   // Fix for Bug 1: Calculate if "Select All" should be checked
@@ -96,6 +100,7 @@ export default function TransactionTriageTable({
           </tbody>
         </table>
       </div>
+      {!loading && <LoadMoreButton hasMore={hasMore} loading={loadingMore} onClick={onLoadMore} />}
     </div>
   );
 }
\ No newline at end of file
@@ -0,0 +1,19 @@
+import React from 'react';
+import { Loader2 } from 'lucide-react';
+
+export default function LoadMoreButton({ hasMore, loading, onClick, label = "Load more" }) {
+  if (!hasMore) return null;
+
+  return (
+    <div className="flex justify-center p-4">
+      <button
+        onClick={onClick}
+        disabled={loading}
+        className="flex items-center gap-2 px-6 py-2 rounded-xl text-xs font-black uppercase tracking-widest text-blue-600 bg-blue-50 hover:bg-blue-100 disabled:opacity-50 transition-colors"
+      >
+        {loading && <Loader2 className="animate-spin" size={14} />}
+        {loading ? "Loading..." : label}
+      </button>
+    </div>
+  );
+}
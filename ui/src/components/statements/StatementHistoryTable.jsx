@@ -1,5 +1,6 @@
 import React from 'react';
 import { FileText, Edit2, Check, X } from 'lucide-react';
+import LoadMoreButton from '../common/LoadMoreButton';
 
 export default function StatementHistoryTable({ 
   statements, 
@@ -11,13 +12,16 @@ export default function StatementHistoryTable({
   onStartEdit, 
   onSaveEdit, 
   onCancelEdit,
-  pollCount 
+  isLive,
+  hasMore,
+  loadingMore,
+  onLoadMore
 }) {
   return (
     <div className="bg-white rounded-2xl shadow-sm border border-gray-100 overflow-hidden">
       <div className="p-6 border-b border-gray-50 flex justify-between items-center">
         <h3 className="text-lg font-bold text-gray-800">Statement History</h3>
-        {pollCount > 0 && pollCount < 5 && <span className="text-xs text-blue-500 animate-pulse font-medium">Auto-refreshing...</span>}
+        {isLive && <span className="text-xs text-blue-500 animate-pulse font-medium">Live updates...</span>}
       </div>
       <div className="overflow-x-auto">
         <table className="w-full text-left">
@@ -66,6 +70,11 @@ export default function StatementHistoryTable({
                   }`}>
                     {s.status}
                   </span>
+                  {s.progress?.pages_total > 0 && (
+                    <span className="ml-2 text-xs text-gray-400">
+                      {s.progress.pages_done}/{s.progress.pages_total} pages
+                    </span>
+                  )}
                 </td>
                 <td className="px-6 py-4 text-right text-sm text-gray-500">{(s.file_size / 1024).toFixed(1)} KB</td>
               </tr>
@@ -73,6 +82,7 @@ export default function StatementHistoryTable({
           </tbody>
         </table>
       </div>
+      <LoadMoreButton hasMore={hasMore} loading={loadingMore} onClick={onLoadMore} />
     </div>
   );
 }
\ No newline at end of file
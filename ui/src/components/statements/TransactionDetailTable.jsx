@@ -1,7 +1,10 @@
 import React from 'react';
 import { Loader2, Info } from 'lucide-react';
+import LoadMoreButton from '../common/LoadMoreButton';
 
-export default function TransactionDetailTable({ transactions = [], filename, isLoading }) {
+export default function TransactionDetailTable({
+  transactions = [], total, filename, isLoading, hasMore, loadingMore, onLoadMore
+}) {
   return (
     <div className="bg-white rounded-3xl shadow-xl border border-gray-100 overflow-hidden animate-in fade-in slide-in-from-bottom-6 duration-700">
       <div className="p-8 border-b border-gray-50 flex justify-between items-center bg-gray-50/50">
@@ -13,7 +16,7 @@ export default function TransactionDetailTable({ transactions = [], filename, is
         </div>
         <div className="text-right">
           <span className="text-xs font-bold text-gray-400 block uppercase">Total Transactions</span>
-          <span className="text-2xl font-black text-gray-900">{transactions.length}</span>
+          <span className="text-2xl font-black text-gray-900">{total ?? transactions.length}</span>
         </div>
       </div>
       
@@ -65,6 +68,7 @@ export default function TransactionDetailTable({ transactions = [], filename, is
             )}
           </tbody>
         </table>
+        {!isLoading && <LoadMoreButton hasMore={hasMore} loading={loadingMore} onClick={onLoadMore} />}
       </div>
     </div>
   );
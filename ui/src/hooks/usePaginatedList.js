@@ -0,0 +1,48 @@
+import { useState, useCallback, useRef } from 'react';
+
+// A cursor-paginated list. load(...args) fetches the first page and loadMore()
+// appends the next one; fetchPage(...args, cursor) must resolve to { items, next_cursor }.
+export function usePaginatedList(fetchPage) {
+  const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const argsRef = useRef([]);
+  // Bumped by every load/reset, so pages of a list the user has moved away from are dropped
+  const requestRef = useRef(0);
+
+  const load = useCallback(async (...args) => {
+    argsRef.current = args;
+    const request = ++requestRef.current;
+    const page = await fetchPage(...args, null);
+    if (request === requestRef.current) {
+      setItems(page.items);
+      setNextCursor(page.next_cursor);
+    }
+    return page.items;
+  }, [fetchPage]);
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || loadingMore) return;
+    const request = requestRef.current;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(...argsRef.current, nextCursor);
+      if (request === requestRef.current) {
+        setItems(prev => [...prev, ...page.items]);
+        setNextCursor(page.next_cursor);
+      }
+    } catch (err) {
+      console.error("Failed to load more:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [fetchPage, nextCursor, loadingMore]);
+
+  const reset = useCallback(() => {
+    requestRef.current++;
+    setItems([]);
+    setNextCursor(null);
+  }, []);
+
+  return { items, setItems, hasMore: nextCursor !== null, loadMore, loadingMore, load, reset };
+}
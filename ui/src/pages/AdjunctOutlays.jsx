@@ -1,13 +1,17 @@
 import React, { useState, useEffect } from 'react';
 import { statementService, transactionService } from '../services/api';
+import { usePaginatedList } from '../hooks/usePaginatedList';
 import StatementSelector from '../components/adjunct/StatementSelector';
 import LedgerForm from '../components/adjunct/LedgerForm';
 import TransactionTable from '../components/adjunct/TransactionTable';
 
 export default function AdjunctOutlays() {
-  const [statements, setStatements] = useState([]);
+  // Manual statements and their entries load a page at a time
+  const statementList = usePaginatedList(statementService.listManualStatements);
+  const transactionList = usePaginatedList(statementService.getStatementTransactions);
+  const { items: statements, setItems: setStatements } = statementList;
+  const { items: transactions, setItems: setTransactions } = transactionList;
   const [selectedStatement, setSelectedStatement] = useState(null);
-  const [transactions, setTransactions] = useState([]);
   const [categories, setCategories] = useState([]);
   const [isCreating, setIsCreating] = useState(false);
   const [newName, setNewName] = useState("");
@@ -17,21 +21,11 @@ export default function AdjunctOutlays() {
 
   const loadData = async () => {
     try {
-      // 1. Fetch raw responses
-      const rawStmtData = await statementService.listStatements();
+      // 1. First page of manual statements (filtered by the API)
+      await statementList.load();
       const rawCatData = await transactionService.getCategories();
 
-      // 2. Extract the array (Handling cases where it might be rawStmtData or rawStmtData.data)
-      const dataArray = Array.isArray(rawStmtData)
-        ? rawStmtData
-        : (rawStmtData?.data || []);
-
-      // 3. Filter using source_type
-      const manualOnly = dataArray.filter(s => s.source_type === 'manual');
-
-      setStatements(manualOnly);
-
-      // 4. Handle categories similarly
+      // 2. Handle categories
       const categoriesArray = Array.isArray(rawCatData)
         ? rawCatData
         : (rawCatData?.data || []);
@@ -44,7 +38,7 @@ export default function AdjunctOutlays() {
 
   const handleSelect = async (stmt) => {
     setSelectedStatement(stmt);
-    setTransactions(await statementService.getStatementTransactions(stmt.id));
+    await transactionList.load(stmt.id);
   };
 
   const handleCreate = async () => {
@@ -114,6 +108,7 @@ export default function AdjunctOutlays() {
         statements={statements} selectedId={selectedStatement?.id} onSelect={handleSelect}
         onToggleCreate={() => setIsCreating(!isCreating)} isCreating={isCreating}
         newName={newName} setNewName={setNewName} onCreate={handleCreate}
+        hasMore={statementList.hasMore} loadingMore={statementList.loadingMore} onLoadMore={statementList.loadMore}
       />
       {selectedStatement && (
         <div className="space-y-6">
@@ -122,6 +117,9 @@ export default function AdjunctOutlays() {
             transactions={transactions}
             onDelete={handleDelete}
             onUpdate={handleUpdate} // <-- Add this
+            hasMore={transactionList.hasMore}
+            loadingMore={transactionList.loadingMore}
+            onLoadMore={transactionList.loadMore}
           />
         </div>
       )}
@@ -1,13 +1,18 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { Filter } from 'lucide-react';
 import { transactionService, statementService } from '../services/api';
+import { usePaginatedList } from '../hooks/usePaginatedList';
+import LoadMoreButton from '../components/common/LoadMoreButton';
 import CategorySidebar from '../components/categorization/CategorySidebar';
 import TransactionTriageTable from '../components/categorization/TransactionTriageTable';
 
 export default function Categorization() {
-    const [statements, setStatements] = useState([]);
+    // Statements and transactions load a page at a time; "Load more" fetches the next
+    const statementList = usePaginatedList(statementService.listStatements);
+    const transactionList = usePaginatedList(statementService.getStatementTransactions);
+    const { items: statements, load: loadStatements } = statementList;
+    const { items: transactions, setItems: setTransactions, load: loadTransactions } = transactionList;
     const [selectedStatementId, setSelectedStatementId] = useState(null);
-    const [transactions, setTransactions] = useState([]);
     const [categories, setCategories] = useState([]);
 
     const [selectedIds, setSelectedIds] = useState([]);
@@ -26,19 +31,18 @@ export default function Categorization() {
 
     const fetchData = useCallback(async () => {
         try {
-            const [stmtRes, catRes] = await Promise.all([
-                statementService.listStatements(),
+            const [firstStatements, catRes] = await Promise.all([
+                loadStatements(),
                 transactionService.getCategories()
             ]);
-            setStatements(stmtRes.data || []);
             setCategories((catRes || []).sort((a, b) => a.name.localeCompare(b.name)));
 
-            if (stmtRes.data?.length > 0 && !selectedStatementId) {
-                handleStatementChange(stmtRes.data[0].id);
+            if (firstStatements.length > 0 && !selectedStatementId) {
+                handleStatementChange(firstStatements[0].id);
             }
         } catch (err) { console.error(err); }
         finally { setLoading(false); }
-    }, [selectedStatementId]);
+    }, [selectedStatementId, loadStatements]);
 
     useEffect(() => { fetchData(); }, [fetchData]);
 
@@ -46,8 +50,7 @@ export default function Categorization() {
         setSelectedStatementId(id);
         setLoading(true);
         try {
-            const data = await statementService.getStatementTransactions(id);
-            setTransactions(data || []);
+            await loadTransactions(id);
             setSelectedIds([]);
         } catch (err) { console.error(err); }
         finally { setLoading(false); }
@@ -85,6 +88,12 @@ export default function Categorization() {
                     >
                         {statements.map(s => <option key={s.id} value={s.id}>{s.filename}</option>)}
                     </select>
+                    <LoadMoreButton
+                        hasMore={statementList.hasMore}
+                        loading={statementList.loadingMore}
+                        onClick={statementList.loadMore}
+                        label="More statements"
+                    />
                 </div>
             </div>
 
@@ -107,6 +116,9 @@ export default function Categorization() {
                         selectedIds={selectedIds}
                         onToggleSelect={(id) => setSelectedIds(prev => prev.includes(id) ? prev.filter(i => i !== id) : [...prev, id])}
                         onSelectAll={(checked) => setSelectedIds(checked ? filteredTransactions.map(t => t.id) : [])}
+                        hasMore={transactionList.hasMore}
+                        loadingMore={transactionList.loadingMore}
+                        onLoadMore={transactionList.loadMore}
                     />
                 </div>
             </div>
@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { statementService } from '../services/api';
+import { usePaginatedList } from '../hooks/usePaginatedList';
 import UploadZone from '../components/statements/UploadZone';
 import StatementHistoryTable from '../components/statements/StatementHistoryTable';
 import TransactionDetailTable from '../components/statements/TransactionDetailTable';
@@ -9,80 +10,83 @@ import TransactionDetailTable from '../components/statements/TransactionDetailTa
  * Orchestrates the uploading, renaming, and detailed viewing of bank statements.
  */
 export default function Statements() {
-  // Data State
-  const [statements, setStatements] = useState([]);
+  // Data State (one page at a time; later pages load on demand)
+  const statementList = usePaginatedList(statementService.listStatements);
+  const transactionList = usePaginatedList(statementService.getStatementTransactions);
+  const { items: statements, setItems: setStatements, load: loadStatements } = statementList;
+  const { items: transactions, load: loadTransactions, reset: resetTransactions } = transactionList;
   const [selectedStatement, setSelectedStatement] = useState(null);
-  const [transactions, setTransactions] = useState([]);
   
   // UI Loading States
   const [uploading, setUploading] = useState(false);
   const [loading, setLoading] = useState(true);
   const [detailsLoading, setDetailsLoading] = useState(false);
   
-  // Polling & Editing State
-  const [pollCount, setPollCount] = useState(0);
+  // Editing State
   const [editingId, setEditingId] = useState(null);
   const [editValue, setEditValue] = useState("");
 
-  // 1. Fetch List of Statements
+  // 1. Fetch the first page of statements
   const fetchStatements = useCallback(async () => {
     try {
-      const response = await statementService.listStatements();
-      // Axios returns the payload in .data
-      setStatements(response.data || []);
+      await loadStatements();
     } catch (err) {
       console.error("Failed to fetch statement history:", err);
       setStatements([]);
     } finally {
       setLoading(false);
     }
-  }, []);
+  }, [loadStatements, setStatements]);
 
   // Initial load
   useEffect(() => {
     fetchStatements();
   }, [fetchStatements]);
 
-  // 2. Smart Polling Logic (Max 5 attempts, 1 min apart)
-  useEffect(() => {
-    const isProcessing = statements.some(s => s.status.toLowerCase() === 'processing');
+  // 2. Live Updates: one event stream per statement still processing
+  const processingIds = statements
+    .filter(s => s.status.toLowerCase() === 'processing')
+    .map(s => s.id)
+    .join(',');
 
-    if (isProcessing && pollCount < 5) {
-      const timer = setTimeout(() => {
-        console.log(`Polling attempt ${pollCount + 1} of 5...`);
-        fetchStatements();
-        setPollCount(prev => prev + 1);
-      }, 60000); // 1 minute
+  useEffect(() => {
+    if (!processingIds) return;
 
-      return () => clearTimeout(timer);
-    }
-  }, [statements, pollCount, fetchStatements]);
+    const closers = processingIds.split(',').map(id =>
+      statementService.subscribeToEvents(id, (event, data) => {
+        setStatements(prev => prev.map(s => {
+          if (s.id !== data.statement_id) return s;
+          if (event === 'status') return { ...s, status: data.status, error_message: data.error_message };
+          if (event === 'progress') return { ...s, progress: data };
+          if (event === 'complete') {
+            return {
+              ...s,
+              status: data.status,
+              error_message: data.error_message,
+              transaction_count: data.transaction_count,
+              total_amount: data.total_amount,
+              progress: null,
+            };
+          }
+          return s;
+        }));
+      })
+    );
+    return () => closers.forEach(close => close());
+  }, [processingIds]);
 
   // 3. Handle Selecting a Statement to view Transactions
   const handleSelectStatement = async (statement) => {
     setSelectedStatement(statement);
-    setTransactions([]); 
+    resetTransactions();
     setDetailsLoading(true);
     
     try {
-      // Because we updated api.js to return response.data, 
-      // 'result' here IS the array of transactions.
-      const result = await statementService.getStatementTransactions(statement.id);
-      
-      console.log("API Result:", result); // Keep this to verify in console
-      
-      // Ensure we are setting an array
-      if (Array.isArray(result)) {
-        setTransactions(result);
-      } else if (result && result.transactions) {
-        // Fallback: in case your API wraps it in a 'transactions' key
-        setTransactions(result.transactions);
-      } else {
-        setTransactions([]);
-      }
+      // First page only; the table's "Load more" fetches the rest
+      await loadTransactions(statement.id);
     } catch (err) {
       console.error("Error fetching transactions:", err);
-      setTransactions([]);
+      resetTransactions();
     } finally {
       // Small delay ensures React finishes state batching
       setTimeout(() => setDetailsLoading(false), 100);
@@ -115,8 +119,7 @@ export default function Statements() {
     setUploading(true);
     try {
       await statementService.upload(file);
-      // Reset polling to give the new file a 5-minute window
-      setPollCount(0);
+      // The new statement shows up as processing and gets its own event stream
       fetchStatements();
     } catch (err) {
       console.error("Upload error:", err);
@@ -149,15 +152,22 @@ export default function Statements() {
         }}
         onSaveEdit={handleSaveEdit}
         onCancelEdit={() => setEditingId(null)}
-        pollCount={pollCount}
+        isLive={processingIds !== ''}
+        hasMore={statementList.hasMore}
+        loadingMore={statementList.loadingMore}
+        onLoadMore={statementList.loadMore}
       />
 
       {/* Bottom Section: Transactions within the selected file */}
       {selectedStatement && (
         <TransactionDetailTable 
           transactions={transactions} 
+          total={selectedStatement.transaction_count}
           filename={selectedStatement.filename}
           isLoading={detailsLoading}
+          hasMore={transactionList.hasMore}
+          loadingMore={transactionList.loadingMore}
+          onLoadMore={transactionList.loadMore}
         />
       )}
     </div>
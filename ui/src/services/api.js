@@ -7,6 +7,13 @@ const apiClient = axios.create({
   },
 });
 
+// List endpoints return one page as { items, next_cursor }; pass next_cursor back
+// as the cursor to get the following page (null when there are no more).
+const fetchPage = async (url, cursor, params = {}) => {
+  const response = await apiClient.get(url, { params: cursor ? { ...params, cursor } : params });
+  return response.data;
+};
+
 export const dashboardService = {
   getSummary: async (year = 2025) => {
     const response = await apiClient.get(`/dashboard/summary?year=${year}`);
@@ -21,7 +28,9 @@ export const dashboardService = {
 };
 
 export const statementService = {
-  listStatements: () => apiClient.get('/statements/'),
+  listStatements: (cursor = null) => fetchPage('/statements/', cursor),
+
+  listManualStatements: (cursor = null) => fetchPage('/statements/', cursor, { source_type: 'manual' }),
   
   upload: (file) => {
     const formData = new FormData();
@@ -38,9 +47,23 @@ export const statementService = {
     return response.data;
   },
 
-  getStatementTransactions: async (id) => {
-    const response = await apiClient.get(`/transactions/statement/${id}/transactions`);
-    return response.data;
+  getStatementTransactions: (id, cursor = null) => {
+    return fetchPage(`/transactions/statement/${id}/transactions`, cursor);
+  },
+
+  // Live processing events (status, progress, complete) over server-sent events.
+  // Calls onEvent(name, data) for each; returns a function that closes the stream.
+  subscribeToEvents: (id, onEvent) => {
+    const source = new EventSource(`${apiClient.defaults.baseURL}/statements/${id}/events`);
+    ['status', 'progress', 'complete', 'error'].forEach((name) => {
+      source.addEventListener(name, (e) => {
+        // A bare 'error' without data is a connection drop; EventSource retries it
+        if (!e.data) return;
+        onEvent(name, JSON.parse(e.data));
+        if (name === 'complete' || name === 'error') source.close();
+      });
+    });
+    return () => source.close();
   },
 
   // NEW: Create a bucket for manual entries (Adjunct Outlays)